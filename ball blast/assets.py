@@ -0,0 +1,139 @@
+# assets.py
+import pygame
+from collections import OrderedDict
+
+
+class AssetRegistry:
+    """全域圖片資源表：每組 (path, size, colorkey) 只載入、縮放一次"""
+
+    # 類別變數：所有物件共用同一份快取
+    _images = {}      # key -> Surface
+    _masks = {}       # key -> Mask
+    _sources = {}     # path -> 原始（未縮放）Surface
+    hits = 0          # 命中快取次數
+    misses = 0        # 需要實際處理的次數
+    disk_loads = 0    # pygame.image.load 實際被呼叫的次數
+
+    @classmethod
+    def _key(cls, path, size, colorkey, alpha):
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        if colorkey is not None:
+            colorkey = tuple(colorkey)
+            alpha = False   # colorkey 的圖（例如 jpg）一律用 convert
+        return (path, size, colorkey, alpha)
+
+    @classmethod
+    def _load_source(cls, path, alpha):
+        """從磁碟讀取原圖（每個 path + 透明方式 只讀一次）"""
+        src_key = (path, alpha)
+        if src_key not in cls._sources:
+            image = pygame.image.load(path)
+            cls.disk_loads += 1
+            # 沒有顯示畫面時（例如無視窗的 GameState）無法 convert，直接使用原圖
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha() if alpha else image.convert()
+            cls._sources[src_key] = image
+        return cls._sources[src_key]
+
+    @classmethod
+    def image(cls, path, size=None, colorkey=None, alpha=True):
+        """取得共用的 Surface（請勿直接修改回傳的 Surface）"""
+        key = cls._key(path, size, colorkey, alpha)
+        surface = cls._images.get(key)
+        if surface is not None:
+            cls.hits += 1
+            return surface
+
+        cls.misses += 1
+        surface = cls._load_source(path, key[3])
+        if colorkey is not None:
+            surface = surface.copy()
+            surface.set_colorkey(colorkey)
+        if size is not None:
+            surface = pygame.transform.scale(surface, key[1])
+        cls._images[key] = surface
+        return surface
+
+    @classmethod
+    def mask(cls, path, size=None, colorkey=None, alpha=True):
+        """取得與 image() 同一組參數對應的共用碰撞遮罩"""
+        key = cls._key(path, size, colorkey, alpha)
+        mask = cls._masks.get(key)
+        if mask is None:
+            mask = pygame.mask.from_surface(cls.image(path, size, colorkey, alpha))
+            cls._masks[key] = mask
+        return mask
+
+    @classmethod
+    def load(cls, path, size=None, colorkey=None, alpha=True):
+        """一次取得 (Surface, Mask)"""
+        return (cls.image(path, size, colorkey, alpha),
+                cls.mask(path, size, colorkey, alpha))
+
+    @classmethod
+    def stats(cls):
+        """回傳快取統計（用來確認遊戲進行中沒有磁碟 I/O）"""
+        total = cls.hits + cls.misses
+        return {
+            'entries': len(cls._images),
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'disk_loads': cls.disk_loads,
+            'hit_rate': cls.hits / total if total else 0.0,
+        }
+
+    @classmethod
+    def reset_stats(cls):
+        cls.hits = 0
+        cls.misses = 0
+        cls.disk_loads = 0
+
+    @classmethod
+    def clear(cls):
+        """清空快取（例如重新建立顯示模式之後）"""
+        cls._images.clear()
+        cls._masks.clear()
+        cls._sources.clear()
+
+
+class LRUCache:
+    """有容量上限的 LRU 快取（超過上限時丟掉最久沒用到的項目）"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, factory):
+        """取得 key 對應的值；沒有的話呼叫 factory() 建立並存入"""
+        value = self._data.get(key)
+        if value is not None:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = factory()
+        if self.maxsize > 0:
+            self._data[key] = value
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
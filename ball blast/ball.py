@@ -3,12 +3,58 @@ import pygame
 import math
 import random
 import os
+from assets import AssetRegistry, LRUCache
+from fonts import FontManager
+from collision import NARROW_MASK, NARROW_CIRCLE, mask_boxes, circle_hits_box
+from ball_field import GRAVITY, ELASTICITY
+
+def _physics_property(name):
+    """
+    物理欄位：球在 BallField 中時讀寫陣列裡自己的位置，
+    否則讀寫物件本身的 _<name>。
+    """
+    private = "_" + name
+
+    def getter(self):
+        field = self._field
+        if field is None:
+            return getattr(self, private)
+        return getattr(field, name)[self._slot].item()
+
+    def setter(self, value):
+        field = self._field
+        if field is None:
+            setattr(self, private, value)
+        else:
+            getattr(field, name)[self._slot] = value
+
+    return property(getter, setter)
+
 
 class Ball:
+    # 物理狀態可由 BallField 以陣列統一管理（見 ball_field.py）
+    _field = None
+    _slot = -1
+    # 穩定的編號：第一次加入 BallField 時配發，網路同步以它對應兩邊的球
+    ball_id = None
+    x = _physics_property("x")
+    y = _physics_property("y")
+    dx = _physics_property("dx")
+    dy = _physics_property("dy")
+    radius = _physics_property("radius")
+    gravity = _physics_property("gravity")
+    elasticity = _physics_property("elasticity")
+
     # 類別變數：預載所有球體圖片（避免重複載入）
     _ball_images = None
+    # (圖片編號, 半徑) -> (縮放後圖片, 遮罩)，分裂出來的小球大多會命中
+    _scaled_cache = LRUCache(maxsize=512)
+    # HP 文字 -> 已渲染的 Surface（所有球共用）
+    _label_cache = LRUCache(maxsize=512)
     
-    def __init__(self, x, y, radius, hp, max_splits = 4):
+    def __init__(self, x, y, radius, hp, max_splits = 4, image_index=None, rng=None):
+        # 亂數來源：GameState 傳入自己的 random.Random（可重現），否則用全域 random
+        self.rng = random if rng is None else rng
         self.x = x
         self.y = y
         self.radius = radius
@@ -18,26 +64,25 @@ class Ball:
         self.splits_remaining = max_splits
         
         # 初始化物理參數
-        self.dx = random.uniform(-3, 3)  # 水平速度
-        self.dy = random.uniform(1, 3)   # 垂直速度
-        self.gravity = 0.1               # 重力加速度
-        self.elasticity = 0.95          #橫向彈性係數
+        self.dx = self.rng.uniform(-3, 3)  # 水平速度
+        self.dy = self.rng.uniform(1, 3)   # 垂直速度
+        self.gravity = GRAVITY           # 重力加速度
+        self.elasticity = ELASTICITY    #橫向彈性係數
         
         # 載入圖片資源
         self._load_images()
         
-        # 隨機選擇圖片並縮放
-        self.current_image = random.choice(self._ball_images)
-        self.current_image = pygame.transform.scale(
-            self.current_image,
-            (radius*2, radius*2)  # 根據半徑調整大小
-        )
+        # 隨機選擇圖片（分裂的子球沿用母球的圖片編號）
+        if image_index is None:
+            image_index = self.rng.randrange(len(self._ball_images))
+        self.image_index = image_index
         
-        # 文字渲染
-        self.font = pygame.font.SysFont("Arial", 24)
+        # 縮放後的圖片與碰撞遮罩（用於精確碰撞檢測）
+        self.current_image, self.mask = self._get_scaled(image_index, radius)
         
-        # 碰撞遮罩（用於精確碰撞檢測）
-        self.mask = pygame.mask.from_surface(self.current_image)
+        # 文字渲染（HP 有變動時才重新取得文字圖）
+        self._label = None
+        self._label_text = None
 
     @classmethod
     def _load_images(cls):
@@ -49,11 +94,26 @@ class Ball:
         for i in range(15):  # ball0.png ~ ball14.png
             # 嘗試載入圖片（支援相對路徑）
             img_path = os.path.join("image", f"ball{i}.png")
-            img = pygame.image.load(img_path).convert_alpha()
-            cls._ball_images.append(img)
+            cls._ball_images.append(AssetRegistry.image(img_path))
+
+    @classmethod
+    def _get_scaled(cls, image_index, radius):
+        """取得 (圖片編號, 半徑) 對應的縮放圖片與遮罩（LRU 快取）"""
+        size = int(radius * 2)
+
+        def build():
+            image = pygame.transform.scale(cls._ball_images[image_index], (size, size))
+            return image, pygame.mask.from_surface(image)
+
+        return cls._scaled_cache.get((image_index, size), build)
+
+    def set_radius(self, radius):
+        """改變半徑並換上對應大小的圖片與遮罩（網路同步時使用）"""
+        self.radius = radius
+        self.current_image, self.mask = self._get_scaled(self.image_index, radius)
 
     def move(self, screen_width, screen_height):
-        """更新球體位置（含邊界反彈）"""
+        """更新球體位置（含邊界反彈）；遊戲中由 BallField.step 一次處理所有球"""
         # 應用重力
         self.dy += self.gravity
         
@@ -74,34 +134,90 @@ class Ball:
             self.x = screen_width - self.radius
             self.dx = -self.dx * self.elasticity
 
-    def draw(self, win):
-        """繪製球體（使用圖片替代圓形）"""
+    def draw(self, win, pos=None):
+        """繪製球體（使用圖片替代圓形）；pos 可指定內插後的繪製位置"""
         # 計算繪製位置（中心對齊）
-        img_rect = self.current_image.get_rect(center=(int(self.x), int(self.y)))
+        x, y = (self.x, self.y) if pos is None else pos
+        center = (int(x), int(y))
+        img_rect = self.current_image.get_rect(center=center)
         win.blit(self.current_image, img_rect)
         
         # 繪製HP文字（居中）
-        text = self.font.render(str(self.hp), True, (255, 255, 255))
-        text_rect = text.get_rect(center=(self.x, self.y))
+        text = self._get_label()
+        text_rect = text.get_rect(center=center)
         win.blit(text, text_rect)
 
+    @property
+    def font(self):
+        """HP 文字字體；繪製時才取得，純模擬（GameState）不需要字體"""
+        return FontManager.get("Arial", 24)
+
+    def label_text(self):
+        """球上顯示的文字"""
+        return str(self.hp)
+
+    def _get_label(self):
+        """取得文字圖；只有文字改變時才去查共用快取"""
+        text = self.label_text()
+        if text != self._label_text:
+            font = self.font
+            self._label = Ball._label_cache.get(
+                text, lambda: font.render(text, True, (255, 255, 255)))
+            self._label_text = text
+        return self._label
+
     def is_hit(self, bullet):
+        """以子彈物件做碰撞判定"""
+        return self.is_hit_at(bullet.x, bullet.y, bullet.mask)
+
+    def is_hit_at(self, x, y, bullet_mask, narrow=NARROW_MASK):
+        """以子彈中心 (x, y) 與子彈遮罩做碰撞判定（BulletField 使用）"""
+        hit = self.overlaps_at(x, y, bullet_mask, narrow)
+        if hit:
+            self.on_hit()
+        return hit
+
+    def on_hit(self):
+        """被子彈擊中時的額外效果（HP 由 Game 處理）"""
+        pass
+
+    def overlaps_at(self, x, y, bullet_mask, narrow=NARROW_MASK):
+        """
+        子彈是否與球重疊：
+        - "mask"：像素遮罩（精確，與畫面完全一致）
+        - "circle"：球視為半徑 radius 的圓，子彈取遮罩的包圍盒
+        """
+        if narrow == NARROW_CIRCLE:
+            cx, cy = int(self.x), int(self.y)
+            bullet_w, bullet_h = bullet_mask.get_size()
+            left = int(x) - bullet_w // 2
+            top = int(y) - bullet_h // 2
+            radius = self.radius
+            for box_left, box_top, box_right, box_bottom in mask_boxes(bullet_mask):
+                if circle_hits_box(cx, cy, radius, left + box_left, top + box_top,
+                                   left + box_right, top + box_bottom):
+                    return True
+            return False
+
         # 1. 先用簡易的矩形包圍盒（AABB）做一次快篩 (optional)
-        ball_rect = self.current_image.get_rect(center=(int(self.x), int(self.y)))
-        bullet_rect = bullet.image.get_rect(center=(int(bullet.x), int(bullet.y)))
+        ball_w, ball_h = self.current_image.get_size()
+        ball_left = int(self.x) - ball_w // 2
+        ball_top = int(self.y) - ball_h // 2
+        bullet_w, bullet_h = bullet_mask.get_size()
+        bullet_left = int(x) - bullet_w // 2
+        bullet_top = int(y) - bullet_h // 2
         
-        if not ball_rect.colliderect(bullet_rect):
+        if (bullet_left >= ball_left + ball_w or bullet_left + bullet_w <= ball_left or
+                bullet_top >= ball_top + ball_h or bullet_top + bullet_h <= ball_top):
             # 如果它們的包圍盒都沒碰到，就不用繼續做 pixel-level
             return False
 
         # 2. 計算兩個遮罩的 offset
-        offset_x = bullet_rect.left - ball_rect.left
-        offset_y = bullet_rect.top  - ball_rect.top
-        offset = (offset_x, offset_y)
+        offset = (bullet_left - ball_left, bullet_top - ball_top)
 
         # 3. 呼叫 mask.overlap() 來檢查是否有真正的像素重疊
         #    如果有重疊就回傳 (non-None)；否則回傳 None
-        return self.mask.overlap(bullet.mask, offset) is not None
+        return self.mask.overlap(bullet_mask, offset) is not None
 
     def split(self):
         """分裂球體（保持相同圖片）"""
@@ -117,55 +233,69 @@ class Ball:
         return [ball for ball in [left_ball, right_ball] if ball is not None]
     
     def _create_split_ball(self, x, radius, hp):
-        """創建分裂後的子球體"""
-        new_ball = Ball(x, self.y, radius, hp)
-        new_ball.max_splits = self.max_splits
+        """創建分裂後的子球體（沿用母球圖片，直接從快取取得縮放結果）"""
+        new_ball = Ball(x, self.y, radius, hp, self.max_splits,
+                        image_index=self.image_index, rng=self.rng)
         new_ball.splits_remaining = self.splits_remaining
         
-        # 複製當前圖片（避免重新隨機選擇）
-        new_ball.current_image = pygame.transform.scale(
-            self.current_image,
-            (radius*2, radius*2)
-        )
-        new_ball.mask = pygame.mask.from_surface(new_ball.current_image)
-        
         # 調整物理參數
-        new_ball.dx = random.uniform(-2, 2)
-        new_ball.dy = random.uniform(-3, -1)  # 向上彈跳
+        new_ball.dx = self.rng.uniform(-2, 2)
+        new_ball.dy = self.rng.uniform(-3, -1)  # 向上彈跳
         return new_ball
 
 
 class RewardBall(Ball):
     """獎勵球，繼承自Ball類別"""
     _original_reward_image = None  # 儲存原始高解析度圖片
+    _size_pyramid = {}             # 半徑 -> (縮放後圖片, 遮罩)，每個尺寸只做一次
+
+    # 計算縮放比例（假設原始圖片是標準尺寸的5倍）
+    # 例如：標準球直徑100px，你的圖片就是500px
+    scale_factor = 5
+    base_radius = 40     # 初始邏輯半徑
+    growth_factor = 2    # 每次被擊中半徑增長係數
+    min_radius = 40
+    max_radius = 100
     
-    def __init__(self, x, y):
-        # 載入高解析度獎勵球圖片（只執行一次）
-        if RewardBall._original_reward_image is None:
-            img_path = os.path.join("image", "ball15.png")
-            RewardBall._original_reward_image = pygame.image.load(img_path).convert_alpha()
-        
-        # 計算縮放比例（假設原始圖片是標準尺寸的5倍）
-        # 例如：標準球直徑100px，你的圖片就是500px
-        self.scale_factor = 5  
-        self.base_radius = 40  # 初始邏輯半徑
-        
-        # 初始化父類別
-        super().__init__(x, y, radius=self.base_radius, hp=5, max_splits=0)
-        
-        # 設定初始圖片（從大圖縮小）
-        self.current_image = self._get_scaled_image(self.radius)
-        self.mask = pygame.mask.from_surface(self.current_image)
-        
-        # 獎勵球特有屬性
-        self.growth_factor = 2  # 每次被擊中半徑增長係數
-        self.min_radius = 40
-        self.max_radius = 100
-
-    def _get_scaled_image(self, target_radius):
+    def __init__(self, x, y, rng=None):
+        # 載入高解析度獎勵球圖片並建立所有尺寸（只執行一次）
+        self._build_pyramid()
+        
+        # 初始化父類別（圖片由 _get_scaled 從尺寸表取得）
+        super().__init__(x, y, radius=self.base_radius, hp=5, max_splits=0, rng=rng)
+
+    @classmethod
+    def _build_pyramid(cls):
+        """預先建立 min_radius ~ max_radius 每個成長階段的圖片與遮罩"""
+        if RewardBall._original_reward_image is not None:
+            return
+        img_path = os.path.join("image", "ball15.png")
+        RewardBall._original_reward_image = AssetRegistry.image(img_path)
+        for radius in range(cls.min_radius, cls.max_radius + 1, cls.growth_factor):
+            cls._get_sized(radius)
+        cls._get_sized(cls.max_radius)
+
+    @classmethod
+    def _get_sized(cls, radius):
+        """查表取得指定半徑的 (圖片, 遮罩)；表中沒有時才建立"""
+        radius = int(radius)
+        entry = RewardBall._size_pyramid.get(radius)
+        if entry is None:
+            image = cls._get_scaled_image(radius)
+            entry = (image, pygame.mask.from_surface(image))
+            RewardBall._size_pyramid[radius] = entry
+        return entry
+
+    @classmethod
+    def _get_scaled(cls, image_index, radius):
+        """覆寫父類別：獎勵球一律使用高解析度原圖的尺寸表"""
+        return cls._get_sized(radius)
+
+    @classmethod
+    def _get_scaled_image(cls, target_radius):
         """從高解析度原圖生成目標尺寸的圖片"""
         # 計算在高解析度圖中的對應尺寸
-        src_radius = int(target_radius * self.scale_factor)
+        src_radius = int(target_radius * cls.scale_factor)
         src_size = src_radius * 2
         
         # 從原圖裁剪中心區域（避免邊緣變形）
@@ -189,28 +319,22 @@ class RewardBall(Ball):
             (target_radius * 2, target_radius * 2)
         )
 
-    def draw(self, win):
-        """覆寫draw方法，顯示?而不是HP"""
-        img_rect = self.current_image.get_rect(center=(int(self.x), int(self.y)))
-        win.blit(self.current_image, img_rect)
-        
-        # 繪製?文字（居中）
-        text = self.font.render("?", True, (255, 255, 255))
-        text_rect = text.get_rect(center=(self.x, self.y))
-        win.blit(text, text_rect)
+    def set_radius(self, radius):
+        """改變半徑並從尺寸表換上對應的圖片與遮罩"""
+        self.radius = radius
+        self.current_image, self.mask = self._get_sized(radius)
 
-    def is_hit(self, bullet):
-        hit = super().is_hit(bullet)
-        if hit:
-            # 被擊中時增加半徑
-            new_radius = min(int(self.radius + self.growth_factor), self.max_radius)
-            
-            if new_radius != self.radius:
-                self.radius = new_radius
-                # 從高解析度原圖生成新尺寸圖片
-                self.current_image = self._get_scaled_image(self.radius)
-                self.mask = pygame.mask.from_surface(self.current_image)
-        return hit
+    def label_text(self):
+        """覆寫label_text方法，顯示?而不是HP"""
+        return "?"
+
+    def on_hit(self):
+        # 被擊中時增加半徑
+        new_radius = min(int(self.radius + self.growth_factor), self.max_radius)
+        
+        if new_radius != self.radius:
+            # 直接查表，不在碰撞迴圈裡縮放圖片
+            self.set_radius(new_radius)
 
     def split(self):
         """覆寫split方法，獎勵球不會分裂"""
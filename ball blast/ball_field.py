@@ -0,0 +1,176 @@
+# ball_field.py
+import numpy as np
+
+# BallField 以陣列保存的物理欄位（Ball 上同名屬性會讀寫這些陣列）
+PHYSICS_FIELDS = ('x', 'y', 'dx', 'dy', 'radius', 'gravity', 'elasticity')
+# 上一次 step 前的位置，只用於畫面內插
+PREVIOUS_FIELDS = ('prev_x', 'prev_y')
+# 與槽位對應的 ball_id（網路同步時以 id 找到陣列中的位置）
+ID_FIELD = 'ids'
+
+# 地面高度：球底部碰到 screen_height - FLOOR_MARGIN 時反彈
+FLOOR_MARGIN = 100
+BOUNCE_SPEED = -10
+# 新球的重力加速度與側邊反彈的彈性係數
+GRAVITY = 0.1
+ELASTICITY = 0.95
+
+
+class BallField:
+    """
+    以 NumPy 陣列保存所有球的物理狀態，step() 一次更新全部的球。
+    - 用法與 list 相同（append / extend / remove / 迭代 / 切片複製）
+    - 加入後 Ball 的 x, y, dx, dy, radius 等屬性直接讀寫陣列中的欄位
+    - 移除時把數值寫回 Ball 本身，被移除的球仍可正常使用（例如 split）
+    - prev_x / prev_y 記錄上一步的位置，positions(alpha) 可取得兩步之間的內插位置
+    - 還沒有編號的球加入時配發 ball_id（從 first_id 起遞增，不重複使用）；ids 陣列記錄每個槽位的 id
+    """
+
+    def __init__(self, capacity=64, first_id=1):
+        self._balls = []   # 第 i 個位置的球，與陣列索引一一對應
+        self.next_id = first_id
+        for name in PHYSICS_FIELDS + PREVIOUS_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        self.ids = np.zeros(capacity, dtype=np.int64)
+
+    # ---------- list 介面 ----------
+    def __len__(self):
+        return len(self._balls)
+
+    def __iter__(self):
+        return iter(self._balls)
+
+    def __getitem__(self, index):
+        # self.balls[:] 之類的切片回傳一般 list（碰撞迴圈用的快照）
+        return self._balls[index]
+
+    def __contains__(self, ball):
+        return ball._field is self
+
+    def append(self, ball):
+        """加入一顆球，把它的物理狀態搬進陣列"""
+        if ball._field is not None:
+            raise ValueError("ball already belongs to a BallField")
+        if ball.ball_id is None:
+            ball.ball_id = self.next_id
+            self.next_id += 1
+        slot = len(self._balls)
+        self._reserve(slot + 1)
+        for name in PHYSICS_FIELDS:
+            getattr(self, name)[slot] = getattr(ball, name)
+        # 新加入的球沒有上一步，內插時就停在目前位置
+        self.prev_x[slot] = self.x[slot]
+        self.prev_y[slot] = self.y[slot]
+        self.ids[slot] = ball.ball_id
+        self._balls.append(ball)
+        ball._field = self
+        ball._slot = slot
+
+    def extend(self, balls):
+        for ball in balls:
+            self.append(ball)
+
+    def remove(self, ball):
+        """移除一顆球（尾端交換，O(1)）；數值寫回球本身"""
+        if ball._field is not self:
+            raise ValueError("ball is not in this BallField")
+        slot = ball._slot
+        self._detach(ball)
+
+        last = len(self._balls) - 1
+        if slot != last:
+            moved = self._balls[last]
+            for name in PHYSICS_FIELDS + PREVIOUS_FIELDS + (ID_FIELD,):
+                arr = getattr(self, name)
+                arr[slot] = arr[last]
+            self._balls[slot] = moved
+            moved._slot = slot
+        self._balls.pop()
+
+    def clear(self):
+        for ball in self._balls:
+            self._detach(ball)
+        self._balls = []
+
+    def _detach(self, ball):
+        slot = ball._slot
+        values = [getattr(self, name)[slot].item() for name in PHYSICS_FIELDS]
+        ball._field = None
+        ball._slot = -1
+        for name, value in zip(PHYSICS_FIELDS, values):
+            setattr(ball, name, value)
+
+    def _reserve(self, needed):
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        n = len(self._balls)
+        for name in PHYSICS_FIELDS + PREVIOUS_FIELDS + (ID_FIELD,):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:n] = old[:n]
+            setattr(self, name, grown)
+
+    def slots_of(self, ids):
+        """ids 中每個編號目前所在的槽位；回傳 (slots, found)，找不到的 found 為 False"""
+        n = len(self._balls)
+        ids = np.asarray(ids, dtype=np.int64)
+        if n == 0:
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        order = np.argsort(self.ids[:n], kind='stable')
+        sorted_ids = self.ids[:n][order]
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), n - 1)
+        return order[pos], sorted_ids[pos] == ids
+
+    # ---------- 物理 ----------
+    def step(self, screen_width, screen_height, dt=1.0):
+        """
+        與 Ball.move 相同的重力、位移與邊界反彈，一次套用在所有球上。
+        dt 以 60 FPS 的一幀為 1（dt=1 時結果與 Ball.move 完全相同）。
+        """
+        n = len(self._balls)
+        if n == 0:
+            return
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        advance(self.x[:n], self.y[:n], self.dx[:n], self.dy[:n], self.radius[:n],
+                self.gravity[:n], self.elasticity[:n], screen_width, screen_height, dt)
+
+    # ---------- 繪製 ----------
+    def positions(self, alpha=1.0):
+        """
+        每顆球的繪製位置 [(x, y), ...]，順序與迭代順序相同。
+        alpha=1 為目前位置，alpha=0 為上一步的位置，介於之間則線性內插。
+        """
+        n = len(self._balls)
+        x, y = self.x[:n], self.y[:n]
+        if alpha < 1.0:
+            x = self.prev_x[:n] + (x - self.prev_x[:n]) * alpha
+            y = self.prev_y[:n] + (y - self.prev_y[:n]) * alpha
+        return list(zip(x.tolist(), y.tolist()))
+
+
+def advance(x, y, dx, dy, radius, gravity, elasticity, screen_width, screen_height, dt=1.0):
+    """
+    球的一步物理（直接修改傳入的陣列）：重力、位移、底部與側邊反彈。
+    BallField.step 與網路同步的位置預測（snapshot.py）共用，兩邊算出的結果完全相同。
+    """
+    # 應用重力並更新位置
+    dy += gravity * dt
+    x += dx * dt
+    y += dy * dt
+
+    # 底部反彈
+    floor = screen_height - FLOOR_MARGIN
+    hit_floor = y + radius >= floor
+    y[hit_floor] = floor - radius[hit_floor]
+    dy[hit_floor] = BOUNCE_SPEED
+
+    # 側邊反彈
+    hit_left = x - radius <= 0
+    hit_right = ~hit_left & (x + radius >= screen_width)
+    hit_wall = hit_left | hit_right
+    x[hit_left] = radius[hit_left]
+    x[hit_right] = screen_width - radius[hit_right]
+    dx[hit_wall] = -dx[hit_wall] * elasticity[hit_wall]
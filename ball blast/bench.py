@@ -0,0 +1,505 @@
+# bench.py - 效能量測腳本（不開視窗，使用 SDL dummy driver）
+#
+# 用法（在 ball blast 資料夾內執行）：
+#   python bench.py split [--count 10000]
+#   python bench.py render [--balls 250] [--frames 300]
+#   python bench.py bullets [--counts 1000 10000 100000] [--frames 30]
+#   python bench.py physics [--counts 100 500 2000] [--frames 300]
+#   python bench.py collisions [--balls 300] [--bullets 2000] [--frames 30] [--modes mask circle]
+#   python bench.py parity [--samples 20000]
+#   python bench.py sim [--ticks 36000] [--spawn-interval 40]
+#   python bench.py replay <檔案> [--record] [--ticks 3600] [--repeat 3]
+#   python bench.py scenarios [--names ...] [--frames 300] [--json out.json] [--baseline base.json]
+#   python bench.py dirty [--names ...] [--frames 300] [--thresholds 0 0.4 1]
+#     （在實機上量測時可指定 SDL_VIDEODRIVER=x11 SDL_FRAMEBUFFER_ACCELERATION=0，使用軟體 SDL 視窗）
+#   python bench.py codec [--balls 10 100 1000] [--bullets 200] [--repeat 200]
+#   python bench.py snapshots [--balls 10 100 1000] [--ticks 600] [--latency 3]
+#   python bench.py netrate [--balls 100] [--rates 60 30 20] [--ticks 600] [--latency 3]
+#
+# 整個遊戲迴圈的情境測試在 bench_scenarios.py，多人同步的量測在 bench_network.py，
+# 共用的設定（SDL dummy driver、畫面大小、產生測試用的球）在 bench_common.py。
+import os
+import sys
+import time
+import random
+import argparse
+
+from bench_common import SCREEN_WIDTH, SCREEN_HEIGHT, pygame, init_pygame, timed, make_balls
+import bench_scenarios
+import bench_network
+
+
+# ---------- 分裂 ----------
+def _legacy_split(ball):
+    """舊版分裂流程：先建一顆完整的 Ball，再把圖片與遮罩重做一次"""
+    from ball import Ball
+    ball.splits_remaining -= 1
+    new_radius = ball.radius // 1.4
+    new_hp = max(1, ball.original_hp // 2)
+    children = []
+    for x in (ball.x - new_radius, ball.x + new_radius):
+        child = Ball(x, ball.y, new_radius, new_hp)
+        child.max_splits = ball.max_splits
+        child.splits_remaining = ball.splits_remaining
+        child.current_image = pygame.transform.scale(
+            ball.current_image, (new_radius * 2, new_radius * 2))
+        child.mask = pygame.mask.from_surface(child.current_image)
+        children.append(child)
+    return children
+
+
+def _split_many(count, split):
+    from ball import Ball
+    random.seed(0)
+    done = 0
+    while done < count:
+        ball = Ball(300, 300, random.randint(40, 70), 30, max_splits=3)
+        # 一路分裂到不能再分為止（與遊戲中的連鎖分裂相同）
+        queue = [ball]
+        while queue and done < count:
+            current = queue.pop()
+            if current.radius <= 10 or current.splits_remaining <= 0:
+                continue
+            queue.extend(split(current))
+            done += 1
+    return done
+
+
+def bench_split(count):
+    from ball import Ball
+    init_pygame()
+    Ball._load_images()
+    cache_size = Ball._scaled_cache.maxsize
+
+    # 舊流程：沒有快取，且每個子球做兩次 scale + mask
+    Ball._scaled_cache.maxsize = 0
+    Ball._scaled_cache.clear()
+    before, _ = timed(_split_many, count, _legacy_split)
+
+    # 新流程：(圖片, 半徑) 快取 + 直接沿用母球圖片編號
+    Ball._scaled_cache.maxsize = cache_size
+    Ball._scaled_cache.clear()
+    after, _ = timed(_split_many, count, lambda ball: ball.split())
+
+    print(f"split x{count}")
+    print(f"  before: {before * 1000:8.1f} ms  ({before / count * 1e6:6.1f} us/split)")
+    print(f"  after : {after * 1000:8.1f} ms  ({after / count * 1e6:6.1f} us/split)")
+    print(f"  speedup: {before / after:.1f}x   cache: {Ball._scaled_cache.stats()}")
+
+
+# ---------- 繪製 ----------
+def _legacy_draw(ball, win):
+    """舊版 Ball.draw：每一幀都重新渲染 HP 文字"""
+    img_rect = ball.current_image.get_rect(center=(int(ball.x), int(ball.y)))
+    win.blit(ball.current_image, img_rect)
+    text = ball.font.render(ball.label_text(), True, (255, 255, 255))
+    win.blit(text, text.get_rect(center=(ball.x, ball.y)))
+
+
+def _draw_frames(screen, balls, frames, draw):
+    for frame in range(frames):
+        # 每幀讓一部分球掉血，模擬實際戰鬥中的 HP 變化
+        for ball in balls[frame % 7::7]:
+            ball.hp = max(1, ball.hp - 1)
+        screen.fill((0, 0, 0))
+        for ball in balls:
+            draw(ball, screen)
+
+
+def bench_render(ball_count, frames):
+    from ball import Ball
+    screen = init_pygame()
+
+    before, _ = timed(_draw_frames, screen, make_balls(ball_count), frames, _legacy_draw)
+    Ball._label_cache.clear()
+    after, _ = timed(_draw_frames, screen, make_balls(ball_count), frames,
+                      lambda ball, win: ball.draw(win))
+
+    print(f"render {ball_count} balls x {frames} frames")
+    print(f"  before: {before / frames * 1000:6.2f} ms/frame")
+    print(f"  after : {after / frames * 1000:6.2f} ms/frame")
+    print(f"  speedup: {before / after:.1f}x   labels: {Ball._label_cache.stats()}")
+
+
+# ---------- 子彈 ----------
+def _object_bullets(count, frames, screen):
+    """舊版：每顆子彈一個物件，各自 move()、檢查出界、draw()"""
+    from bullet import Bullet
+    rng = random.Random(0)
+    bullets = [Bullet(rng.randint(0, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT))
+               for _ in range(count)]
+    update = draw = 0.0
+    for frame in range(frames):
+        start = time.perf_counter()
+        alive = []
+        for bullet in bullets:
+            bullet.move()
+            if bullet.y < 0:
+                # 出界的子彈換成底部新發射的一顆，維持子彈數量
+                bullet = Bullet(rng.randint(0, SCREEN_WIDTH), SCREEN_HEIGHT - 1)
+            alive.append(bullet)
+        bullets = alive
+        middle = time.perf_counter()
+        for bullet in bullets:
+            bullet.draw(screen)
+        update += middle - start
+        draw += time.perf_counter() - middle
+    return update, draw
+
+
+def _field_bullets(count, frames, screen):
+    from bullet_field import BulletField
+    import numpy as np
+    rng = np.random.default_rng(0)
+    field = BulletField(capacity=count)
+    field.spawn_many(rng.integers(0, SCREEN_WIDTH, count),
+                     rng.integers(0, SCREEN_HEIGHT, count))
+    update = draw = 0.0
+    for frame in range(frames):
+        start = time.perf_counter()
+        field.step()
+        # 補回被移除的子彈，維持子彈數量
+        missing = count - len(field)
+        if missing:
+            field.spawn_many(rng.integers(0, SCREEN_WIDTH, missing),
+                             np.full(missing, SCREEN_HEIGHT - 1))
+        middle = time.perf_counter()
+        field.draw(screen)
+        update += middle - start
+        draw += time.perf_counter() - middle
+    return update, draw, field.stats()
+
+
+def bench_bullets(counts, frames):
+    screen = init_pygame()
+    print(f"bullets x {frames} frames, ms/frame (update = move + cull)")
+    for count in counts:
+        obj_update, obj_draw = _object_bullets(count, frames, screen)
+        field_update, field_draw, stats = _field_bullets(count, frames, screen)
+        print(f"  {count:>7}: update objects {obj_update / frames * 1000:8.2f}  "
+              f"field {field_update / frames * 1000:6.2f} ({obj_update / field_update:5.0f}x)   "
+              f"draw objects {obj_draw / frames * 1000:8.2f}  field {field_draw / frames * 1000:8.2f}   "
+              f"slot reuse {stats['reuse_rate']:.1%}  grown {stats['grown']}  "
+              f"{stats['bytes_per_bullet']} B/bullet")
+
+
+# ---------- 球體物理 ----------
+def bench_physics(counts, frames):
+    from ball_field import BallField
+    init_pygame()
+    print(f"ball physics x {frames} frames, ms/frame")
+    for count in counts:
+        per_ball = make_balls(count, seed=1)
+        in_field = make_balls(count, seed=1)
+        for a, b in zip(per_ball, in_field):
+            b.dx, b.dy = a.dx, a.dy   # 初速由全域 random 決定，這裡對齊
+        field = BallField()
+        field.extend(in_field)
+
+        before, _ = timed(_move_each, per_ball, frames)
+        after, _ = timed(_step_field, field, frames)
+
+        # 與逐顆計算的結果比對
+        error = max(max(abs(a.x - b.x), abs(a.y - b.y), abs(a.dx - b.dx), abs(a.dy - b.dy))
+                    for a, b in zip(per_ball, in_field))
+        print(f"  {count:>6}: per-ball {before / frames * 1000:7.3f}   "
+              f"field {after / frames * 1000:7.3f}   ({before / after:4.1f}x)   "
+              f"max error {error:.2e}")
+
+
+def _move_each(balls, frames):
+    for frame in range(frames):
+        for ball in balls:
+            ball.move(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+
+def _step_field(field, frames):
+    for frame in range(frames):
+        field.step(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+
+# ---------- 碰撞 ----------
+def _collision_game(ball_count, bullet_count, strategy, mode="mask", seed=2):
+    """建立一個只有球與子彈的單人 GameState；球的 HP 很高，不會在量測中消失"""
+    from game_state import GameState
+    from ball_field import BallField
+    import numpy as np
+
+    game = GameState(SCREEN_WIDTH, SCREEN_HEIGHT, multiplayer=False,
+                     collision_strategy=strategy, collision_mode=mode)
+    game.balls = BallField()
+    for ball in make_balls(ball_count, seed=seed):
+        ball.hp = 10 ** 9
+        game.balls.append(ball)
+    rng = np.random.default_rng(seed)
+    bullets = (rng.uniform(0, SCREEN_WIDTH, bullet_count),
+               rng.uniform(0, SCREEN_HEIGHT, bullet_count))
+    return game, bullets
+
+
+def _collision_frames(game, bullets, frames, collide=None):
+    """每幀重新放入同一批子彈後做一次碰撞檢測，回傳每幀沒被擊中的子彈"""
+    remaining = []
+    for frame in range(frames):
+        game.bullets.clear()
+        game.bullets.spawn_many(*bullets)
+        if collide is None:
+            game.handle_collisions()
+        else:
+            collide(game)
+        remaining.append(sorted(game.bullets.positions()))
+    return remaining
+
+
+def bench_collisions(ball_count, bullet_count, frames, strategies, modes=("mask",)):
+    init_pygame()
+    print(f"collisions: {ball_count} balls x {bullet_count} bullets, {frames} frames")
+    timings = {}
+    for mode in modes:
+        print(f"  collision_mode={mode!r}")
+        reference = None   # 同一個精確判定模式下，各粗篩策略的結果應完全相同
+        # "circle" 整輪以 NumPy 計算，不使用 broad_phase，只需量一次
+        for strategy in (strategies if mode == "mask" else strategies[:1]):
+            game, bullets = _collision_game(ball_count, bullet_count, strategy, mode)
+            elapsed, remaining = timed(_collision_frames, game, bullets, frames)
+            if reference is None:
+                reference = remaining
+            timings[(strategy, mode)] = elapsed / frames
+            if mode != "mask":
+                print(f"    {'numpy':>6}: {elapsed / frames * 1000:8.2f} ms/frame")
+                continue
+            stats = game.broad_phase.stats()
+            print(f"    {strategy:>6}: {elapsed / frames * 1000:8.2f} ms/frame   "
+                  f"pairs {stats['candidate_pairs'] // frames:>8} / {stats['total_pairs'] // frames:<8} "
+                  f"(pruned {stats['pruned']:.1%})   same hits: {remaining == reference}")
+    strategy, mode = min(timings, key=timings.get)
+    if mode == "mask":
+        print(f"  fastest for these counts: Game(..., collision_strategy={strategy!r})")
+    else:
+        print(f"  fastest for these counts: Game(..., collision_mode={mode!r})")
+    return strategy, mode
+
+
+# ---------- 精確判定一致性 ----------
+def _parity_report(label, mask_hits, circle_hits):
+    total = len(mask_hits)
+    both = sum(m and c for m, c in zip(mask_hits, circle_hits))
+    only_mask = sum(m and not c for m, c in zip(mask_hits, circle_hits))
+    only_circle = sum(c and not m for m, c in zip(mask_hits, circle_hits))
+    agree = total - only_mask - only_circle
+    print(f"  {label:<14} {total:>7} pairs   agree {agree / total:7.2%}   "
+          f"hits {both + only_mask:>6}   missed by circle {only_mask:>5}   extra in circle {only_circle:>5}")
+    return agree / total
+
+
+def bench_parity(samples, seed=3):
+    """
+    比較 "mask" 與 "circle" 兩種精確判定：在球的周圍隨機放子彈 / 大砲，
+    統計兩者結果不同的比例（差異只應出現在圖片邊緣幾個像素內）。
+    """
+    from collision import NARROW_MASK, NARROW_CIRCLE, mask_boxes, circle_hits_box
+    from bullet_field import BulletField
+    from cannon import Cannon
+
+    init_pygame()
+    rng = random.Random(seed)
+    balls = make_balls(200, seed=seed)
+    bullet_mask = BulletField().mask
+    print(f"parity: mask vs circle, {samples} samples each")
+
+    # 球 vs 子彈：子彈中心落在球的包圍盒（加上子彈大小）附近
+    mask_hits, circle_hits = [], []
+    for _ in range(samples):
+        ball = rng.choice(balls)
+        reach = ball.current_image.get_width() // 2 + 12
+        x = ball.x + rng.uniform(-reach, reach)
+        y = ball.y + rng.uniform(-reach, reach)
+        mask_hits.append(ball.overlaps_at(x, y, bullet_mask, NARROW_MASK))
+        circle_hits.append(ball.overlaps_at(x, y, bullet_mask, NARROW_CIRCLE))
+    ball_rate = _parity_report("ball/bullet", mask_hits, circle_hits)
+
+    # 球 vs 大砲：與 Game.check_game_over 相同的計算方式
+    cannon = Cannon(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100)
+    boxes = mask_boxes(cannon.mask)
+    mask_hits, circle_hits = [], []
+    for _ in range(samples):
+        ball = rng.choice(balls)
+        reach = ball.current_image.get_width() // 2
+        cx = int(rng.uniform(cannon.rect.left - reach, cannon.rect.right + reach))
+        cy = int(rng.uniform(cannon.rect.top - reach, cannon.rect.bottom + reach))
+        ball_rect = ball.current_image.get_rect(center=(cx, cy))
+        offset = (ball_rect.left - cannon.rect.left, ball_rect.top - cannon.rect.top)
+        mask_hits.append(cannon.mask.overlap(ball.mask, offset) is not None)
+        circle_hits.append(any(
+            circle_hits_box(cx, cy, ball.radius, cannon.rect.left + l, cannon.rect.top + t,
+                            cannon.rect.left + r, cannon.rect.top + b)
+            for l, t, r, b in boxes))
+    cannon_rate = _parity_report("ball/cannon", mask_hits, circle_hits)
+
+    # Game 的向量化 "circle" 判定應與逐顆呼叫 overlaps_at 的結果完全相同
+    game, bullets = _collision_game(300, 2000, "brute", NARROW_CIRCLE, seed=seed)
+    vectorized = _collision_frames(game, bullets, 3)
+    game, bullets = _collision_game(300, 2000, "brute", NARROW_CIRCLE, seed=seed)
+    scalar = _collision_frames(game, bullets, 3, _scalar_circle_collisions)
+    print(f"  vectorized circle == per-pair circle: {vectorized == scalar}")
+    return ball_rate, cannon_rate
+
+
+def _scalar_circle_collisions(game):
+    """Game.handle_collisions（單人、"circle"）的逐一判定版本，作為對照組"""
+    from collision import NARROW_CIRCLE
+    field = game.bullets
+    idx = field.indices().tolist()
+    xs, ys = field.x[idx].tolist(), field.y[idx].tolist()
+    live = [True] * len(idx)
+    for ball in game.balls[:]:
+        for k in range(len(idx)):
+            if live[k] and ball.is_hit_at(xs[k], ys[k], field.mask, NARROW_CIRCLE):
+                live[k] = False
+                field.kill(idx[k])
+                break
+    field.compact()
+
+
+# ---------- 無視窗模擬 ----------
+def _chase_lowest_ball(state):
+    """簡單的機器人：大砲移到最低（最危險）那顆球的下方射擊，球太低時改為閃開"""
+    if not state.balls:
+        return False, False
+    lowest = max(state.balls, key=lambda ball: ball.y)
+    x = state.my_cannon.x
+    if lowest.y > state.height - 350:
+        return lowest.x >= x, lowest.x < x
+    return lowest.x < x - 5, lowest.x > x + 5
+
+
+def _sim_games(state, ticks):
+    """跑滿 ticks 步；遊戲結束就重新開始，回傳玩了幾局"""
+    games, done = 1, 0
+    while done < ticks:
+        done += state.run_headless(ticks - done, _chase_lowest_ball)
+        if not state.running and done < ticks:
+            state.reset_game_state()
+            games += 1
+    return games
+
+
+def bench_sim(ticks, spawn_interval, seed=4):
+    """不建立視窗，以 GameState 全速模擬，量測每秒可跑幾步"""
+    from game_state import GameState
+
+    pygame.init()   # 不呼叫 set_mode：圖片不經 convert，也不需要字體
+    random.seed(seed)
+    state = GameState(SCREEN_WIDTH, SCREEN_HEIGHT)
+    state.level_config = dict(state.level_config, spawn_interval=spawn_interval,
+                              ball_hp_min=1, ball_hp_max=5)
+    elapsed, games = timed(_sim_games, state, ticks)
+    print(f"sim: {ticks} ticks in {elapsed:.2f} s  ({ticks / elapsed:,.0f} ticks/s, "
+          f"{ticks / elapsed / state.sim_rate:.1f}x real time), {games} games")
+    print(f"  display surface: {pygame.display.get_surface()}   "
+          f"last game: score {state.score}, balls {len(state.balls)}")
+    return ticks / elapsed
+
+
+# ---------- 重播 ----------
+def _record_bot_replay(ticks, seed):
+    """以機器人玩一局（每 600 步免費抽一張卡）並錄成 Replay"""
+    from game_state import GameState
+    from gacha import GachaSystem
+    from replay import ReplayRecorder
+
+    state = GameState(SCREEN_WIDTH, SCREEN_HEIGHT, seed=seed)
+    state.level_config = dict(state.level_config, spawn_interval=40, ball_hp_min=1, ball_hp_max=5)
+    gacha = GachaSystem(state)
+    recorder = ReplayRecorder(state)
+    while state.running and state.sim_ticks < ticks:
+        if state.sim_ticks and state.sim_ticks % 600 == 0:
+            gacha.draw_card_for_free()
+        state.step(*_chase_lowest_ball(state))
+    return recorder.finish()
+
+
+def bench_replay(path, record, ticks, repeat, seed=5):
+    """全速重播同一局並檢查最後狀態雜湊；--record 先以機器人錄一局"""
+    from replay import Replay, play
+
+    pygame.init()   # 與 sim 相同，不建立視窗
+    if record:
+        replay = _record_bot_replay(ticks, seed)
+        replay.save(path)
+        print(f"recorded {len(replay)} ticks, {len(replay.events)} card events "
+              f"-> {path} ({os.path.getsize(path)} bytes)")
+    replay = Replay.load(path)
+    print(f"replay: {path}  seed {replay.seed}  {len(replay)} ticks  hash {replay.final_hash}")
+    best = None
+    for run in range(repeat):
+        elapsed, (state, ok) = timed(play, replay)
+        best = elapsed if best is None else min(best, elapsed)
+        print(f"  run {run + 1}: {elapsed * 1000:8.1f} ms  ({len(replay) / elapsed:,.0f} ticks/s)   "
+              f"score {state.score}   hash ok: {ok}")
+        if not ok:
+            print(f"  MISMATCH: got {state.state_hash()}")
+            return None
+    print(f"  best: {best * 1000:.1f} ms")
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ball Blast benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_split = sub.add_parser("split", help="Ball 分裂的建構成本")
+    p_split.add_argument("--count", type=int, default=10000)
+    p_split.set_defaults(run=lambda args: bench_split(args.count))
+
+    p_render = sub.add_parser("render", help="大量球體同時在畫面上時的繪製成本")
+    p_render.add_argument("--balls", type=int, default=250)
+    p_render.add_argument("--frames", type=int, default=300)
+    p_render.set_defaults(run=lambda args: bench_render(args.balls, args.frames))
+
+    p_bullets = sub.add_parser("bullets", help="大量子彈的移動、移除與繪製")
+    p_bullets.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    p_bullets.add_argument("--frames", type=int, default=30)
+    p_bullets.set_defaults(run=lambda args: bench_bullets(args.counts, args.frames))
+
+    p_physics = sub.add_parser("physics", help="球體重力與反彈（逐顆 vs BallField）")
+    p_physics.add_argument("--counts", type=int, nargs="+", default=[100, 500, 2000])
+    p_physics.add_argument("--frames", type=int, default=300)
+    p_physics.set_defaults(run=lambda args: bench_physics(args.counts, args.frames))
+
+    p_coll = sub.add_parser("collisions", help="子彈與球的碰撞檢測（各粗篩策略）")
+    p_coll.add_argument("--balls", type=int, default=300)
+    p_coll.add_argument("--bullets", type=int, default=2000)
+    p_coll.add_argument("--frames", type=int, default=30)
+    p_coll.add_argument("--strategies", nargs="+", default=["brute", "grid", "sweep"])
+    p_coll.add_argument("--modes", nargs="+", default=["mask", "circle"])
+    p_coll.set_defaults(run=lambda args: bench_collisions(args.balls, args.bullets, args.frames,
+                                                          args.strategies, args.modes))
+
+    p_parity = sub.add_parser("parity", help="遮罩與圓形兩種精確判定的結果差異")
+    p_parity.add_argument("--samples", type=int, default=20000)
+    p_parity.set_defaults(run=lambda args: bench_parity(args.samples))
+
+    p_sim = sub.add_parser("sim", help="無視窗的 GameState 全速模擬（機器人操作）")
+    p_sim.add_argument("--ticks", type=int, default=36000)
+    p_sim.add_argument("--spawn-interval", type=int, default=40)
+    p_sim.set_defaults(run=lambda args: bench_sim(args.ticks, args.spawn_interval))
+
+    p_replay = sub.add_parser("replay", help="全速重播錄好的對局並驗證狀態雜湊")
+    p_replay.add_argument("path")
+    p_replay.add_argument("--record", action="store_true", help="先以機器人錄一局存到 path")
+    p_replay.add_argument("--ticks", type=int, default=3600)
+    p_replay.add_argument("--repeat", type=int, default=3)
+    p_replay.set_defaults(run=lambda args: bench_replay(args.path, args.record, args.ticks, args.repeat))
+
+    bench_scenarios.add_commands(sub)
+    bench_network.add_commands(sub)
+
+    args = parser.parse_args(argv)
+    result = args.run(args)
+    # 只有 scenarios（與基準比較）的回傳值是結束代碼
+    return result if args.command == "scenarios" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# bench_common.py - 效能量測共用的設定與工具（bench.py、bench_scenarios.py、bench_network.py）
+import os
+import time
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+SCREEN_WIDTH = 600
+SCREEN_HEIGHT = 800
+
+
+def init_pygame():
+    """初始化 pygame 並建立（隱藏的）顯示畫面，convert() 需要它"""
+    pygame.init()
+    return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def best_us(func, repeat):
+    """重複 repeat 次取最快的一次（微秒）與結果"""
+    best = float("inf")
+    for _ in range(repeat):
+        elapsed, result = timed(func)
+        best = min(best, elapsed)
+    return best * 1e6, result
+
+
+def summarize(samples):
+    """每階段的 mean / p95 / p99（毫秒）"""
+    import numpy as np
+    ms = np.asarray(samples) * 1000
+    return {
+        'mean': float(ms.mean()),
+        'p95': float(np.percentile(ms, 95)),
+        'p99': float(np.percentile(ms, 99)),
+    }
+
+
+def make_balls(count, seed=0):
+    """count 顆散布在畫面上半部的球，每 10 顆有一顆獎勵球"""
+    from ball import Ball, RewardBall
+    rng = random.Random(seed)
+    random.seed(seed)   # Ball 的圖片與初速使用全域 random
+    balls = []
+    for i in range(count):
+        x = rng.randint(50, SCREEN_WIDTH - 50)
+        y = rng.randint(50, SCREEN_HEIGHT - 200)
+        if i % 10 == 0:
+            balls.append(RewardBall(x, y))
+        else:
+            balls.append(Ball(x, y, rng.randint(10, 70), rng.randint(1, 70)))
+    return balls
+
@@ -0,0 +1,234 @@
+# bench_network.py - 多人同步的量測（由 bench.py 的 codec / snapshots / netrate 指令執行）
+#
+# 主機與用戶端是兩個 GameState，訊息經過 state_codec 編解碼後放進延遲佇列，
+# 不經過 socket，量到的是編碼大小、同步頻率與用戶端的處理時間。
+import time
+import pickle
+from collections import deque
+
+import numpy as np
+
+from bench_common import SCREEN_WIDTH, SCREEN_HEIGHT, init_pygame, best_us, make_balls
+from ball import Ball, RewardBall
+from ball_field import BallField
+from game_state import GameState, MY_OWNERS
+from state_codec import encode_state, decode_state, KIND_REWARD
+
+
+def _host_and_client(ball_count, **options):
+    """
+    一對多人模式的 GameState（主機產生球、用戶端重建），主機先放入 ball_count 顆球；
+    一般球的 HP 很高，被擊中只會扣血（變動事件），不會在量測中消失。
+    """
+    host = GameState(SCREEN_WIDTH, SCREEN_HEIGHT, multiplayer=True, player_id=0, seed=ball_count, **options)
+    client = GameState(SCREEN_WIDTH, SCREEN_HEIGHT, multiplayer=True, player_id=1, seed=ball_count + 1,
+                       **options)
+    host.balls.extend(make_balls(ball_count, seed=ball_count))
+    for ball in host.balls:
+        if type(ball) is Ball:
+            ball.hp = 10 ** 6
+    return host, client
+
+
+def _deliver(pending, state, tick):
+    """把延遲佇列中到了 tick 的訊息交給 state"""
+    while pending and pending[0][0] <= tick:
+        state.update_from_network(decode_state(pending.popleft()[1]))
+
+
+# ---------- 網路狀態編碼 ----------
+def _legacy_player_state(game):
+    """舊版 get_player_state：每顆球、每顆子彈一個 dict（之後整個 pickle）"""
+    state = {
+        'cannon_x': game.my_cannon.x,
+        'bullets': [{'x': x, 'y': y} for x, y in game.bullets.positions(MY_OWNERS)],
+        'score': game.score,
+    }
+    balls = []
+    for ball in game.balls:
+        info = {'x': ball.x, 'y': ball.y, 'radius': ball.radius, 'dx': ball.dx, 'dy': ball.dy,
+                'type': 'reward' if isinstance(ball, RewardBall) else 'normal'}
+        if not isinstance(ball, RewardBall):
+            info.update({'hp': ball.hp, 'max_splits': ball.max_splits,
+                         'splits_remaining': ball.splits_remaining})
+        balls.append(info)
+    state['balls'] = balls
+    return state
+
+
+def bench_codec(ball_counts, bullet_count, repeat):
+    """主機每次同步送出的狀態：舊的 dict + pickle 與 state_codec 的大小與編解碼時間"""
+    init_pygame()
+    print(f"{bullet_count} bullets, best of {repeat}")
+    for count in ball_counts:
+        game = GameState(SCREEN_WIDTH, SCREEN_HEIGHT, multiplayer=True, player_id=0)
+        game.balls = BallField()
+        game.balls.extend(make_balls(count))
+        rng = np.random.default_rng(count)
+        game.bullets.spawn_many(rng.uniform(0, SCREEN_WIDTH, bullet_count),
+                                rng.uniform(0, SCREEN_HEIGHT, bullet_count))
+
+        pickle_enc, pickled = best_us(lambda: pickle.dumps(_legacy_player_state(game)), repeat)
+        pickle_dec, _ = best_us(lambda: pickle.loads(pickled), repeat)
+        binary_enc, encoded = best_us(lambda: encode_state(game.get_player_state()), repeat)
+        binary_dec, _ = best_us(lambda: decode_state(encoded), repeat)
+        print(f"  {count:5d} balls   pickle {len(pickled):7d} B  enc {pickle_enc:8.1f} us  dec {pickle_dec:8.1f} us"
+              f"   |   binary {len(encoded):6d} B  enc {binary_enc:7.1f} us  dec {binary_dec:6.1f} us"
+              f"   ({len(pickled) / len(encoded):.1f}x smaller)")
+
+
+# ---------- 差異快照 ----------
+def _snapshot_stream(ball_count, ticks, latency, keyframe_interval):
+    """
+    主機 -> 用戶端的同步串流：每步送一則狀態，雙向各延遲 latency 步。
+    獎勵球先長大過，第一張 keyframe 就含有半徑不是預設值的球；
+    用戶端每套用一張快照，就檢查球的數值是否與快照表（主機送出的值）相同。
+    回傳 (主機送出的位元組數, 用戶端每步同步與移動球的秒數, 主機統計, 用戶端統計, 數值不符的球數累計)。
+    """
+    host, client = _host_and_client(ball_count)
+    host.snapshot_sender.keyframe_interval = keyframe_interval
+    for ball in host.balls:
+        if isinstance(ball, RewardBall):
+            ball.on_hit()
+            ball.on_hit()
+    to_client, to_host = deque(), deque()
+    sent = mismatched = last_applied = 0
+    client_time = 0.0
+    for tick in range(ticks):
+        host.update_bullets()
+        host.update_balls()
+        host.handle_collisions()
+        host.sim_ticks += 1
+        payload = encode_state(host.get_player_state())
+        sent += len(payload)
+        to_client.append((tick + latency, payload))
+        to_host.append((tick + latency, encode_state(client.get_player_state())))
+        start = time.perf_counter()
+        _deliver(to_client, client, tick)
+        applied = client.snapshot_receiver.last_seq
+        client.update_balls()
+        client.sim_ticks += 1
+        client_time += time.perf_counter() - start
+        if applied != last_applied:
+            mismatched += _stat_mismatches(client.snapshot_receiver.latest(), client.balls)
+            last_applied = applied
+        _deliver(to_host, host, tick)
+    return sent, client_time / ticks, host.snapshot_sender.stats(), client.snapshot_receiver.stats(), mismatched
+
+
+def _stat_mismatches(table, balls):
+    """球的半徑、hp、分裂數、種類與快照表不同（或缺少）的球數"""
+    mine = {ball.ball_id: ball for ball in balls}
+    mismatched = 0
+    for row, ball_id in enumerate(table['id'].tolist()):
+        ball = mine.get(ball_id)
+        if ball is None or isinstance(ball, RewardBall) != (table['kind'][row] == KIND_REWARD) or (
+                (ball.radius, ball.hp, ball.max_splits, ball.splits_remaining)
+                != (table['radius'][row], table['hp'][row], table['max_splits'][row],
+                    table['splits_remaining'][row])):
+            mismatched += 1
+    return mismatched
+
+
+def bench_snapshots(ball_counts, ticks, latency):
+    """
+    主機每秒送出的位元組：每次完整快照 vs 相對於已確認基準的差異快照；
+    以及用戶端每步花在套用快照與移動球（內插）的時間與套用快照後數值與快照不符的球數（應為 0）。
+    """
+    init_pygame()
+    seconds = ticks / 60
+    print(f"{ticks} ticks at 60 Hz, latency {latency} ticks each way")
+    for count in ball_counts:
+        full, full_time, _, _, _ = _snapshot_stream(count, ticks, latency, keyframe_interval=1)
+        delta, delta_time, host, client, mismatched = _snapshot_stream(count, ticks, latency, keyframe_interval=180)
+        print(f"  {count:5d} balls   full {full / seconds / 1024:8.1f} KiB/s  client {full_time * 1000:6.2f} ms/tick"
+              f"   delta {delta / seconds / 1024:7.1f} KiB/s  client {delta_time * 1000:5.2f} ms/tick"
+              f"   ({full / delta:5.1f}x)   keyframes {host['keyframes']}  changed {host['changed']}"
+              f"  missed {client['missed']}  mismatched {mismatched}")
+
+
+# ---------- 網路同步頻率 ----------
+def _net_rate_stream(ball_count, ticks, latency, net_rate):
+    """
+    主機與用戶端都依 net_rate 同步（net_tick_due），雙向各延遲 latency 步，用戶端每步都持續移動大砲。
+    回傳 (主機送出的位元組數, 雙方送出的訊息數, 每步位移變化量的最大值 {名稱: (主機, 用戶端)})；
+    位移的變化量（二階差分）在反彈、轉向或畫面跳動時變大：用戶端不超過主機，表示同步沒有造成額外的頓挫。
+    """
+    host, client = _host_and_client(ball_count, net_rate=net_rate)
+    ids = host.balls.ids[:ball_count].copy()
+    to_client, to_host = deque(), deque()
+    sent = messages = 0
+    host_path, client_path, host_cannon, client_cannon = [], [], [], []
+    for tick in range(ticks):
+        # 主機的大砲來回移動，讓用戶端有東西可以內插
+        left = (tick // 90) % 2 == 0
+        host.move_cannon(left, not left)
+        host.update_balls()
+        host.sim_ticks += 1
+        if host.net_tick_due():
+            payload = encode_state(host.get_player_state())
+            sent += len(payload)
+            messages += 1
+            to_client.append((tick + latency, payload))
+        _deliver(to_client, client, tick)
+        client.move_cannon()
+        client.update_balls()
+        client.sim_ticks += 1
+        if client.net_tick_due():
+            messages += 1
+            to_host.append((tick + latency, encode_state(client.get_player_state())))
+        _deliver(to_host, host, tick)
+
+        slots, found = host.balls.slots_of(ids)
+        host_path.append(np.where(found, host.balls.y[slots], np.nan))
+        slots, found = client.balls.slots_of(ids)
+        client_path.append(np.where(found, client.balls.y[slots], np.nan))
+        host_cannon.append(host.my_cannon.x)
+        client_cannon.append(client.other_cannon.x)
+
+    def jerk(path):
+        values = np.abs(np.diff(np.asarray(path, dtype=float), n=2, axis=0))
+        return values[~np.isnan(values)].max()
+    return sent, messages, {'ball': (jerk(host_path), jerk(client_path)),
+                            'cannon': (jerk(host_cannon), jerk(client_cannon))}
+
+
+def bench_net_rate(ball_counts, rates, ticks, latency):
+    """
+    網路同步頻率與畫面（模擬）頻率脫鉤後：主機頻寬、伺服器每秒轉送的訊息數，
+    以及用戶端畫面的平滑程度（球與對方大砲每步位移變化量的最大值，不超過主機表示沒有跳動）。
+    """
+    init_pygame()
+    seconds = ticks / 60
+    print(f"{ticks} ticks at 60 Hz, latency {latency} ticks each way")
+    for count in ball_counts:
+        base = None
+        for rate in rates:
+            sent, messages, jerk = _net_rate_stream(count, ticks, latency, rate)
+            base = base or sent
+            print(f"  {count:5d} balls  {rate:3d} Hz   host {sent / seconds / 1024:7.1f} KiB/s ({base / sent:4.1f}x less)"
+                  f"   server {messages / seconds:6.1f} msg/s   max jerk (host / client)"
+                  f"  ball {jerk['ball'][0]:5.2f} / {jerk['ball'][1]:5.2f} px"
+                  f"  cannon {jerk['cannon'][0]:5.2f} / {jerk['cannon'][1]:5.2f} px")
+
+
+def add_commands(sub):
+    """在 bench.py 的指令列加入 codec / snapshots / netrate"""
+    p_codec = sub.add_parser("codec", help="網路狀態：pickle 與二進位編碼的大小與編解碼時間")
+    p_codec.add_argument("--balls", type=int, nargs="+", default=[10, 100, 1000])
+    p_codec.add_argument("--bullets", type=int, default=200)
+    p_codec.add_argument("--repeat", type=int, default=200)
+    p_codec.set_defaults(run=lambda args: bench_codec(args.balls, args.bullets, args.repeat))
+
+    p_snap = sub.add_parser("snapshots", help="多人同步：完整快照與差異快照的頻寬")
+    p_snap.add_argument("--balls", type=int, nargs="+", default=[10, 100, 1000])
+    p_snap.add_argument("--ticks", type=int, default=600)
+    p_snap.add_argument("--latency", type=int, default=3, help="單向延遲（模擬步數）")
+    p_snap.set_defaults(run=lambda args: bench_snapshots(args.balls, args.ticks, args.latency))
+
+    p_rate = sub.add_parser("netrate", help="多人同步：不同網路同步頻率的頻寬、訊息數與平滑度")
+    p_rate.add_argument("--balls", type=int, nargs="+", default=[100])
+    p_rate.add_argument("--rates", type=int, nargs="+", default=[60, 30, 20])
+    p_rate.add_argument("--ticks", type=int, default=600)
+    p_rate.add_argument("--latency", type=int, default=3, help="單向延遲（模擬步數）")
+    p_rate.set_defaults(run=lambda args: bench_net_rate(args.balls, args.rates, args.ticks, args.latency))
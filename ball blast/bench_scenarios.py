@@ -0,0 +1,225 @@
+# bench_scenarios.py - 以固定情境量測整個遊戲迴圈（由 bench.py 的 scenarios / dirty 指令執行）
+#
+# 每個情境固定球 / 子彈數量，逐幀記錄各階段耗時的 mean / p95 / p99，
+# 可存成 JSON 作為基準，之後與基準比較找出退步。
+import json
+import time
+import platform
+
+from bench_common import pygame, init_pygame, timed, summarize
+
+
+# ---------- 情境測試（整個遊戲迴圈的各階段耗時） ----------
+# 依序計時的階段；每幀都以這個順序呼叫 Game 的方法
+PHASES = ("update_bullets", "update_balls", "handle_collisions", "check_game_over", "render")
+
+
+class Scenario:
+    """
+    一個固定的測試情境：球 / 子彈數量、射擊排數、迷你砲台數…
+    每幀開始前把球和子彈補回設定的數量（不計時），讓各幀的負載維持一致。
+    """
+
+    def __init__(self, name, balls, bullets, reward_ratio=0.0, bullet_rows=1, mini_cannons=0,
+                 multiplayer=False, description=""):
+        self.name = name
+        self.balls = balls
+        self.bullets = bullets
+        self.reward_ratio = reward_ratio
+        self.bullet_rows = bullet_rows
+        self.mini_cannons = mini_cannons
+        self.multiplayer = multiplayer
+        self.description = description
+
+    def build(self, screen, seed=0):
+        from game import Game
+        game = Game(screen, multiplayer=self.multiplayer, seed=seed)
+        game.bullet_rows = self.bullet_rows
+        game.level_config = dict(game.level_config, spawn_interval=10 ** 9)   # 球由 top_up 補充
+        for i in range(self.mini_cannons):
+            game.add_mini_cannon((i + 1) * game.width // (self.mini_cannons + 1))
+        self.top_up(game)
+        return game
+
+    def top_up(self, game):
+        """補回球與子彈；球的 HP 很高，只有獎勵球長到最大時才會被移除"""
+        from ball import Ball, RewardBall
+        from bullet_field import OWNER_SELF, OWNER_OTHER
+
+        rng = game.rng
+        while len(game.balls) < self.balls:
+            x = rng.uniform(80, game.width - 80)
+            y = rng.uniform(0, game.height // 2)
+            if rng.random() < self.reward_ratio:
+                ball = RewardBall(x, y, rng=rng)
+            else:
+                ball = Ball(x, y, rng.randint(20, 70), 10 ** 9, max_splits=0, rng=rng)
+            game.balls.append(ball)
+
+        missing = self.bullets - len(game.bullets)
+        if missing > 0:
+            owner = OWNER_OTHER if self.multiplayer else OWNER_SELF
+            game.bullets.spawn_many([rng.uniform(0, game.width) for _ in range(missing)],
+                                    [rng.uniform(0, game.height) for _ in range(missing)], owner)
+        # 不讓遊戲結束；check_game_over 每幀都完整檢查
+        game.running = True
+        if game.mini_cannons:
+            for mini in game.mini_cannons:
+                mini.spawn_time = game.sim_time_ms   # 迷你砲台不會過期
+        # 各階段是個別呼叫的（不經過 step），由這裡推進模擬時間
+        game.sim_ticks += 1
+
+
+SCENARIOS = {s.name: s for s in (
+    Scenario("light", balls=6, bullets=30,
+             description="遊戲初期：少量的球與子彈"),
+    Scenario("baseline", balls=20, bullets=200,
+             description="一般遊玩的數量"),
+    Scenario("crowded", balls=300, bullets=2000, bullet_rows=3, mini_cannons=2,
+             description="300 顆球、2k 子彈、3 排射擊、2 座迷你砲台"),
+    Scenario("reward-barrage", balls=150, bullets=1000, reward_ratio=1.0,
+             description="滿畫面獎勵球（被擊中會變大並在最大時消失）"),
+    Scenario("bullet-storm", balls=50, bullets=10000,
+             description="大量子彈"),
+    Scenario("multiplayer", balls=100, bullets=2000, multiplayer=True,
+             description="多人模式：兩邊的子彈都要判定"),
+)}
+
+
+def run_scenario(scenario, screen, frames, warmup=10):
+    """執行 frames 幀，回傳 {phase: {mean, p95, p99}}（含 "frame" 總計）"""
+    game = scenario.build(screen)
+    timers = [getattr(game, phase) for phase in PHASES]
+    samples = {phase: [] for phase in PHASES + ("frame",)}
+    perf = time.perf_counter
+    for frame in range(warmup + frames):
+        scenario.top_up(game)
+        total = 0.0
+        for phase, func in zip(PHASES, timers):
+            start = perf()
+            func()
+            elapsed = perf() - start
+            total += elapsed
+            if frame >= warmup:
+                samples[phase].append(elapsed)
+        if frame >= warmup:
+            samples["frame"].append(total)
+    return {phase: summarize(values) for phase, values in samples.items()}
+
+
+def compare_results(results, baseline, tolerance, min_ms=0.05):
+    """
+    與基準比較 mean 與 p95；變慢超過 tolerance（比例）且差距大於 min_ms 視為退步。
+    回傳 [(情境, 階段, 指標, 基準, 目前), ...]
+    """
+    regressions = []
+    for name, phases in results.items():
+        base_phases = baseline.get(name)
+        if base_phases is None:
+            continue
+        for phase, stats in phases.items():
+            base = base_phases.get(phase)
+            if base is None:
+                continue
+            for metric in ("mean", "p95"):
+                before, after = base[metric], stats[metric]
+                if after > before * (1 + tolerance) and after - before > min_ms:
+                    regressions.append((name, phase, metric, before, after))
+    return regressions
+
+
+def bench_scenarios(names, frames, json_path=None, baseline_path=None, tolerance=0.15):
+    import numpy as np
+
+    screen = init_pygame()
+    results = {}
+    for name in names:
+        scenario = SCENARIOS[name]
+        print(f"{name}: {scenario.description} ({frames} frames)")
+        results[name] = stats = run_scenario(scenario, screen, frames)
+        for phase in PHASES + ("frame",):
+            s = stats[phase]
+            print(f"  {phase:>18}: mean {s['mean']:8.3f} ms   p95 {s['p95']:8.3f}   p99 {s['p99']:8.3f}")
+
+    report = {
+        'meta': {
+            'frames': frames,
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        'scenarios': results,
+    }
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {json_path}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)['scenarios']
+        regressions = compare_results(results, baseline, tolerance)
+        print(f"compared with {baseline_path} (tolerance {tolerance:.0%}):")
+        for name, phase, metric, before, after in regressions:
+            print(f"  REGRESSION {name}/{phase} {metric}: {before:.3f} -> {after:.3f} ms "
+                  f"({after / before - 1:+.0%})")
+        if not regressions:
+            print("  no regressions")
+        return 1 if regressions else 0
+    return 0
+
+
+# ---------- 髒矩形繪製 ----------
+def bench_dirty(names, frames, thresholds, warmup=10):
+    """
+    各情境下 Game.render 的耗時：threshold=0 為每張整張重畫（舊作法），
+    其他值為只更新髒矩形、超過該比例才整張重畫。
+    """
+    screen = init_pygame()
+    print(f"video driver: {pygame.display.get_driver()}")
+    for name in names:
+        scenario = SCENARIOS[name]
+        print(f"{name}: {scenario.description} ({frames} frames)")
+        full = None
+        for threshold in thresholds:
+            game = scenario.build(screen)
+            game.renderer.threshold = threshold
+            samples = []
+            for frame in range(warmup + frames):
+                scenario.top_up(game)
+                game.update_bullets()
+                game.update_balls()
+                game.handle_collisions()
+                if frame == warmup:
+                    game.renderer.reset_stats()
+                elapsed, _ = timed(game.render, 0.5)
+                if frame >= warmup:
+                    samples.append(elapsed)
+            stats = summarize(samples)
+            info = game.renderer.stats()
+            if full is None:
+                full = stats['mean']
+            print(f"  threshold {threshold:4.2f}: mean {stats['mean']:7.3f} ms   p95 {stats['p95']:7.3f}   "
+                  f"dirty {info['dirty_fraction']:5.1%}   full redraws {info['full_frames']}/{info['frames']}   "
+                  f"speedup {full / stats['mean']:.2f}x")
+
+
+def add_commands(sub):
+    """在 bench.py 的指令列加入 scenarios / dirty"""
+    p_scen = sub.add_parser("scenarios", help="遊戲迴圈各階段耗時（mean / p95 / p99），可與基準比較")
+    p_scen.add_argument("--names", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    p_scen.add_argument("--frames", type=int, default=300)
+    p_scen.add_argument("--json", dest="json_path", help="把結果寫成 JSON（可作為之後的 --baseline）")
+    p_scen.add_argument("--baseline", help="先前 --json 存下的結果；變慢時列出並回傳 1")
+    p_scen.add_argument("--tolerance", type=float, default=0.15, help="容許變慢的比例")
+    p_scen.set_defaults(run=lambda args: bench_scenarios(args.names, args.frames, args.json_path,
+                                                         args.baseline, args.tolerance))
+
+    p_dirty = sub.add_parser("dirty", help="Game.render：整張重畫與髒矩形更新的比較")
+    p_dirty.add_argument("--names", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    p_dirty.add_argument("--frames", type=int, default=300)
+    p_dirty.add_argument("--thresholds", type=float, nargs="+", default=[0.0, 0.4, 1.0],
+                         help="整張重畫的髒區域比例；0 表示每張都整張重畫")
+    p_dirty.set_defaults(run=lambda args: bench_dirty(args.names, args.frames, args.thresholds))
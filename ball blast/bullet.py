@@ -1,23 +1,31 @@
 # bullet.py
 import pygame
-import os
+from assets import AssetRegistry
 
 class Bullet:
+    """單顆子彈；遊戲中大量的子彈改由 BulletField 以陣列批次處理"""
+    SPEED = 11
+    SIZE = (20, 20)
+
+    # 固定欄位，省下每顆子彈的 __dict__
+    __slots__ = ("x", "y", "speed", "image", "mask", "rect")
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
-        self.speed = 11
+        self.speed = Bullet.SPEED
 
-        img_path = os.path.join("bullet.jpg")  
-        self.image = pygame.image.load(img_path).convert()
-        self.image.set_colorkey((255, 255, 255))   #去除白色背景
-        self.image = pygame.transform.scale(self.image, (20, 20))
+        self.image, self.mask = Bullet.sprite()
         self.rect = self.image.get_rect(center=(self.x, self.y))
-        self.mask = pygame.mask.from_surface(self.image)
+
+    @staticmethod
+    def sprite():
+        """共用的子彈圖片與遮罩（白色背景以 colorkey 去除）"""
+        return AssetRegistry.load("bullet.jpg", Bullet.SIZE, colorkey=(255, 255, 255))
 
     def move(self):
         self.y -= self.speed
         self.rect.center = (self.x, self.y)
 
     def draw(self, win):
-        win.blit(self.image, self.rect)
\ No newline at end of file
+        win.blit(self.image, self.rect)
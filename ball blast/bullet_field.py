@@ -0,0 +1,169 @@
+# bullet_field.py
+from itertools import repeat
+import numpy as np
+from bullet import Bullet
+
+# 子彈來源（owner 欄位）
+OWNER_SELF = 0    # 自己的大砲（單人模式的子彈也屬於這裡）
+OWNER_OTHER = 1   # 多人模式中對方的子彈
+OWNER_MINI = 2    # 迷你砲台
+
+
+class BulletField:
+    """
+    以 NumPy 陣列（structure of arrays）存放所有子彈：
+    - x, y, owner, alive 各一個陣列，前 count 個位置為有效資料
+    - step() 一次向量化地移動並移除飛出畫面的子彈
+    - blit_list() 產生可直接交給 Surface.blits 的批次繪製清單
+    """
+
+    def __init__(self, capacity=256, speed=Bullet.SPEED):
+        self.speed = speed
+        self.count = 0
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.image, self.mask = Bullet.sprite()
+        self.spawned = 0      # 累計發射數
+        self.culled = 0       # 累計移除數
+        self.reused = 0       # 落在用過的位置上的發射數（不需要新記憶體）
+        self.grown = 0        # 陣列擴充（重新配置）的次數
+        self._high_water = 0  # 曾經用到的最大位置數
+
+    # ---------- 新增 / 移除 ----------
+    def _reserve(self, extra):
+        needed = self.count + extra
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        self.grown += 1
+        for name in ('x', 'y', 'owner', 'alive'):
+            old = getattr(self, name)
+            grown = np.zeros(new_capacity, dtype=old.dtype)
+            grown[:self.count] = old[:self.count]
+            setattr(self, name, grown)
+
+    def _claim(self, start, end):
+        """統計 [start, end) 這些位置中有多少是被移除的子彈留下、再次使用的"""
+        self.reused += max(0, min(end, self._high_water) - start)
+        self._high_water = max(self._high_water, end)
+        self.spawned += end - start
+
+    def spawn(self, x, y, owner=OWNER_SELF):
+        """新增一顆子彈，回傳它目前的索引"""
+        self._reserve(1)
+        i = self.count
+        self.x[i] = x
+        self.y[i] = y
+        self.owner[i] = owner
+        self.alive[i] = True
+        self.count += 1
+        self._claim(i, i + 1)
+        return i
+
+    def spawn_many(self, xs, ys, owner=OWNER_SELF):
+        """一次新增多顆子彈（例如多排射擊或網路同步）"""
+        n = len(xs)
+        if n == 0:
+            return
+        self._reserve(n)
+        start, end = self.count, self.count + n
+        self.x[start:end] = xs
+        self.y[start:end] = ys
+        self.owner[start:end] = owner
+        self.alive[start:end] = True
+        self.count = end
+        self._claim(start, end)
+
+    def kill(self, i):
+        """標記子彈失效（下次 compact / step 時移除）"""
+        self.alive[i] = False
+
+    def clear(self, owner=None):
+        """清除全部子彈，或只清除某個來源的子彈"""
+        if owner is None:
+            self.culled += self.count
+            self.count = 0
+            return
+        n = self.count
+        self.alive[:n] &= self.owner[:n] != owner
+        self.compact()
+
+    def compact(self):
+        """把存活的子彈往前搬，維持前 count 個位置都是有效資料"""
+        n = self.count
+        keep = self.alive[:n]
+        m = int(np.count_nonzero(keep))
+        if m == n:
+            return
+        for arr in (self.x, self.y, self.owner):
+            arr[:m] = arr[:n][keep]
+        self.alive[:m] = True
+        self.count = m
+        self.culled += n - m
+
+    # ---------- 每幀更新 ----------
+    def step(self, dt=1.0):
+        """所有子彈往上移動一步（dt 以 60 FPS 的一幀為 1），並移除飛出畫面的"""
+        n = self.count
+        if n == 0:
+            return
+        self.y[:n] -= self.speed * dt
+        self.alive[:n] &= self.y[:n] >= 0
+        self.compact()
+
+    # ---------- 查詢 ----------
+    def __len__(self):
+        return self.count
+
+    def indices(self, owners=None):
+        """回傳存活子彈的索引；owners 可限制來源（單一值或序列）"""
+        n = self.count
+        keep = self.alive[:n].copy()
+        if owners is not None:
+            keep &= np.isin(self.owner[:n], owners)
+        return np.flatnonzero(keep)
+
+    def positions(self, owners=None):
+        """回傳 [(x, y), ...]，供網路傳輸使用"""
+        idx = self.indices(owners)
+        return list(zip(self.x[idx].tolist(), self.y[idx].tolist()))
+
+    # ---------- 繪製 ----------
+    def blit_sequence(self, lag=0.0):
+        """
+        產生 (image, (left, top)) 序列，對齊原本 Bullet.rect 的中心位置。
+        以迭代器回傳，交給 Surface.blits 時不必先建出整個串列。
+        lag：畫面內插用，子彈畫在往回（往下）lag 像素的位置。
+        """
+        n = self.count
+        w, h = self.image.get_size()
+        lefts = self.x[:n].astype(np.int64) - w // 2
+        ys = self.y[:n] + lag if lag else self.y[:n]
+        tops = ys.astype(np.int64) - h // 2
+        return zip(repeat(self.image), zip(lefts.tolist(), tops.tolist()))
+
+    def blit_list(self):
+        """批次繪製清單 [(image, (left, top)), ...]"""
+        return list(self.blit_sequence())
+
+    def draw(self, win, lag=0.0):
+        if self.count:
+            win.blits(self.blit_sequence(lag), doreturn=False)
+
+    def stats(self):
+        """回傳容量、位置重複使用率與記憶體統計"""
+        bytes_per_bullet = (self.x.itemsize + self.y.itemsize
+                            + self.owner.itemsize + self.alive.itemsize)
+        return {
+            'live': self.count,
+            'capacity': len(self.x),
+            'spawned': self.spawned,
+            'culled': self.culled,
+            'reused': self.reused,
+            'reuse_rate': self.reused / self.spawned if self.spawned else 0.0,
+            'grown': self.grown,
+            'bytes_per_bullet': bytes_per_bullet,
+        }
@@ -1,22 +1,22 @@
 # cannon.py
 import pygame
+from assets import AssetRegistry
 
 class Cannon:
     def __init__(self, x, y):
         self.x = x
         self.y = y
         self.speed = 9
-        self.image = pygame.transform.scale(
-            pygame.image.load("cannon.png").convert_alpha(),(200, 200))
+        self.image, self.mask = AssetRegistry.load("cannon.png", (200, 200))   #共用mask，進行碰撞判定
         self.rect = self.image.get_rect(center=(x, y))
 
-        self.mask = pygame.mask.from_surface(self.image)   #建立mask，進行碰撞判定
-
-    def move(self, direction, screen_width):
-        if direction == "LEFT" and self.x - self.speed > 0:
-            self.x -= self.speed
-        elif direction == "RIGHT" and self.x + self.speed < screen_width:
-            self.x += self.speed
+    def move(self, direction, screen_width, dt=1.0):
+        """dt：以 60 FPS 的一幀為 1 的時間步長"""
+        step = self.speed * dt
+        if direction == "LEFT" and self.x - step > 0:
+            self.x -= step
+        elif direction == "RIGHT" and self.x + step < screen_width:
+            self.x += step
         self.rect.center = (self.x, self.y)
 
     def draw(self, win):
@@ -0,0 +1,212 @@
+# collision.py
+"""
+碰撞檢測：
+- 粗篩（broad phase）：先找出可能相撞的 (球, 子彈) 組合
+- 精確判定（narrow phase）："mask" 像素遮罩重疊，或 "circle" 圓形對矩形的解析計算
+"""
+from bisect import bisect_left, bisect_right
+import numpy as np
+
+# 精確判定模式
+NARROW_MASK = "mask"       # pygame.mask.overlap，與圖片像素完全一致
+NARROW_CIRCLE = "circle"   # 球視為圓形、子彈 / 大砲視為矩形，可向量化
+NARROW_PHASES = (NARROW_MASK, NARROW_CIRCLE)
+
+
+class BroadPhase:
+    """
+    粗篩策略的共同介面：
+    - prepare(xs, ys, half_w, half_h)：每輪開始時以子彈中心座標建立索引
+    - candidates(ball)：回傳可能擊中這顆球的子彈編號（由小到大）
+    回傳的編號順序與暴力法相同，因此各策略的判定結果一致。
+    """
+    name = "base"
+
+    def __init__(self):
+        self.total_pairs = 0       # 暴力法需要檢查的組合數
+        self.candidate_pairs = 0   # 實際交給精確判定的組合數
+        self._count = 0
+
+    def prepare(self, xs, ys, half_w, half_h):
+        self._count = len(xs)
+
+    def candidates(self, ball):
+        raise NotImplementedError
+
+    def _record(self, candidates):
+        self.total_pairs += self._count
+        self.candidate_pairs += len(candidates)
+        return candidates
+
+    def reset_stats(self):
+        self.total_pairs = 0
+        self.candidate_pairs = 0
+
+    def stats(self):
+        return {
+            'strategy': self.name,
+            'total_pairs': self.total_pairs,
+            'candidate_pairs': self.candidate_pairs,
+            'pruned': (1 - self.candidate_pairs / self.total_pairs) if self.total_pairs else 0.0,
+        }
+
+
+class BruteForceBroadPhase(BroadPhase):
+    """暴力法：每顆球都檢查每顆子彈"""
+    name = "brute"
+
+    def candidates(self, ball):
+        return self._record(range(self._count))
+
+
+class SpatialHashBroadPhase(BroadPhase):
+    """
+    均勻格子的空間雜湊：每輪把子彈依中心點放進格子，
+    球只檢查自己包圍盒（加上子彈半徑）覆蓋到的格子。
+    """
+    name = "grid"
+
+    def __init__(self, cell_size=64):
+        super().__init__()
+        self.cell_size = cell_size
+        self._cells = {}
+        self._half_w = 0
+        self._half_h = 0
+
+    def prepare(self, xs, ys, half_w, half_h):
+        super().prepare(xs, ys, half_w, half_h)
+        self._half_w = half_w
+        self._half_h = half_h
+        cell = self.cell_size
+        cells = {}
+        for k, (x, y) in enumerate(zip(xs, ys)):
+            key = (int(x // cell), int(y // cell))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [k]
+            else:
+                bucket.append(k)
+        self._cells = cells
+
+    def candidates(self, ball):
+        cell = self.cell_size
+        # 多留 1 像素，涵蓋 is_hit_at 中 int() 取整造成的誤差
+        reach_x = ball.current_image.get_width() // 2 + self._half_w + 1
+        reach_y = ball.current_image.get_height() // 2 + self._half_h + 1
+        x, y = ball.x, ball.y
+        x0, x1 = int((x - reach_x) // cell), int((x + reach_x) // cell)
+        y0, y1 = int((y - reach_y) // cell), int((y + reach_y) // cell)
+
+        cells = self._cells
+        found = []
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        found.sort()
+        return self._record(found)
+
+
+class SweepPruneBroadPhase(BroadPhase):
+    """
+    依 x 排序的掃掠剪除：子彈只會垂直往上飛，能擊中球的子彈
+    x 一定落在 [球.x - r, 球.x + r]（加上子彈半寬）之內，
+    以二分搜尋找出這段範圍即可。
+    """
+    name = "sweep"
+
+    def __init__(self):
+        super().__init__()
+        self._order = []      # 依 x 排序後的子彈編號
+        self._sorted_x = []
+        self._half_w = 0
+
+    def prepare(self, xs, ys, half_w, half_h):
+        super().prepare(xs, ys, half_w, half_h)
+        self._half_w = half_w
+        self._order = sorted(range(len(xs)), key=xs.__getitem__)
+        self._sorted_x = [xs[k] for k in self._order]
+
+    def candidates(self, ball):
+        # 多留 1 像素，涵蓋 is_hit_at 中 int() 取整造成的誤差
+        reach = ball.current_image.get_width() // 2 + self._half_w + 1
+        x = ball.x
+        lo = bisect_left(self._sorted_x, x - reach)
+        hi = bisect_right(self._sorted_x, x + reach)
+        found = self._order[lo:hi]
+        found.sort()
+        return self._record(found)
+
+
+# 可在 Game 中選用的策略
+BROAD_PHASES = {
+    BruteForceBroadPhase.name: BruteForceBroadPhase,
+    SpatialHashBroadPhase.name: SpatialHashBroadPhase,
+    SweepPruneBroadPhase.name: SweepPruneBroadPhase,
+}
+
+
+def make_broad_phase(name):
+    """依名稱建立粗篩策略"""
+    try:
+        return BROAD_PHASES[name]()
+    except KeyError:
+        raise ValueError(f"unknown broad phase: {name!r} (choose from {sorted(BROAD_PHASES)})")
+
+
+# ---------- 精確判定：圓形對矩形 ----------
+_mask_boxes = {}
+
+
+def mask_boxes(mask):
+    """
+    把遮罩拆成不重疊的矩形 [(left, top, right, bottom), ...]（相對遮罩左上角，right / bottom 不含）。
+    每一列的連續像素為一段，上下相鄰且範圍相同的段落合併成一個矩形，
+    因此圓形判定看到的形狀與像素遮罩一致，而不是整張圖的包圍盒。
+    每個遮罩只計算一次。
+    """
+    boxes = _mask_boxes.get(mask)
+    if boxes is None:
+        boxes = []
+        width, height = mask.get_size()
+        open_boxes = {}   # (left, right) -> top
+        for row in range(height + 1):
+            runs = set()
+            if row < height:
+                start = None
+                for col in range(width + 1):
+                    filled = col < width and mask.get_at((col, row))
+                    if filled and start is None:
+                        start = col
+                    elif not filled and start is not None:
+                        runs.add((start, col))
+                        start = None
+            for span in list(open_boxes):
+                if span not in runs:
+                    boxes.append((span[0], open_boxes.pop(span), span[1], row))
+            for span in runs:
+                open_boxes.setdefault(span, row)
+        _mask_boxes[mask] = boxes
+    return boxes
+
+
+def circle_hits_box(cx, cy, radius, left, top, right, bottom):
+    """圓心 (cx, cy)、半徑 radius 的圓是否與矩形相交（單一組合）"""
+    nearest_x = min(max(cx, left), right)
+    nearest_y = min(max(cy, top), bottom)
+    dx = cx - nearest_x
+    dy = cy - nearest_y
+    return dx * dx + dy * dy < radius * radius
+
+
+def circle_box_overlap(cx, cy, radius, left, top, right, bottom):
+    """
+    circle_hits_box 的 NumPy 版本，參數可為陣列並依廣播規則計算，
+    例如 cx[:, None] 對 left[None, :] 會得到 (球 x 矩形) 的布林矩陣。
+    """
+    nearest_x = np.clip(cx, left, right)
+    nearest_y = np.clip(cy, top, bottom)
+    dx = cx - nearest_x
+    dy = cy - nearest_y
+    return dx * dx + dy * dy < radius * radius
@@ -0,0 +1,44 @@
+# fonts.py
+import pygame
+
+
+class FontManager:
+    """全域字體表：每組 (family, size, bold, italic) 只做一次 SysFont 查詢"""
+
+    # 遊戲中用到的字體，啟動時先載入
+    PRELOAD = [
+        ("Arial", 18), ("Arial", 20), ("Arial", 24), ("Arial", 32),
+        ("Arial", 35), ("Arial", 36), ("Arial", 37), ("Arial", 48),
+    ]
+
+    _fonts = {}
+    requests = 0      # get() 被呼叫的次數
+    lookups = 0       # 實際呼叫 SysFont 的次數
+
+    @classmethod
+    def get(cls, family="Arial", size=24, bold=False, italic=False):
+        """取得共用的 Font 物件"""
+        cls.requests += 1
+        key = (family, size, bold, italic)
+        font = cls._fonts.get(key)
+        if font is None:
+            cls.lookups += 1
+            font = pygame.font.SysFont(family, size, bold=bold, italic=italic)
+            cls._fonts[key] = font
+        return font
+
+    @classmethod
+    def preload(cls, specs=None):
+        """啟動時一次把常用字體查好（需在 pygame.init() 之後呼叫）"""
+        for spec in specs or cls.PRELOAD:
+            cls.get(*spec)
+
+    @classmethod
+    def stats(cls):
+        """回傳統計：saved 為省下的 SysFont 查詢次數"""
+        return {
+            'fonts': len(cls._fonts),
+            'requests': cls.requests,
+            'lookups': cls.lookups,
+            'saved': cls.requests - cls.lookups,
+        }
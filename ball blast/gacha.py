@@ -87,6 +87,10 @@ class GachaSystem:
     def __init__(self, game):
         self.game = game
     
+    def _rng(self):
+        """使用遊戲本局的抽卡亂數（可由 seed 重現），沒有時退回全域 random"""
+        return getattr(self.game, "gacha_rng", random)
+
     def can_draw(self) -> bool:
         """檢查是否有足夠金幣抽卡"""
         return self.game.coins >= self.COST_PER_DRAW
@@ -98,7 +102,7 @@ class GachaSystem:
         self.game.coins -= 100
 
         # 抽卡機率
-        r = random.uniform(0, TOTAL_WEIGHT)
+        r = self._rng().uniform(0, TOTAL_WEIGHT)
         acc = 0
         for card in CARD_POOL:
             acc += card["weight"]
@@ -121,7 +125,7 @@ class GachaSystem:
     
     def draw_card_for_free(self):
         """免費抽卡（不扣金幣）"""
-        r = random.uniform(0, TOTAL_WEIGHT)
+        r = self._rng().uniform(0, TOTAL_WEIGHT)
         acc = 0
         for card in CARD_POOL:
             acc += card["weight"]
@@ -0,0 +1,708 @@
+# game_state.py - 不需要視窗的遊戲模擬核心
+import random
+import hashlib
+import numpy as np
+from cannon import Cannon
+from mini_cannon import MiniCannon
+from bullet_field import BulletField, OWNER_SELF, OWNER_OTHER, OWNER_MINI
+from ball import Ball, RewardBall
+from ball_field import BallField
+from state_codec import BALL_FIELDS, KIND_NORMAL, KIND_REWARD
+from snapshot import SnapshotSender, SnapshotReceiver, SnapshotInterpolator, LOCAL_ID_BASE
+from collision import make_broad_phase, mask_boxes, circle_box_overlap, NARROW_PHASES, NARROW_CIRCLE
+
+# 算在自己頭上的子彈來源（主砲 + 迷你砲台）
+MY_OWNERS = (OWNER_SELF, OWNER_MINI)
+
+# 速度與以幀計數的計時器（spawn_interval、wave_interval…）都是以每秒 60 幀調校的
+BASE_TICK_RATE = 60
+# 多人模式每秒同步幾次（與模擬、畫面更新的頻率互相獨立）
+NET_TICK_RATE = 30
+
+# step() 依序執行的模擬階段
+SIM_PHASES = ("update_bullets", "update_balls", "handle_collisions", "check_game_over")
+
+# 沒有 LevelManager 時的預設關卡設定
+DEFAULT_LEVEL_CONFIG = {
+    'spawn_interval': 300,
+    'ball_hp_min': 20,
+    'ball_hp_max': 30,
+    'ball_speed_min': 1.0,
+    'ball_speed_max': 2.5,
+    'reward_ball_chance': 0.2
+}
+
+
+class GameState:
+    """
+    遊戲的模擬層：生成球、子彈、球的物理、碰撞與遊戲結束判定。
+    不建立視窗、不讀鍵盤、不繪圖，可在 SDL dummy driver 下以不限速度執行，
+    供 Game（加上畫面與輸入）、bench.py、機器人與伺服器端模擬共用。
+    每呼叫一次 step() 前進一個固定步長。
+    """
+
+    def __init__(self, width, height, multiplayer=False, player_id=0, level_manager=None,
+                 collision_strategy="grid", collision_mode="mask", sim_rate=BASE_TICK_RATE, seed=None,
+                 net_rate=NET_TICK_RATE):
+        self.width, self.height = width, height
+        self.multiplayer = multiplayer
+        self.player_id = player_id
+        self.level_manager = level_manager  # Add level manager
+
+        self.bullets_per_second = 10  
+        self.bullet_rows = 1
+        self.row_spacing = 20  # 每排子彈之間的水平間距（單位：像素）
+        self.damage_per_bullet = 1
+        self.crit_rate = 5
+        self.crit_damage = 150
+        self.coins = 0   # 金幣由 Game 設定；部分卡片效果會改變它
+
+        # 碰撞粗篩策略："brute"（暴力法）、"grid"（空間雜湊）、"sweep"（依 x 排序）
+        self.set_collision_strategy(collision_strategy)
+        # 精確判定："mask"（像素遮罩）或 "circle"（圓形解析計算，較快但邊緣略有差異）
+        self.set_collision_mode(collision_mode)
+        self.set_sim_rate(sim_rate)
+        self.set_net_rate(net_rate)
+
+        # Load level configuration
+        if self.level_manager:
+            self.level_config = self.level_manager.get_level_config()
+        else:
+            # Default configuration for backward compatibility
+            self.level_config = dict(DEFAULT_LEVEL_CONFIG)
+        
+        # 根據遊戲模式初始化大砲
+        if multiplayer:
+            # 多人模式：兩個玩家分別在左右兩側
+            if player_id == 0:
+                self.my_cannon = Cannon(self.width//4, self.height-130)
+                self.other_cannon = Cannon(3*self.width//4, self.height-130)
+            else:
+                self.my_cannon = Cannon(3*self.width//4, self.height-130)
+                self.other_cannon = Cannon(self.width//4, self.height-130)
+        else:
+            # 單人模式：只有一個大砲在中央
+            self.my_cannon = Cannon(self.width//2, self.height-130)
+            self.other_cannon = None
+            # 為了保持代碼一致性，在單人模式下也使用 my_cannon
+            self.cannon = self.my_cannon
+        
+        # 網路同步（多人模式）：訊息序號；主機送出球的差異快照，用戶端重建並內插
+        self.net_seq = 0      # 自己最後送出的序號
+        self.peer_seq = 0     # 收到的對方最新序號
+        self.snapshot_sender = None
+        self.snapshot_receiver = None
+        self.ball_interpolator = None
+        self._other_cannon_tick = None   # 對方大砲上次更新時對方的模擬步數
+        self._other_cannon_path = None   # (起點 x, 終點 x, 開始的本地步數, 步數)
+        if multiplayer:
+            if player_id == 0:
+                self.snapshot_sender = SnapshotSender(self.width, self.height)
+            else:
+                self.snapshot_receiver = SnapshotReceiver(self.width, self.height)
+                self.ball_interpolator = SnapshotInterpolator()
+
+        # 遊戲狀態
+        self.recorder = None   # ReplayRecorder，錄製時記錄每一步的輸入與抽卡
+        self.profiler = None   # FrameProfiler，設定時分別計時 step() 的每個階段
+        self.reset_game_state(seed)
+
+    def reset_game_state(self, seed=None):
+        """
+        重置遊戲運行狀態。
+        每局使用自己的亂數來源（生成球、分裂、暴擊、抽卡），
+        指定 seed 即可重現同一局；未指定時隨機選一個並記在 self.seed。
+        """
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        # 抽卡另用一條亂數流，抽不抽卡都不影響遊戲本身的亂數序列
+        self.gacha_rng = random.Random(f"gacha-{self.seed}")
+        # 所有子彈（自己、對方、迷你砲台）放在同一個陣列場中，以 owner 區分
+        self.bullets = BulletField()
+        self.mini_cannons = []   # MiniCannon，子彈與主砲共用 self.bullets
+        
+        # 用戶端的球由主機編號，本地分裂出來的球改用另一段編號
+        self.balls = BallField(first_id=LOCAL_ID_BASE if self.snapshot_receiver is not None else 1)
+        self.score = 0
+        self.other_score = 0
+        self.running = True
+        self.sim_ticks = 0   # 已執行的模擬步數（模擬時間 = sim_ticks * tick_ms）
+        self._next_net_ms = 0.0   # 下一次網路同步的模擬時間
+        
+        # 射擊計時器 - 合併兩種射擊系統
+        if self.multiplayer:
+            # 多人模式使用波次射擊系統
+            self.wave_timer = 0
+            self.bullet_cooldown = 0
+            self.bullet_in_wave = 0
+            self.wave_interval = 15    # 1秒一波
+            self.bullet_delay = 3      # 0.05秒一發
+            self.bullets_per_wave = 5  # 每波5發
+        else:
+            # 單人模式使用連續射擊系統
+            self.shot_delay = 1000 // self.bullets_per_second     # 射擊間隔(毫秒)
+            self.last_shot_time = -self.shot_delay - 1   # 記錄上次射擊時間（模擬時間，開局立即射擊）
+        
+        self.spawn_timer = 0
+
+    def spawn_ball(self):
+        """Generate new balls with level-based difficulty"""
+        # Use level configuration for ball generation
+        if self.rng.random() < self.level_config['reward_ball_chance']:
+            ball = RewardBall(
+                x=self.rng.randint(50, self.width-50),
+                y=0,
+                rng=self.rng
+            )
+            ball.dx = self.rng.uniform(-4, 4)
+            ball.dy = self.rng.uniform(
+                self.level_config['ball_speed_min'], 
+                self.level_config['ball_speed_max']
+            )
+        else:
+            ball = Ball(
+                x=self.rng.randint(50, self.width-50),
+                y=0,
+                radius=self.rng.randint(40, 70),
+                hp=self.rng.randint(
+                    self.level_config['ball_hp_min'], 
+                    self.level_config['ball_hp_max']
+                ),
+                max_splits=3,
+                rng=self.rng
+            )
+            ball.dx = self.rng.uniform(-4, 4)
+            ball.dy = self.rng.uniform(
+                self.level_config['ball_speed_min'], 
+                self.level_config['ball_speed_max']
+            )
+        
+        self.balls.append(ball)
+
+    def update_bullets(self):
+        """更新子彈狀態 - 支持兩種射擊模式"""
+        if self.multiplayer:
+            # 多人模式：波次射擊系統
+            self.wave_timer += self.dt
+            if self.wave_timer >= self.wave_interval:
+                self.wave_timer = 0
+                self.bullet_in_wave = 0
+            
+            if self.bullet_in_wave < self.bullets_per_wave:
+                self.bullet_cooldown += self.dt
+                if self.bullet_cooldown >= self.bullet_delay:
+                    self.bullet_cooldown = 0
+                    self.bullets.spawn(self.my_cannon.x, self.my_cannon.y, OWNER_SELF)
+                    self.bullet_in_wave += 1
+        else:
+            # 單人模式：連續射擊系統
+            current_time = self.sim_time_ms
+            
+            # 檢查是否達到射擊間隔
+            if current_time - self.last_shot_time > self.shot_delay:
+                self.last_shot_time = current_time
+                # 發射新子彈
+                for i in range(self.bullet_rows):
+                    # 從中心開始左右分布
+                    offset = (i - self.bullet_rows // 2) * self.row_spacing
+                    bullet_x = self.my_cannon.x + offset
+                    bullet_y = self.my_cannon.y
+                    self.bullets.spawn(bullet_x, bullet_y, OWNER_SELF)
+
+        # 迷你砲台射擊，時間到的移除
+        if self.mini_cannons:
+            now = self.sim_time_ms
+            self.mini_cannons = [m for m in self.mini_cannons if m.update(now, self.dt)]
+
+        # 一次移動所有子彈（包含對方的）並移除超出屏幕的
+        self.bullets.step(self.dt)
+
+    def add_mini_cannon(self, x, y=None):
+        """在 x（預設與主砲同高）放一座迷你砲台，壽命以模擬時間計算"""
+        mini = MiniCannon(x, self.my_cannon.y if y is None else y, self.bullets, now=self.sim_time_ms)
+        self.mini_cannons.append(mini)
+        return mini
+
+    def update_balls(self):
+        """Update ball status with level-based spawn rate"""
+        # 只有玩家0或單人模式才生成球
+        if not self.multiplayer or self.player_id == 0:
+            self.spawn_timer += self.dt
+            # Use level configuration for spawn interval
+            if self.spawn_timer > self.level_config['spawn_interval']:
+                self.spawn_timer = 0
+                self.spawn_ball()
+
+        # 移動球體（一次更新所有球的陣列）；用戶端改為在主機的快照之間內插
+        if self.ball_interpolator is not None:
+            self.ball_interpolator.apply(self.balls, self.sim_ticks + 1)
+        else:
+            self.balls.step(self.width, self.height, self.dt)
+
+    def handle_collisions(self):
+        """處理碰撞檢測 - 支持獎勵球和普通球"""
+        if self.multiplayer:
+            # 多人模式：先處理我的子彈，再處理對方子彈與球的碰撞
+            for ball in self._bullet_hits(MY_OWNERS):
+                self._on_ball_hit(ball, mine=True)
+            for ball in self._bullet_hits(OWNER_OTHER):
+                self._on_ball_hit(ball, mine=False)
+        else:
+            # 單人模式：處理碰撞
+            for ball in self._bullet_hits(MY_OWNERS):
+                self._on_ball_hit(ball, mine=True)
+
+        self.bullets.compact()
+
+    def set_collision_strategy(self, name):
+        """切換碰撞粗篩策略（可用 bench.py collisions 比較哪個較快）"""
+        self.broad_phase = make_broad_phase(name)
+
+    def set_collision_mode(self, name):
+        """切換精確判定方式（可用 bench.py parity 檢查兩者差異）"""
+        if name not in NARROW_PHASES:
+            raise ValueError(f"unknown collision mode: {name!r} (choose from {list(NARROW_PHASES)})")
+        self.collision_mode = name
+
+    def _bullet_hits(self, owners):
+        """
+        檢查每顆球與指定來源的子彈，產生被擊中的球。
+        "mask"：先由 broad_phase 篩出可能相撞的子彈，再做遮罩精確判定；
+        "circle"：整輪向量化計算（見 _circle_hits）。
+        每顆球每輪最多被一顆子彈擊中，擊中的子彈立即失效；
+        分裂新增的球要到下一幀才參與判定（索引只針對本輪的子彈建立）。
+        """
+        field = self.bullets
+        idx = field.indices(owners)
+        xs = field.x[idx].tolist()
+        ys = field.y[idx].tolist()
+        idx = idx.tolist()
+        live = [True] * len(idx)
+        mask = field.mask
+        bullet_w, bullet_h = mask.get_size()
+
+        if self.collision_mode == NARROW_CIRCLE:
+            yield from self._circle_hits(xs, ys, idx, mask)
+            return
+
+        broad = self.broad_phase
+        broad.prepare(xs, ys, bullet_w // 2, bullet_h // 2)
+        for ball in self.balls[:]:
+            for k in broad.candidates(ball):
+                if live[k] and ball.is_hit_at(xs[k], ys[k], mask):
+                    live[k] = False
+                    field.kill(idx[k])
+                    yield ball
+                    break
+
+    def _circle_hits(self, xs, ys, idx, mask):
+        """
+        _bullet_hits 的 "circle" 版本，整輪以 NumPy 計算：
+        1. 子彈依 x 排序，以 searchsorted 一次找出每顆球 x 範圍內的子彈（不經過 broad_phase）
+        2. 所有 (球, 子彈, 子彈遮罩矩形) 組合一次做圓形對矩形判定
+        3. 只有真正重疊的組合回到 Python，依球的順序各取編號最小、尚未用掉的子彈
+        結果與逐顆球、逐顆子彈判定相同。
+        """
+        balls = self.balls[:]
+        n = len(balls)
+        boxes = np.array(mask_boxes(mask), dtype=np.int64).reshape(-1, 4)
+        if n == 0 or not idx or len(boxes) == 0:
+            return
+        bullet_w, bullet_h = mask.get_size()
+        bx = np.array(xs, dtype=np.float64)
+        by = np.array(ys, dtype=np.float64)
+        cx = self.balls.x[:n].astype(np.int64)
+        cy = self.balls.y[:n].astype(np.int64)
+        radius = self.balls.radius[:n].copy()
+
+        # 1. 依 x 排序找候選組合（多留 1 像素涵蓋 int() 取整）
+        order = np.argsort(bx, kind="stable")
+        sorted_x = bx[order]
+        reach_x = radius + bullet_w // 2 + 1
+        lo = np.searchsorted(sorted_x, cx - reach_x, side="left")
+        hi = np.searchsorted(sorted_x, cx + reach_x, side="right")
+        counts = hi - lo
+        ball_of = np.repeat(np.arange(n), counts)
+        starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        bullet_of = order[starts + np.arange(len(ball_of))]
+        near = np.abs(by[bullet_of] - cy[ball_of]) <= radius[ball_of] + bullet_h // 2 + 1
+        ball_of, bullet_of = ball_of[near], bullet_of[near]
+
+        # 2. 圓形對子彈遮罩矩形：(組合 x 矩形) 的重疊矩陣
+        left = (bx[bullet_of].astype(np.int64) - bullet_w // 2)[:, None]
+        top = (by[bullet_of].astype(np.int64) - bullet_h // 2)[:, None]
+        hits = circle_box_overlap(cx[ball_of][:, None], cy[ball_of][:, None], radius[ball_of][:, None],
+                                  left + boxes[:, 0], top + boxes[:, 1],
+                                  left + boxes[:, 2], top + boxes[:, 3]).any(axis=1)
+        ball_of, bullet_of = ball_of[hits], bullet_of[hits]
+        sort = np.lexsort((bullet_of, ball_of))
+
+        # 3. 依球的順序分配子彈，每顆子彈只能擊中一顆球
+        field = self.bullets
+        used = set()
+        done = -1
+        for i, k in zip(ball_of[sort].tolist(), bullet_of[sort].tolist()):
+            if i == done or k in used:
+                continue
+            done = i
+            used.add(k)
+            field.kill(idx[k])
+            ball = balls[i]
+            ball.on_hit()
+            yield ball
+
+    def _on_ball_hit(self, ball, mine):
+        """球被子彈擊中後的處理；mine 表示是不是自己的子彈"""
+        damage = self.calculate_damage()
+
+        if isinstance(ball, RewardBall):
+            # 獎勵球沒有HP概念，只有被擊中會變大
+            if ball.radius >= ball.max_radius:
+                # 當獎勵球達到最大尺寸時消失，並給予射擊強化
+                self.balls.remove(ball)
+                if not mine:
+                    self.other_score += 50  # 額外分數獎勵
+                    return
+                if self.multiplayer:
+                    self.bullets_per_wave += 1  # 增加每波子彈數量
+                else:
+                    self.bullets_per_second += 3  # 增加射擊速度
+                    if self.shot_delay > 20:  # 防止射擊間隔過短
+                        self.shot_delay -= 5  # 減少射擊間隔
+                self.score += 50  # 額外分數獎勵
+        else:
+            # 普通球的處理邏輯
+            ball.hp -= damage
+            if ball.hp <= 0:
+                self.balls.remove(ball)
+                if ball.radius > 10 and ball.splits_remaining > 0:
+                    self.balls.extend(ball.split())
+                if mine:
+                    self.score += 10
+                else:
+                    self.other_score += 10
+
+    def calculate_damage(self):
+        """計算傷害，包含暴擊判定"""
+        base_damage = self.damage_per_bullet
+        
+        # 暴擊判定
+        if self.rng.randint(1, 100) <= self.crit_rate:
+            return int(base_damage * (self.crit_damage / 100))
+        return base_damage
+ 
+
+    def check_game_over(self):
+        """檢查遊戲結束條件"""
+        if self.collision_mode == NARROW_CIRCLE:
+            cannons = [self.my_cannon]
+            if self.multiplayer and self.other_cannon:
+                cannons.append(self.other_cannon)
+            if any(self._circle_touches_cannon(cannon) for cannon in cannons):
+                self.running = False
+            return
+
+        # 檢查我的大砲
+        for ball in self.balls:
+            ball_rect = ball.current_image.get_rect(center=(int(ball.x), int(ball.y)))
+            offset_x = ball_rect.left - self.my_cannon.rect.left
+            offset_y = ball_rect.top - self.my_cannon.rect.top
+
+            if self.my_cannon.mask.overlap(ball.mask, (offset_x, offset_y)):
+                self.running = False
+                return
+        
+        # 檢查對方大砲（多人模式）
+        if self.multiplayer and self.other_cannon:
+            for ball in self.balls:
+                ball_rect = ball.current_image.get_rect(center=(int(ball.x), int(ball.y)))
+                offset_x = ball_rect.left - self.other_cannon.rect.left
+                offset_y = ball_rect.top - self.other_cannon.rect.top
+
+                if self.other_cannon.mask.overlap(ball.mask, (offset_x, offset_y)):
+                    self.running = False
+                    return
+
+    def _circle_touches_cannon(self, cannon):
+        """以 BallField 陣列一次判定所有球（圓形）是否碰到大砲遮罩的矩形"""
+        n = len(self.balls)
+        boxes = mask_boxes(cannon.mask)
+        if n == 0 or not boxes:
+            return False
+        boxes = np.array(boxes, dtype=np.int64)
+        cx = self.balls.x[:n].astype(np.int64)[:, None]
+        cy = self.balls.y[:n].astype(np.int64)[:, None]
+        radius = self.balls.radius[:n][:, None]
+        left, top = cannon.rect.left, cannon.rect.top
+        return bool(circle_box_overlap(cx, cy, radius,
+                                       left + boxes[:, 0], top + boxes[:, 1],
+                                       left + boxes[:, 2], top + boxes[:, 3]).any())
+
+    def update_from_network(self, other_state):
+        """以對方玩家的狀態（state_codec.decode_state 的結果）更新遊戲（多人模式）"""
+        if not self.multiplayer:
+            return
+        # 伺服器只轉送對方最新的狀態，同一則可能收到不只一次；舊的或重複的直接略過
+        seq = other_state.get('seq', 0)
+        if seq <= self.peer_seq:
+            return
+        self.peer_seq = seq
+        if self.snapshot_sender is not None:
+            self.snapshot_sender.ack(other_state['ack'])
+        
+        # 更新對方大砲位置（在兩次同步之間平滑移動過去，見 move_cannon）
+        if 'cannon_x' in other_state:
+            last = self._other_cannon_tick
+            duration = max(1, other_state['tick'] - last) if last is not None else 1
+            self._other_cannon_path = (self.other_cannon.x, other_state['cannon_x'], self.sim_ticks, duration)
+            self._other_cannon_tick = other_state['tick']
+        
+        # 更新對方子彈
+        if 'bullets' in other_state:
+            self.bullets.clear(OWNER_OTHER)
+            other = other_state['bullets']
+            self.bullets.spawn_many(other['x'], other['y'], OWNER_OTHER)
+        
+        # FIX: 更新球體狀態（客戶端從主機的差異快照重建，依 id 就地更新）
+        if 'balls' in other_state and self.snapshot_receiver is not None:
+            delta = other_state['balls']
+            table = self.snapshot_receiver.apply(other_state['seq'], other_state['tick'], delta, self.dt)
+            if table is not None:
+                self._reconcile_balls(table, delta)
+                self.ball_interpolator.push(other_state['tick'], table, self.sim_ticks)
+        
+        # 更新對方分數
+        if 'score' in other_state:
+            self.other_score = other_state['score']
+
+    def _reconcile_balls(self, table, delta):
+        """
+        依快照表就地更新球體列表：移除主機沒有的球、只為新的 id 建立 Ball，
+        數值（hp、半徑…）只在這張快照新增或改變的球上更新；位置交給 ball_interpolator。
+        """
+        field = self.balls
+        ids = table['id']
+
+        # 主機已移除的球，以及本地分裂出來、主機沒有的球
+        n = len(field)
+        gone = np.flatnonzero(~np.isin(field.ids[:n], ids)).tolist()
+        for ball in [field[i] for i in gone]:
+            field.remove(ball)
+
+        # 建立本地還沒有的球（新生成的，或本地已擊破但主機還在的）
+        slots, found = field.slots_of(ids)
+        for row in np.flatnonzero(~found).tolist():
+            if table['kind'][row] == KIND_REWARD:
+                ball = RewardBall(table['x'][row], table['y'][row])
+            else:
+                ball = Ball(table['x'][row], table['y'][row], table['radius'][row], int(table['hp'][row]),
+                            int(table['max_splits'][row]), image_index=int(table['image_index'][row]))
+            ball.ball_id = int(ids[row])
+            field.append(ball)
+            slots[row] = ball._slot
+
+        # 新增或改變的球，以及剛建立的球（建構子的半徑、hp、分裂數不一定與主機相同）：更新物件上的數值
+        if delta['keyframe']:
+            rows = np.arange(len(ids))
+        else:
+            refresh = np.concatenate((delta['spawned']['id'], delta['changed']['id']))
+            rows = np.searchsorted(ids, refresh)
+            rows = np.union1d(rows[found[rows]], np.flatnonzero(~found))
+        balls = field[:]
+        for row, slot in zip(rows.tolist(), slots[rows].tolist()):
+            ball = balls[slot]
+            radius = float(table['radius'][row])
+            if ball.radius != radius:
+                ball.set_radius(radius)
+            ball.hp = int(table['hp'][row])
+            ball.max_splits = int(table['max_splits'][row])
+            ball.splits_remaining = int(table['splits_remaining'][row])
+
+        # 速度直接寫入陣列（新建立的球也在這裡設定）
+        field.dx[slots] = table['dx']
+        field.dy[slots] = table['dy']
+
+    def get_player_state(self):
+        """
+        獲取當前玩家狀態（用於網路傳輸，欄位格式見 state_codec）。
+        每次呼叫都是新的一則訊息：序號加一，主機的球是相對於對方已確認快照的差異。
+        """
+        self.net_seq += 1
+        receiver = self.snapshot_receiver
+        idx = self.bullets.indices(MY_OWNERS)
+        state = {
+            'seq': self.net_seq,
+            'ack': receiver.last_seq if receiver is not None else self.peer_seq,
+            'tick': self.sim_ticks,
+            'cannon_x': self.my_cannon.x,
+            'bullets': {'x': self.bullets.x[idx], 'y': self.bullets.y[idx]},
+            'score': self.score
+        }
+        
+        # FIX: 如果是主機（玩家0），同步球體狀態
+        if self.snapshot_sender is not None:
+            field = self.balls
+            n = len(field)
+            balls = list(field)
+            columns = {
+                'id': field.ids[:n],
+                'x': field.x[:n], 'y': field.y[:n],
+                'dx': field.dx[:n], 'dy': field.dy[:n],
+                'radius': field.radius[:n],
+                'hp': [ball.hp for ball in balls],
+                'max_splits': [ball.max_splits for ball in balls],
+                'splits_remaining': [ball.splits_remaining for ball in balls],
+                'image_index': [ball.image_index for ball in balls],
+                'kind': [KIND_REWARD if isinstance(ball, RewardBall) else KIND_NORMAL for ball in balls],
+            }
+            state['balls'] = self.snapshot_sender.build(self.net_seq, self.sim_ticks, columns, self.dt)
+        
+        return state
+
+        # ──── 原本若只有簡單 if/else，可整段換成下面 ────
+    def apply_card_effect(self, card_name: str):
+        """根據 effect dict 套用到屬性"""
+        if self.recorder is not None:
+            self.recorder.record_card(card_name)
+
+        if card_name == "TOYZ(R)":
+            self.my_cannon.speed += 3
+
+        if card_name == "一步都沒有退(R)":
+            self.damage_per_bullet += 1
+            self.bullets_per_second -= 5
+            self.bullets_per_second = max(self.bullets_per_second, 5)
+
+        if card_name == "咻碰阿罵(R)":
+            self.crit_damage += 25
+
+        if card_name == "張家檸檬綠茶(R)":
+            self.coins *= 0.25
+
+        if card_name == "杰哥的麵包(R)":
+            self.crit_rate += 15
+            self.crit_rate = min(self.crit_rate, 100)
+
+        if card_name == "114514(SR)":
+            self.damage_per_bullet += 3
+
+        if card_name == "MVP(SR)":
+            self.bullets_per_second += 10
+            self.coins -= 500
+
+        if card_name == "圓神啟動(SR)":
+            self.crit_rate += 50
+            self.crit_rate = min(self.crit_rate, 100)
+            self.crit_damage += 75
+
+        if card_name == "最強(SSR)":
+            self.bullet_rows += 1
+            self.bullet_rows = min(self.bullet_rows, 3)
+        
+        if card_name == "oop之神(UR)":
+            self.crit_rate = 100
+            self.crit_damage += 150
+            self.damage_per_bullet += 5
+            self.bullets_per_second += 20
+            self.bullet_rows = 3
+
+    def set_sim_rate(self, sim_rate=BASE_TICK_RATE):
+        """
+        設定每秒模擬幾步。
+        dt 為每一步相當於幾個 60 FPS 的幀，速度與計時器都乘上 dt。
+        """
+        if sim_rate <= 0:
+            raise ValueError("sim_rate must be positive")
+        self.sim_rate = sim_rate
+        self.tick_ms = 1000 / sim_rate
+        self.dt = BASE_TICK_RATE / sim_rate
+
+    def set_net_rate(self, net_rate=NET_TICK_RATE):
+        """設定多人模式每秒同步幾次（以模擬時間計算，不受畫面更新頻率影響）"""
+        if net_rate <= 0:
+            raise ValueError("net_rate must be positive")
+        self.net_rate = net_rate
+        self.net_tick_ms = 1000 / net_rate
+
+    def net_tick_due(self):
+        """
+        是否到了下一次網路同步；到了就排定再下一次。
+        中間經過的多個模擬步數合併成一則訊息（送出的是最新的大砲位置與子彈），
+        每則訊息有自己的序號（get_player_state 的 seq）。
+        """
+        now = self.sim_time_ms
+        if now < self._next_net_ms - 1e-6:   # 容許浮點誤差（net_rate = sim_rate 時每步都要同步）
+            return False
+        self._next_net_ms += self.net_tick_ms
+        if self._next_net_ms <= now:
+            # 落後太多（例如剛從暫停回來）：不連續補送
+            self._next_net_ms = now + self.net_tick_ms
+        return True
+
+    @property
+    def sim_time_ms(self):
+        """目前的模擬時間（毫秒），不受畫面卡頓或暫停影響"""
+        return self.sim_ticks * self.tick_ms
+
+    def move_cannon(self, left=False, right=False):
+        """依輸入移動自己的大砲（一步）；對方的大砲朝最近收到的位置內插"""
+        if left:
+            self.my_cannon.move("LEFT", self.width, self.dt)
+        if right:
+            self.my_cannon.move("RIGHT", self.width, self.dt)
+        if self._other_cannon_path is not None:
+            start_x, end_x, start, duration = self._other_cannon_path
+            t = min(max((self.sim_ticks + 1 - start) / duration, 0.0), 1.0)
+            cannon = self.other_cannon
+            cannon.x = start_x + (end_x - start_x) * t
+            if t >= 1.0:
+                self._other_cannon_path = None
+            cannon.rect.center = (cannon.x, cannon.y)
+
+    def step(self, left=False, right=False):
+        """執行一次固定步長的模擬；left / right 為這一步按住的方向鍵"""
+        if self.recorder is not None:
+            self.recorder.record_tick(left, right)
+        prof = self.profiler
+        if prof is None:
+            self.move_cannon(left, right)
+            self.update_bullets()
+            self.update_balls()
+            self.handle_collisions()
+            self.check_game_over()
+        else:
+            prof.run("input", self.move_cannon, left, right)
+            for phase in SIM_PHASES:
+                prof.run(phase, getattr(self, phase))
+        self.sim_ticks += 1
+
+    def run_headless(self, max_ticks, inputs=None):
+        """
+        不開視窗、不限速度地連續模擬，直到遊戲結束或跑滿 max_ticks 步。
+        inputs(state) 可回傳 (left, right)，例如機器人的控制邏輯。
+        回傳實際執行的步數。
+        """
+        start = self.sim_ticks
+        while self.running and self.sim_ticks - start < max_ticks:
+            if inputs is None:
+                self.step()
+            else:
+                self.step(*inputs(self))
+        return self.sim_ticks - start
+
+    def state_hash(self):
+        """
+        目前模擬狀態的雜湊值（十六進位字串），用來確認重播結果與錄製時完全相同。
+        涵蓋步數、分數、大砲位置、所有子彈與球的狀態。
+        """
+        fire = self.bullets_per_wave if self.multiplayer else (self.bullets_per_second, self.shot_delay)
+        h = hashlib.blake2b(digest_size=16)
+        h.update(repr((self.sim_ticks, self.score, self.other_score, self.running,
+                       float(self.my_cannon.x), fire, len(self.mini_cannons))).encode())
+        n = self.bullets.count
+        for arr in (self.bullets.x, self.bullets.y, self.bullets.owner):
+            h.update(arr[:n].tobytes())
+        for ball in self.balls:
+            h.update(repr((type(ball).__name__, ball.x, ball.y, ball.dx, ball.dy, ball.radius,
+                           ball.hp, ball.splits_remaining, ball.image_index)).encode())
+        return h.hexdigest()
@@ -0,0 +1,60 @@
+# hud.py
+
+
+class TextWidget:
+    """
+    綁定遊戲數值的 HUD 文字：
+    - value()：取得目前的值（要可比較，例如數字或 tuple）；回傳 None 時不顯示
+    - text(value)：把值轉成要顯示的字串，只有值改變時才呼叫並重新 render
+    - anchor：pos 對齊的位置（"topleft" / "topright" …，同 pygame.Rect 屬性）
+    """
+
+    def __init__(self, font, color, pos, value, text="{}".format, anchor="topleft"):
+        self.font = font
+        self.color = color
+        self.pos = pos
+        self.value = value
+        self.text = text
+        self.anchor = anchor
+        self.renders = 0          # 實際 render 的次數
+
+        self._value = object()    # 保證第一次一定 render
+        self._item = None
+
+    def item(self):
+        """回傳 (文字, surface, 左上角) 給 DirtyRenderer；值沒變時沿用上次的文字圖"""
+        value = self.value()
+        if value != self._value:
+            self._value = value
+            if value is None:
+                self._item = None
+            else:
+                text = self.text(value)
+                surface = self.font.render(text, True, self.color)
+                rect = surface.get_rect(**{self.anchor: self.pos})
+                self._item = (text, surface, rect.topleft)
+                self.renders += 1
+        return self._item
+
+
+class HUD:
+    """一組 TextWidget，依加入順序繪製"""
+
+    def __init__(self, widgets=()):
+        self.widgets = list(widgets)
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
+
+    def items(self):
+        """目前要顯示的 HUD [(文字, surface, (x, y)), ...]"""
+        items = []
+        for widget in self.widgets:
+            item = widget.item()
+            if item is not None:
+                items.append(item)
+        return items
+
+    def stats(self):
+        return {'widgets': len(self.widgets), 'renders': sum(w.renders for w in self.widgets)}
@@ -0,0 +1,38 @@
+# idle.py
+"""
+選單與對話畫面用的事件等待：畫面沒有變化時不重畫，
+用 pygame.event.wait 讓出 CPU，直到有輸入或下一個動畫時間點（例如文字閃爍）。
+"""
+import pygame
+
+# 沒有動畫的畫面最多等多久醒來一次（毫秒）
+IDLE_TIMEOUT_MS = 1000
+# 閃爍文字 / 游標的切換間隔（毫秒）
+BLINK_MS = 500
+
+_REPAINT_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED)
+
+
+def wait_events(timeout_ms=IDLE_TIMEOUT_MS):
+    """阻塞直到有事件或逾時；回傳這次取得的所有事件（逾時為空串列）"""
+    # timeout 為 0 時 pygame 會一直等下去，至少等 1 毫秒
+    event = pygame.event.wait(max(1, int(timeout_ms)))
+    if event.type == pygame.NOEVENT:
+        return []
+    events = [event]
+    events.extend(pygame.event.get())
+    return events
+
+
+def needs_repaint(events):
+    """視窗被蓋住、還原後需要重畫"""
+    return any(event.type in _REPAINT_EVENTS for event in events)
+
+
+def blink(period_ms=BLINK_MS):
+    """
+    閃爍狀態：回傳 (目前是否顯示, 距離下次切換的毫秒數)，
+    第二個值可直接當作 wait_events 的 timeout。
+    """
+    now = pygame.time.get_ticks()
+    return (now // period_ms) % 2 == 0, period_ms - now % period_ms
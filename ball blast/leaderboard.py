@@ -3,6 +3,8 @@ import pygame
 import json
 import os
 from pygame.locals import *
+from fonts import FontManager
+from idle import wait_events, needs_repaint, blink
 
 class Leaderboard:
     def __init__(self, screen_width, screen_height):
@@ -11,8 +13,8 @@ class Leaderboard:
         self.leaderboard_file = "leaderboard.json"
         self.leaderboard = []
         self.current_player = ""
-        self.font = pygame.font.SysFont("Arial", 24)
-        self.title_font = pygame.font.SysFont("Arial", 35)
+        self.font = FontManager.get("Arial", 24)
+        self.title_font = FontManager.get("Arial", 35)
         self.input_active = True
         self.input_text = ""
         
@@ -71,11 +73,51 @@ class Leaderboard:
         color_active = pygame.Color('lightskyblue3')
         color_passive = pygame.Color('gray15')
         color = color_active if self.input_active else color_passive
+
+        # 靜態圖層：背景、標題、輸入框與提示文字
+        static = pygame.Surface(screen.get_size()).convert()
+        static.fill((0, 0, 0))
+        
+        # 標題
+        title = self.title_font.render("Enter Your Name", True, (255, 255, 255))
+        static.blit(title, (self.screen_width//2 - title.get_width()//2, self.screen_height//2 - 100))
         
-        clock = pygame.time.Clock()
+        # 輸入框
+        pygame.draw.rect(static, color, input_rect, 2)
+        
+        # 提示文字
+        prompt = self.font.render("Press ENTER to Continue, ESC to Cancel", True, (200, 200, 200))
+        static.blit(prompt, (self.screen_width//2 - prompt.get_width()//2, self.screen_height//2 + 60))
+
+        rendered_text = None
+        drawn = None   # 目前畫面的 (輸入文字, 游標是否顯示)；改變時才重畫
         
         while True:
-            for event in pygame.event.get():
+            if self.input_text != rendered_text:
+                text_surface = self.font.render(self.input_text, True, (255, 255, 255))
+                rendered_text = self.input_text
+
+            # 游標閃爍；等到有輸入或游標該切換時才醒來
+            cursor_on, next_blink = blink()
+            if (self.input_text, cursor_on) != drawn:
+                # 繪製輸入界面
+                screen.blit(static, (0, 0))
+                screen.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
+                
+                # 游標
+                if cursor_on:  # 閃爍效果
+                    cursor_x = input_rect.x + 5 + text_surface.get_width()
+                    pygame.draw.line(screen, (255, 255, 255), 
+                                   (cursor_x, input_rect.y + 5), 
+                                   (cursor_x, input_rect.y + input_rect.height - 5), 2)
+                
+                pygame.display.flip()
+                drawn = (self.input_text, cursor_on)
+
+            events = wait_events(next_blink)
+            if needs_repaint(events):
+                drawn = None
+            for event in events:
                 if event.type == QUIT:
                     return None
                 
@@ -92,32 +134,6 @@ class Leaderboard:
                         # 限制輸入長度和字符
                         if len(self.input_text) < 20 and event.unicode.isprintable():
                             self.input_text += event.unicode
-            
-            # 繪製輸入界面
-            screen.fill((0, 0, 0))
-            
-            # 標題
-            title = self.title_font.render("Enter Your Name", True, (255, 255, 255))
-            screen.blit(title, (self.screen_width//2 - title.get_width()//2, self.screen_height//2 - 100))
-            
-            # 輸入框
-            pygame.draw.rect(screen, color, input_rect, 2)
-            text_surface = self.font.render(self.input_text, True, (255, 255, 255))
-            screen.blit(text_surface, (input_rect.x + 5, input_rect.y + 5))
-            
-            # 游標
-            if pygame.time.get_ticks() % 1000 < 500:  # 閃爍效果
-                cursor_x = input_rect.x + 5 + text_surface.get_width()
-                pygame.draw.line(screen, (255, 255, 255), 
-                               (cursor_x, input_rect.y + 5), 
-                               (cursor_x, input_rect.y + input_rect.height - 5), 2)
-            
-            # 提示文字
-            prompt = self.font.render("Press ENTER to Continue, ESC to Cancel", True, (200, 200, 200))
-            screen.blit(prompt, (self.screen_width//2 - prompt.get_width()//2, self.screen_height//2 + 60))
-            
-            pygame.display.flip()
-            clock.tick(60)
 
     def show_leaderboard(self, screen, score=None, player_name=None, view_only=False):
         """顯示排行榜
@@ -131,16 +147,88 @@ class Leaderboard:
         Returns:
             bool: True if restart, False if quit
         """
-        clock = pygame.time.Clock()
-        
         # 如果有當前分數和玩家名稱，添加到排行榜
         if score is not None and player_name and not view_only:
             self.add_score(player_name, score)
         elif score is not None and self.current_player and not view_only:
             self.add_score(self.current_player, score)
         
+        # 繪製排行榜界面（這個畫面中不會改變：只畫一次，之後只等待輸入）
+        screen.fill((0, 0, 0))
+        
+        # 標題
+        title = self.title_font.render("Leaderboard", True, (255, 255, 255))
+        screen.blit(title, (self.screen_width//2 - title.get_width()//2, 50))
+        
+        # 當前玩家分數（只在遊戲結束時顯示）
+        y_offset = 120
+        if score is not None and not view_only:
+            current_player_name = player_name or self.current_player
+            score_text = self.font.render(
+                f"{current_player_name}'s Score: {score}", 
+                True, (255, 255, 0)
+            )
+            screen.blit(score_text, (self.screen_width//2 - score_text.get_width()//2, y_offset))
+            y_offset += 40
+            
+            # 分隔線
+            pygame.draw.line(screen, (100, 100, 100), 
+                           (self.screen_width//4, y_offset + 10), 
+                           (3*self.screen_width//4, y_offset + 10), 2)
+            y_offset += 30
+        
+        # 排行榜內容
+        if not self.leaderboard:
+            no_scores = self.font.render("No scores yet!", True, (200, 200, 200))
+            screen.blit(no_scores, (self.screen_width//2 - no_scores.get_width()//2, y_offset))
+        else:
+            for i, entry in enumerate(self.leaderboard[:10]):  # 只顯示前10名
+                # 高亮當前玩家的記錄
+                text_color = (255, 255, 255)
+                if not view_only and score is not None:
+                    current_name = player_name or self.current_player
+                    if entry['name'].lower() == current_name.lower():
+                        text_color = (255, 255, 0)
+                
+                # 排名圖標
+                rank_color = (255, 215, 0) if i == 0 else (192, 192, 192) if i == 1 else (205, 127, 50) if i == 2 else (255, 255, 255)
+                
+                entry_text = self.font.render(
+                    f"{i+1}. {entry['name']}: {entry['score']}", 
+                    True, text_color
+                )
+                
+                # 添加排名背景
+                if i < 3:
+                    rank_rect = pygame.Rect(self.screen_width//2 - entry_text.get_width()//2 - 10, 
+                                          y_offset - 5, 
+                                          entry_text.get_width() + 20, 
+                                          entry_text.get_height() + 10)
+                    pygame.draw.rect(screen, (*rank_color, 30), rank_rect)
+                    pygame.draw.rect(screen, rank_color, rank_rect, 1)
+                
+                screen.blit(
+                    entry_text, 
+                    (self.screen_width//2 - entry_text.get_width()//2, y_offset)
+                )
+                y_offset += 35
+        
+        # 提示文字
+        if view_only:
+            prompt = self.font.render("Press any key to return to menu", True, (200, 200, 200))
+        else:
+            prompt = self.font.render("Press ENTER to Restart, ESC/Q to Quit", True, (200, 200, 200))
+        screen.blit(prompt, (self.screen_width//2 - prompt.get_width()//2, self.screen_height - 60))
+        
+        pygame.display.flip()
+        board = screen.copy()
+        
         while True:
-            for event in pygame.event.get():
+            events = wait_events()
+            if needs_repaint(events):
+                screen.blit(board, (0, 0))
+                pygame.display.flip()
+            for event in events:
                 if event.type == QUIT:
                     return False
                 if event.type == KEYDOWN:
@@ -152,73 +240,3 @@ class Leaderboard:
                             return True  # 重新開始遊戲
                         elif event.key == K_ESCAPE or event.key == K_q:
                             return False  # 退出遊戲
-            
-            # 繪製排行榜界面
-            screen.fill((0, 0, 0))
-            
-            # 標題
-            title = self.title_font.render("Leaderboard", True, (255, 255, 255))
-            screen.blit(title, (self.screen_width//2 - title.get_width()//2, 50))
-            
-            # 當前玩家分數（只在遊戲結束時顯示）
-            y_offset = 120
-            if score is not None and not view_only:
-                current_player_name = player_name or self.current_player
-                score_text = self.font.render(
-                    f"{current_player_name}'s Score: {score}", 
-                    True, (255, 255, 0)
-                )
-                screen.blit(score_text, (self.screen_width//2 - score_text.get_width()//2, y_offset))
-                y_offset += 40
-                
-                # 分隔線
-                pygame.draw.line(screen, (100, 100, 100), 
-                               (self.screen_width//4, y_offset + 10), 
-                               (3*self.screen_width//4, y_offset + 10), 2)
-                y_offset += 30
-            
-            # 排行榜內容
-            if not self.leaderboard:
-                no_scores = self.font.render("No scores yet!", True, (200, 200, 200))
-                screen.blit(no_scores, (self.screen_width//2 - no_scores.get_width()//2, y_offset))
-            else:
-                for i, entry in enumerate(self.leaderboard[:10]):  # 只顯示前10名
-                    # 高亮當前玩家的記錄
-                    text_color = (255, 255, 255)
-                    if not view_only and score is not None:
-                        current_name = player_name or self.current_player
-                        if entry['name'].lower() == current_name.lower():
-                            text_color = (255, 255, 0)
-                    
-                    # 排名圖標
-                    rank_color = (255, 215, 0) if i == 0 else (192, 192, 192) if i == 1 else (205, 127, 50) if i == 2 else (255, 255, 255)
-                    
-                    entry_text = self.font.render(
-                        f"{i+1}. {entry['name']}: {entry['score']}", 
-                        True, text_color
-                    )
-                    
-                    # 添加排名背景
-                    if i < 3:
-                        rank_rect = pygame.Rect(self.screen_width//2 - entry_text.get_width()//2 - 10, 
-                                              y_offset - 5, 
-                                              entry_text.get_width() + 20, 
-                                              entry_text.get_height() + 10)
-                        pygame.draw.rect(screen, (*rank_color, 30), rank_rect)
-                        pygame.draw.rect(screen, rank_color, rank_rect, 1)
-                    
-                    screen.blit(
-                        entry_text, 
-                        (self.screen_width//2 - entry_text.get_width()//2, y_offset)
-                    )
-                    y_offset += 35
-            
-            # 提示文字
-            if view_only:
-                prompt = self.font.render("Press any key to return to menu", True, (200, 200, 200))
-            else:
-                prompt = self.font.render("Press ENTER to Restart, ESC/Q to Quit", True, (200, 200, 200))
-            screen.blit(prompt, (self.screen_width//2 - prompt.get_width()//2, self.screen_height - 60))
-            
-            pygame.display.flip()
-            clock.tick(60)
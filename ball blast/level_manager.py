@@ -2,6 +2,7 @@
 import pygame
 import json
 import os
+from fonts import FontManager
 
 class LevelManager:
     def __init__(self):
@@ -176,7 +177,7 @@ class Game:
             self.other_cannon = None
             self.cannon = self.my_cannon
         
-        self.font = pygame.font.SysFont("Arial", 24)
+        self.font = FontManager.get("Arial", 24)
         self.reset_game_state()
 
     def spawn_ball(self):
@@ -282,9 +283,9 @@ class Game:
 
 def show_level_selection(screen, level_manager):
     """Show level selection screen"""
-    font_title = pygame.font.SysFont("Arial", 48)
-    font_option = pygame.font.SysFont("Arial", 24)
-    font_small = pygame.font.SysFont("Arial", 18)
+    font_title = FontManager.get("Arial", 48)
+    font_option = FontManager.get("Arial", 24)
+    font_small = FontManager.get("Arial", 18)
     
     unlocked_levels = level_manager.get_unlocked_levels()
     selected_level = 0
@@ -8,17 +8,28 @@ from game import Game
 from leaderboard import Leaderboard
 from network_manager import NetworkManager
 from level_manager import LevelManager
-from moviepy.editor import VideoFileClip
+from fonts import FontManager
+from replay import ReplayRecorder
+from idle import wait_events, needs_repaint, blink
 
 
-# Initialize pygame
-pygame.init()
-
 # Screen settings
 SCREEN_WIDTH = 600
 SCREEN_HEIGHT = 800
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Ball Blast - OOP Project")
+screen = None   # 由 init_display() 建立；import main 時不會開視窗
+
+# 設定此環境變數時，每局單人遊戲都會存成重播檔（python bench.py replay <檔案> 可全速重播）
+REPLAY_DIR = os.environ.get("BALL_BLAST_REPLAY_DIR")
+
+def init_display():
+    """初始化 pygame 並建立（或取得已存在的）遊戲視窗"""
+    global screen
+    if screen is None:
+        pygame.init()
+        screen = pygame.display.get_surface() or pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Ball Blast - OOP Project")
+        FontManager.preload()  # 啟動時一次查好所有字體
+    return screen
 
 def load_image(name, scale=None):
     """Load and optionally scale images"""
@@ -32,7 +43,7 @@ def load_image(name, scale=None):
         print(e)
         surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         surf.fill((100, 200, 100))
-        font = pygame.font.SysFont("Arial", 36)
+        font = FontManager.get("Arial", 36)
         text = font.render("Image Load Failed", True, (0, 0, 0))
         surf.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, 
                          SCREEN_HEIGHT//2 - text.get_height()//2))
@@ -40,38 +51,40 @@ def load_image(name, scale=None):
 
 def show_level_selection(screen, level_manager):
     """Show level selection screen"""
-    font_title = pygame.font.SysFont("Arial", 48)
-    font_option = pygame.font.SysFont("Arial", 24)
-    font_small = pygame.font.SysFont("Arial", 18)
+    font_title = FontManager.get("Arial", 48)
+    font_option = FontManager.get("Arial", 24)
+    font_small = FontManager.get("Arial", 18)
     
     unlocked_levels = level_manager.get_unlocked_levels()
     selected_level = 0
+
+    # 靜態圖層：背景、標題與說明文字只畫一次
+    static = pygame.Surface(screen.get_size()).convert()
+    static.fill((20, 20, 40))
     
-    clock = pygame.time.Clock()
+    # Title
+    title = font_title.render("Select Level", True, (255, 255, 255))
+    title_rect = title.get_rect(center=(screen.get_width()//2, 100))
+    static.blit(title, title_rect)
     
-    while True:
-        screen.fill((20, 20, 40))
-        
-        # Title
-        title = font_title.render("Select Level", True, (255, 255, 255))
-        title_rect = title.get_rect(center=(screen.get_width()//2, 100))
-        screen.blit(title, title_rect)
-        
-        # Level options
-        y_start = 200
-        for i, level_num in enumerate(range(1, 6)):  # Show all 5 levels
-            is_unlocked = level_num in unlocked_levels
-            is_selected = i == selected_level
-            
-            level_data = level_manager.levels[level_num]
-            
-            # Background for selected level
-            if is_selected:
-                pygame.draw.rect(screen, (100, 100, 150), 
-                               (50, y_start + i * 80 - 5, screen.get_width() - 100, 70))
-            
+    # Instructions
+    instructions = [
+        "Use UP/DOWN arrows to select",
+        "Press ENTER to confirm",
+        "Press ESC to go back"
+    ]
+    
+    for i, instruction in enumerate(instructions):
+        text = font_small.render(instruction, True, (255, 255, 255))
+        static.blit(text, (70, 600 + i * 25))
+
+    # 每個關卡選取 / 未選取兩種狀態的文字
+    rows = {}
+    for level_num in range(1, 6):  # Show all 5 levels
+        level_data = level_manager.levels[level_num]
+        for is_selected in (False, True):
             # Level name and status
-            if is_unlocked:
+            if level_num in unlocked_levels:
                 color = (255, 255, 255) if is_selected else (200, 200, 200)
                 level_text = font_option.render(f"Level {level_num}: {level_data['name']}", True, color)
                 desc_text = font_small.render(level_data['description'], True, color)
@@ -79,24 +92,34 @@ def show_level_selection(screen, level_manager):
                 color = (100, 100, 100)
                 level_text = font_option.render(f"Level {level_num}: LOCKED", True, color)
                 desc_text = font_small.render(f"Unlock at {level_data['unlock_score']} points", True, color)
+            rows[level_num, is_selected] = (level_text, desc_text)
+    
+    drawn = None   # 目前畫面上的選取項目；只有改變時才重畫
+    while True:
+        if selected_level != drawn:
+            screen.blit(static, (0, 0))
             
-            screen.blit(level_text, (70, y_start + i * 80))
-            screen.blit(desc_text, (70, y_start + i * 80 + 30))
-        
-        # Instructions
-        instructions = [
-            "Use UP/DOWN arrows to select",
-            "Press ENTER to confirm",
-            "Press ESC to go back"
-        ]
-        
-        for i, instruction in enumerate(instructions):
-            text = font_small.render(instruction, True, (255, 255, 255))
-            screen.blit(text, (70, 600 + i * 25))
-        
-        pygame.display.flip()
+            # Level options
+            y_start = 200
+            for i, level_num in enumerate(range(1, 6)):
+                is_selected = i == selected_level
+                
+                # Background for selected level
+                if is_selected:
+                    pygame.draw.rect(screen, (100, 100, 150), 
+                                   (50, y_start + i * 80 - 5, screen.get_width() - 100, 70))
+                
+                level_text, desc_text = rows[level_num, is_selected]
+                screen.blit(level_text, (70, y_start + i * 80))
+                screen.blit(desc_text, (70, y_start + i * 80 + 30))
+            
+            pygame.display.flip()
+            drawn = selected_level
         
-        for event in pygame.event.get():
+        events = wait_events()
+        if needs_repaint(events):
+            drawn = None
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -112,86 +135,72 @@ def show_level_selection(screen, level_manager):
                         return chosen_level
                 elif event.key == pygame.K_ESCAPE:
                     return None
-        
-        clock.tick(60)
+
+# 主選單按鈕 (文字, 動作)
+MENU_BUTTONS = [
+    ("1 - Single Player", "single"),
+    ("2 - Select Level", "levels"),
+    ("3 - Multiplayer", "multiplayer"),
+    ("4 - Gacha", "gacha"),
+    ("5 - View Leaderboard", "leaderboard"),
+    ("ESC - Quit", "quit"),
+]
+
+def _draw_menu_button(surface, rect, text_surface, hovered):
+    """畫一個主選單按鈕"""
+    # 懸停特效
+    color = (70, 120, 200) if hovered else (40, 40, 60)
+    pygame.draw.rect(surface, color, rect, border_radius=12)
+
+    # 陰影效果（內框）
+    pygame.draw.rect(surface, (100, 100, 150), rect, width=2, border_radius=12)
+
+    surface.blit(text_surface, text_surface.get_rect(center=rect.center))
 
 def show_main_menu(game_instance=None):
     """Modified main menu to include level selection"""
     first_page = load_image("firstpage.png", (SCREEN_WIDTH, SCREEN_HEIGHT))
-    font_title = pygame.font.SysFont("Arial", 48)
-    font_option = pygame.font.SysFont("Arial", 32)
-    
-    clock = pygame.time.Clock()
-    blink_timer = 0
-    show_text = True
+    font_option = FontManager.get("Arial", 32)
+    button_font = FontManager.get("Arial", 32)
+
+    # 靜態圖層：封面與所有未懸停的按鈕，只畫一次
+    static = first_page.convert()
+    y_start = 400
+    button_w, button_h = 360, 50
+    buttons = []
+    for i, (label, action) in enumerate(MENU_BUTTONS):
+        rect = pygame.Rect(SCREEN_WIDTH // 2 - button_w // 2, y_start + i * 60, button_w, button_h)
+        text_surface = button_font.render(label, True, (255, 255, 255))
+        _draw_menu_button(static, rect, text_surface, hovered=False)
+        buttons.append((rect, action, text_surface))
+
+    # Blinking prompt
+    prompt = font_option.render("Choose your option", True, (255, 255, 0))
+    prompt_rect = prompt.get_rect(center=(SCREEN_WIDTH//2, 310))
     
+    drawn = None   # 目前畫面的 (懸停的按鈕, 是否顯示提示)；改變時才重畫
     while True:
-        screen.blit(first_page, (0, 0))
-    
-        # Modified options to include level selection
-        single_text = font_option.render("1 - Single Player", True, (255, 255, 255))
-        levels_text = font_option.render("2 - Select Level", True, (255, 255, 255))
-        multi_text = font_option.render("3 - Multiplayer", True, (255, 255, 255))
-        leaderboard_text = font_option.render("4 - View Leaderboard", True, (255, 255, 255))
-        gacha_text = font_option.render("5 - gacha", True, (255, 255, 255))
-        quit_text = font_option.render("ESC - Quit", True, (255, 255, 255))
-
-        # Background frames
-        buttons = [
-            ("1 - Single Player", "single"),
-            ("2 - Select Level", "levels"),
-            ("3 - Multiplayer", "multiplayer"),
-            ("4 - Gacha", "gacha"),
-            ("5 - View Leaderboard", "leaderboard"),
-            ("ESC - Quit", "quit"),
-        ]
-
-        button_rects = []
-        button_font = pygame.font.SysFont("Arial", 32)
-
-        y_start = 400
-        button_w, button_h = 360, 50
-
+        show_text, next_blink = blink()
         mouse_pos = pygame.mouse.get_pos()
-
-        for i, (label, action) in enumerate(buttons):
-            x = SCREEN_WIDTH // 2 - button_w // 2
-            y = y_start + i * 60
-
-            rect = pygame.Rect(x, y, button_w, button_h)
-
-            # 懸停特效
-            is_hovered = rect.collidepoint(mouse_pos)
-            color = (70, 120, 200) if is_hovered else (40, 40, 60)
-
-            pygame.draw.rect(screen, color, rect, border_radius=12)
-
-            # 陰影效果（內框）
-            pygame.draw.rect(screen, (100, 100, 150), rect, width=2, border_radius=12)
-
-            text_surface = button_font.render(label, True, (255, 255, 255))
-            text_rect = text_surface.get_rect(center=rect.center)
-            screen.blit(text_surface, text_rect)
-             # ✅ 把 rect 和對應動作一起存起來
-            button_rects.append((rect, action))
-        
-        # Blinking prompt
-        blink_timer += 1
-        if blink_timer >= 30:
-            show_text = not show_text
-            blink_timer = 0
-        
-        if show_text:
-            prompt = font_option.render("Choose your option", True, (255, 255, 0))
-            prompt_rect = prompt.get_rect(center=(SCREEN_WIDTH//2, 310))
-            pygame.draw.rect(screen, (0, 0, 0), 
-                           (prompt_rect.x-10, prompt_rect.y-10, 
-                            prompt_rect.width+20, prompt_rect.height+20))
-            screen.blit(prompt, prompt_rect)
-        
-        pygame.display.flip()
-        
-        for event in pygame.event.get():
+        hovered = next((i for i, (rect, _, _) in enumerate(buttons) if rect.collidepoint(mouse_pos)), None)
+        if (hovered, show_text) != drawn:
+            screen.blit(static, (0, 0))
+            if hovered is not None:
+                rect, _, text_surface = buttons[hovered]
+                _draw_menu_button(screen, rect, text_surface, hovered=True)
+            if show_text:
+                pygame.draw.rect(screen, (0, 0, 0), 
+                               (prompt_rect.x-10, prompt_rect.y-10, 
+                                prompt_rect.width+20, prompt_rect.height+20))
+                screen.blit(prompt, prompt_rect)
+            pygame.display.flip()
+            drawn = (hovered, show_text)
+        
+        # 等到有輸入或提示文字該切換時才醒來
+        events = wait_events(next_blink)
+        if needs_repaint(events):
+            drawn = None
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -210,88 +219,94 @@ def show_main_menu(game_instance=None):
                     pygame.quit()
                     sys.exit()      
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                for rect, action in button_rects:
+                for rect, action, _ in buttons:
                     if rect.collidepoint(event.pos):
                         return action
-        
-        clock.tick(60)
 
 # main.py 新增函式
 def show_gacha_menu(game):
     """顯示抽卡選單"""
-    font_title = pygame.font.SysFont("Arial", 36)
-    font_option = pygame.font.SysFont("Arial", 24)
-    font_small = pygame.font.SysFont("Arial", 18)
+    font_title = FontManager.get("Arial", 36)
+    font_option = FontManager.get("Arial", 24)
     
-    clock = pygame.time.Clock()
     result_card = None
-    result_timer = 0
     
     print("[DEBUG] game.gacha_system =", game.gacha_system)
 
-    while True:
-        screen.fill((20, 20, 40))
-        
-        # 顯示金幣數量
-        coin_text = font_option.render(f"coins: {game.coins}", True, (255, 215, 0))
-        screen.blit(coin_text, (20, 20))
-        
-        # 標題
-        title = font_title.render("banner", True, (255, 255, 255))
-        title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
-        screen.blit(title, title_rect)
-        
-        # 抽卡按鈕
-        draw_button = pygame.Rect(SCREEN_WIDTH//2 - 100, 200, 200, 50)
-        pygame.draw.rect(screen, (70, 70, 120), draw_button)
-        
-        if game.gacha_system.can_draw():
-            draw_text = font_option.render("pull (100coins)", True, (255, 255, 255))
-        else:
-            draw_text = font_option.render("not enough coins", True, (150, 150, 150))
+    draw_button = pygame.Rect(SCREEN_WIDTH//2 - 100, 200, 200, 50)
+    ad_button = pygame.Rect(SCREEN_WIDTH//2 - 100, 300, 200, 50)
+    back_button = pygame.Rect(SCREEN_WIDTH//2 - 100, 400, 200, 50)
 
-        if not game.gacha_system.can_draw():
-            ad_button = pygame.Rect(SCREEN_WIDTH//2 - 100, 300, 200, 50)
-            pygame.draw.rect(screen, (70, 120, 70), ad_button)
-            ad_text = font_option.render("watch ad (free)", True, (255, 255, 255))
-            ad_text_rect = ad_text.get_rect(center=ad_button.center)
-            screen.blit(ad_text, ad_text_rect)
-        
-        draw_text_rect = draw_text.get_rect(center=draw_button.center)
-        screen.blit(draw_text, draw_text_rect)
-        
+    # 靜態圖層：背景、標題、抽卡按鈕底色與返回按鈕
+    static = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+    static.fill((20, 20, 40))
+    
+    # 標題
+    title = font_title.render("banner", True, (255, 255, 255))
+    title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 100))
+    static.blit(title, title_rect)
+    
+    # 抽卡按鈕
+    pygame.draw.rect(static, (70, 70, 120), draw_button)
 
-        # 返回按鈕
-        back_button = pygame.Rect(SCREEN_WIDTH//2 - 100, 400, 200, 50)
-        pygame.draw.rect(screen, (120, 70, 70), back_button)
-        back_text = font_option.render("return", True, (255, 255, 255))
-        back_text_rect = back_text.get_rect(center=back_button.center)
-        screen.blit(back_text, back_text_rect)
-        
-        pygame.display.flip()
+    # 返回按鈕
+    pygame.draw.rect(static, (120, 70, 70), back_button)
+    back_text = font_option.render("return", True, (255, 255, 255))
+    back_text_rect = back_text.get_rect(center=back_button.center)
+    static.blit(back_text, back_text_rect)
+
+    pull_text = font_option.render("pull (100coins)", True, (255, 255, 255))
+    no_coins_text = font_option.render("not enough coins", True, (150, 150, 150))
+    ad_text = font_option.render("watch ad (free)", True, (255, 255, 255))
+
+    drawn = None   # 目前畫面的 (金幣, 能否抽卡)；改變時才重畫
+    while True:
+        can_draw = game.gacha_system.can_draw()
+        if (game.coins, can_draw) != drawn:
+            screen.blit(static, (0, 0))
+            
+            # 顯示金幣數量
+            coin_text = font_option.render(f"coins: {game.coins}", True, (255, 215, 0))
+            screen.blit(coin_text, (20, 20))
+            
+            draw_text = pull_text if can_draw else no_coins_text
+
+            if not can_draw:
+                pygame.draw.rect(screen, (70, 120, 70), ad_button)
+                ad_text_rect = ad_text.get_rect(center=ad_button.center)
+                screen.blit(ad_text, ad_text_rect)
+            
+            draw_text_rect = draw_text.get_rect(center=draw_button.center)
+            screen.blit(draw_text, draw_text_rect)
+            
+            pygame.display.flip()
+            drawn = (game.coins, can_draw)
         
-        for event in pygame.event.get():
+        events = wait_events()
+        if needs_repaint(events):
+            drawn = None
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
             if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
+                mouse_pos = event.pos
                 if draw_button.collidepoint(mouse_pos) and game.gacha_system.can_draw():
                     result_card = game.gacha_system.draw_card()
                     if result_card:
                         name, img_path, effect, rarity = result_card
                         game._animate_card_draw(img_path)  # ✅ 在這裡只播一次動畫
+                    drawn = None   # 動畫蓋過了畫面
                 elif not game.gacha_system.can_draw() and ad_button.collidepoint(mouse_pos):
                     play_ad_and_draw(game)
+                    drawn = None
                 elif back_button.collidepoint(mouse_pos):
                     return game
-        
-        clock.tick(60)
 
 def show_connection_screen():
     """Show connection screen"""
-    font_title = pygame.font.SysFont("Arial", 36)
-    font_text = pygame.font.SysFont("Arial", 24)
+    font_title = FontManager.get("Arial", 36)
+    font_text = FontManager.get("Arial", 24)
     
     # Create network manager
     network_manager = NetworkManager()
@@ -403,33 +418,37 @@ def show_connection_screen():
 
 def show_pause_screen(game):
     """Show pause screen with status panel support"""
-    clock = pygame.time.Clock()
+    init_display()  # 由 game.py 匯入呼叫時，取得目前的視窗
+    
+    font_large = FontManager.get("Arial", 48)
+    font_medium = FontManager.get("Arial", 36)
+
+    # 暫停畫面整個是靜態的：當下的遊戲畫面 + 半透明遮罩 + 文字，只合成一次
+    pause_layer = screen.copy()  # ✅ 抓當下畫面當背景
+    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+    overlay.fill((0, 0, 0, 128))
+    pause_layer.blit(overlay, (0, 0))
     
-    pause_background = screen.copy()  # ✅ 抓當下畫面當背景
+    paused = font_large.render("PAUSED", True, (255, 255, 255))
+    resume = font_medium.render("Press ESC to Resume", True, (255, 255, 255))
+    status_text = font_medium.render("Press S for Status", True, (255, 255, 255))
+    quit_text = font_medium.render("Press Q to Quit", True, (255, 255, 255))
+    
+    pause_layer.blit(paused, (SCREEN_WIDTH//2 - paused.get_width()//2, 300))
+    pause_layer.blit(resume, (SCREEN_WIDTH//2 - resume.get_width()//2, 400))
+    pause_layer.blit(status_text, (SCREEN_WIDTH//2 - status_text.get_width()//2, 450))
+    pause_layer.blit(quit_text, (SCREEN_WIDTH//2 - quit_text.get_width()//2, 500))
 
+    redraw = True
     while True:
-        # 繪製暫停畫面
-        screen.blit(pause_background, (0, 0))  # ✅ 顯示遊戲背景
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
-        screen.blit(overlay, (0, 0))
-        
-        font_large = pygame.font.SysFont("Arial", 48)
-        font_medium = pygame.font.SysFont("Arial", 36)
-        
-        paused = font_large.render("PAUSED", True, (255, 255, 255))
-        resume = font_medium.render("Press ESC to Resume", True, (255, 255, 255))
-        status_text = font_medium.render("Press S for Status", True, (255, 255, 255))
-        quit_text = font_medium.render("Press Q to Quit", True, (255, 255, 255))
-        
-        screen.blit(paused, (SCREEN_WIDTH//2 - paused.get_width()//2, 300))
-        screen.blit(resume, (SCREEN_WIDTH//2 - resume.get_width()//2, 400))
-        screen.blit(status_text, (SCREEN_WIDTH//2 - status_text.get_width()//2, 450))
-        screen.blit(quit_text, (SCREEN_WIDTH//2 - quit_text.get_width()//2, 500))
-        
-        pygame.display.flip()
-        
-        for event in pygame.event.get():
+        if redraw:
+            screen.blit(pause_layer, (0, 0))
+            pygame.display.flip()
+            redraw = False
+        
+        events = wait_events()
+        redraw = needs_repaint(events)
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -438,21 +457,24 @@ def show_pause_screen(game):
                     return True  # 繼續遊戲
                 elif event.key == pygame.K_s:
                     game.status_panel.toggle_visibility()
-                    pause_background = screen.copy()
+                    # 暫停中數值不會變：只在剛打開、視窗被蓋住後重畫
+                    status_redraw = True
                     while game.status_panel.visible:
-                        screen.blit(pause_background, (0, 0))  # 靜態畫面
-                        game.status_panel.draw(screen)
-                        pygame.display.flip()
-                        for ev in pygame.event.get():
+                        if status_redraw:
+                            screen.blit(pause_layer, (0, 0))  # 靜態畫面
+                            game.status_panel.draw(screen)
+                            pygame.display.flip()
+                        status_events = wait_events()
+                        status_redraw = needs_repaint(status_events)
+                        for ev in status_events:
                             if ev.type == pygame.QUIT:
                                 pygame.quit()
                                 sys.exit()
                             if ev.type == pygame.KEYDOWN and ev.key == pygame.K_s:
                                 game.status_panel.toggle_visibility()
+                    redraw = True
                 elif event.key == pygame.K_q:
                     return False  # 退出遊戲
-        
-        clock.tick(60)
 
 def show_game_over_screen(score, other_score=None, is_multiplayer=False):
     """Show game over screen"""
@@ -460,8 +482,8 @@ def show_game_over_screen(score, other_score=None, is_multiplayer=False):
     overlay.fill((0, 0, 0, 128))
     screen.blit(overlay, (0, 0))
     
-    font_large = pygame.font.SysFont("Arial", 48)
-    font_medium = pygame.font.SysFont("Arial", 36)
+    font_large = FontManager.get("Arial", 48)
+    font_medium = FontManager.get("Arial", 36)
     
     game_over = font_large.render("GAME OVER", True, (255, 0, 0))
     
@@ -504,9 +526,14 @@ def show_game_over_screen(score, other_score=None, is_multiplayer=False):
     screen.blit(quit_text, (SCREEN_WIDTH//2 - quit_text.get_width()//2, y_pos + 40))
     
     pygame.display.flip()
+    game_over_layer = screen.copy()
     
     while True:
-        for event in pygame.event.get():
+        events = wait_events()
+        if needs_repaint(events):
+            screen.blit(game_over_layer, (0, 0))
+            pygame.display.flip()
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -515,8 +542,6 @@ def show_game_over_screen(score, other_score=None, is_multiplayer=False):
                     return True  # Restart
                 elif event.key == pygame.K_q:
                     return False  # Quit
-        
-        pygame.time.Clock().tick(60)
 
 def run_single_player(leaderboard, level_manager=None, selected_level=None, game=None):
     """單人模式主流程：使用現有 Game 實例，否則建立新的。"""
@@ -540,7 +565,13 @@ def run_single_player(leaderboard, level_manager=None, selected_level=None, game
 
     game = game_instance  # 確保使用的是正確的 Game
     game.reset_game_state()
+    recorder = ReplayRecorder(game) if REPLAY_DIR else None
     game.run()
+    if recorder:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        replay_path = os.path.join(REPLAY_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{game.seed}.bbr")
+        recorder.finish().save(replay_path)
+        print(f"Replay saved: {replay_path}")
 
     # 遊戲結束給金幣獎勵
     reward = game.score // 10
@@ -602,6 +633,7 @@ def play_video(filename, screen):
         print(f"Video file not found: {filename}")
         return
 
+    from moviepy.editor import VideoFileClip  # 只有播放廣告時才需要 moviepy
     clip = VideoFileClip(filename)
     sw, sh = screen.get_size()
     frame_delay = 1 / 28
@@ -645,6 +677,7 @@ def main():
     global game_instance  # ✅ 讓其他函式能使用它
     game_instance = None  # ✅ 避免第一次使用時出現未定義錯
     """Modified main function with level system"""
+    init_display()
     leaderboard = Leaderboard(SCREEN_WIDTH, SCREEN_HEIGHT)
     level_manager = LevelManager()  # Create level manager
     
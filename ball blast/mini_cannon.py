@@ -1,5 +1,6 @@
 import pygame
-from bullet import Bullet
+from bullet_field import BulletField, OWNER_MINI
+from assets import AssetRegistry
 
 class MiniCannon:
     """
@@ -7,44 +8,44 @@ class MiniCannon:
     - 壽命 10 秒
     - 射速為主砲 50%（100 ms/發）
     - 被球撞到或時間結束即消失
+    - 傳入 Game 的 BulletField 時子彈與主砲共用同一個陣列場
     """
     FIRE_DELAY = 100      # 毫秒（主砲一半速度）
     LIFE_TIME  = 10_000   # 10 秒
     SIZE       = (90, 90)
 
-    def __init__(self, x: int, y: int):
+    def __init__(self, x: int, y: int, bullets: BulletField | None = None, now: int | None = None):
         self.x, self.y = x, y
 
-        # 直接縮小原 cannon 圖
-        self.image = pygame.transform.scale(
-            pygame.image.load("cannon.png").convert_alpha(),
-            MiniCannon.SIZE
-        )
+        # 直接縮小原 cannon 圖（與其他迷你砲台共用）
+        self.image, self.mask = AssetRegistry.load("cannon.png", MiniCannon.SIZE)
         self.rect = self.image.get_rect(center=(self.x, self.y))
-        self.mask = pygame.mask.from_surface(self.image)
 
-        self.spawn_time = pygame.time.get_ticks()
+        # now：遊戲的模擬時間（毫秒）；未提供時使用 pygame 的實際時間
+        self.spawn_time = pygame.time.get_ticks() if now is None else now
         self.last_shot_time = self.spawn_time
-        self.bullets: list[Bullet] = []
+
+        # 沒有共用的陣列場時自己管理子彈（移動與繪製）
+        self.owns_bullets = bullets is None
+        self.bullets: BulletField = BulletField() if bullets is None else bullets
 
     # ---------- 主要邏輯 ----------
-    def update(self) -> bool:
+    def update(self, now: int | None = None, dt: float = 1.0) -> bool:
         """
         更新射擊與壽命。
         仍存活回傳 True，超時回傳 False（呼叫者據此移除）。
         """
-        now = pygame.time.get_ticks()
+        if now is None:
+            now = pygame.time.get_ticks()
 
         # 發射子彈
         if now - self.last_shot_time >= MiniCannon.FIRE_DELAY:
             self.last_shot_time = now
-            self.bullets.append(Bullet(self.x, self.y))
+            self.bullets.spawn(self.x, self.y, OWNER_MINI)
 
-        # 更新子彈
-        for bullet in self.bullets[:]:
-            bullet.move()
-            if bullet.y < 0:
-                self.bullets.remove(bullet)
+        # 更新子彈（共用陣列場時由 Game 統一移動）
+        if self.owns_bullets:
+            self.bullets.step(dt)
 
         # 壽命判定
         return now - self.spawn_time < MiniCannon.LIFE_TIME
@@ -52,6 +53,5 @@ class MiniCannon:
     # ---------- 繪製 ----------
     def draw(self, surface: pygame.Surface):
         surface.blit(self.image, self.rect)
-        for bullet in self.bullets:
-            bullet.draw(surface)
-
+        if self.owns_bullets:
+            self.bullets.draw(surface)
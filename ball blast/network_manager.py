@@ -1,12 +1,14 @@
 # network_manager.py
 import socket
-import pickle
 import threading
 import queue
+from protocol import Connection, decode_welcome, MSG_WELCOME, MSG_READY, MSG_GAME_STATE, MSG_PLAYER_STATE
+from state_codec import encode_state, decode_state
 
 class NetworkManager:
     def __init__(self):
         self.socket = None
+        self.connection = None
         self.is_connected = False
         self.player_id = None
         self.game_state_queue = queue.Queue()
@@ -22,10 +24,15 @@ class NetworkManager:
             # ✅ 成功後再移除 timeout 讓 recv 可阻塞
             self.socket.settimeout(None)
 
-            # 接收玩家ID和初始遊戲狀態
-            initial_data = pickle.loads(self.socket.recv(4096))
+            # 接收玩家ID和初始遊戲狀態（同一次收到的其他訊息留給接收線程處理）
+            self.connection = Connection(self.socket)
+            frames = self.connection.recv()
+            if not frames or frames[0][0] != MSG_WELCOME:
+                raise ConnectionError("伺服器沒有回傳玩家ID")
+            initial_data = decode_welcome(frames[0][1])
             self.player_id = initial_data['player_id']
             self.is_connected = True
+            self._handle_frames(frames[1:])
 
             # 開始接收線程
             self.receive_thread = threading.Thread(target=self._receive_loop)
@@ -48,21 +55,28 @@ class NetworkManager:
         """接收遊戲狀態的循環"""
         while self.is_connected:
             try:
-                data = self.socket.recv(4096)
-                if not data:
+                frames = self.connection.recv()
+                if frames is None:
                     break
-                game_state = pickle.loads(data)
-                self.game_state_queue.put(game_state)
+                self._handle_frames(frames)
             except Exception as e:
                 print(f"接收數據錯誤: {e}")
                 break
         self.is_connected = False
+
+    def _handle_frames(self, frames):
+        """把收到的訊息放進遊戲狀態佇列"""
+        for msg_type, payload in frames:
+            if msg_type == MSG_GAME_STATE:
+                self.game_state_queue.put(decode_state(payload))
+            elif msg_type == MSG_READY:
+                self.game_state_queue.put({'game_ready': True})
     
     def send_player_state(self, player_state):
         """發送玩家狀態"""
         if self.is_connected:
             try:
-                self.socket.send(pickle.dumps(player_state))
+                self.connection.send(MSG_PLAYER_STATE, encode_state(player_state))
             except Exception as e:
                 print(f"發送數據錯誤: {e}")
                 self.is_connected = False
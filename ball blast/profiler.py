@@ -0,0 +1,174 @@
+# profiler.py
+import csv
+import gc
+import os
+import time
+from collections import deque
+import pygame
+from fonts import FontManager
+
+# Game.run 每張畫面的階段（依執行順序）
+FRAME_PHASES = ("wait", "events", "input", "update_bullets", "update_balls",
+                "handle_collisions", "check_game_over", "network", "render")
+
+TARGET_FRAME_MS = 1000 / 60
+
+
+class FrameProfiler:
+    """
+    遊戲中的效能分析：
+    - 每張畫面記錄各階段耗時、模擬步數、球 / 子彈數量與 GC 次數
+    - 保留最近 history_seconds 秒的紀錄，dump_csv() 可存成 CSV（檔名顯示在疊加層上）
+    - draw() 在畫面右上角顯示滾動平均、畫面時間圖表（F3 切換）
+    """
+
+    def __init__(self, game, history_seconds=10, window=60, graph_frames=120):
+        self.game = game
+        self.history_seconds = history_seconds
+        self.window = window              # 滾動平均的畫面數
+        self.graph_frames = graph_frames  # 圖表顯示的畫面數
+        self.visible = False
+        self.samples = deque()            # 每張畫面一筆 dict
+        self.font = FontManager.get("Arial", 18)
+
+        self._current = None
+        self._frame_start = 0.0
+        self._gc_before = self._gc_collections()
+        self._text = []                   # 快取的文字圖，每 0.5 秒更新一次
+        self._text_time = 0.0
+        self._panel = None                # 快取的半透明底板，高度改變時才重建
+        self.last_dump = None             # 最近一次 dump_csv 的檔名
+
+    def toggle_visibility(self):
+        """切換疊加層的可見性"""
+        self.visible = not self.visible
+
+    # ---------- 記錄 ----------
+    @staticmethod
+    def _gc_collections():
+        return [stats['collections'] for stats in gc.get_stats()]
+
+    def begin_frame(self, wait_seconds=0.0):
+        """一張畫面開始；wait_seconds 為 clock.tick 等待的時間"""
+        self._frame_start = time.perf_counter()
+        self._current = dict.fromkeys(FRAME_PHASES, 0.0)
+        self._current["wait"] = wait_seconds
+
+    def run(self, phase, func, *args):
+        """執行 func 並把耗時累加到 phase（同一張畫面可能跑多次模擬）"""
+        start = time.perf_counter()
+        result = func(*args)
+        if self._current is not None:
+            self._current[phase] += time.perf_counter() - start
+        return result
+
+    def end_frame(self, ticks):
+        """一張畫面結束，存下這張畫面的紀錄"""
+        if self._current is None:
+            return
+        now = time.perf_counter()
+        game = self.game
+        gc_now = self._gc_collections()
+        sample = {phase: seconds * 1000 for phase, seconds in self._current.items()}
+        sample.update({
+            "time": now,
+            "frame": (now - self._frame_start) * 1000 + sample["wait"],
+            "ticks": ticks,
+            "balls": len(game.balls),
+            "bullets": len(game.bullets),
+            "gc0": gc_now[0] - self._gc_before[0],
+            "gc1": gc_now[1] - self._gc_before[1],
+            "gc2": gc_now[2] - self._gc_before[2],
+        })
+        self._gc_before = gc_now
+        self._current = None
+
+        samples = self.samples
+        samples.append(sample)
+        while now - samples[0]["time"] > self.history_seconds:
+            samples.popleft()
+
+    # ---------- 匯出 ----------
+    def dump_csv(self, path=None):
+        """把保留中的每張畫面紀錄寫成 CSV，回傳檔名"""
+        if path is None:
+            path = time.strftime("profile-%Y%m%d-%H%M%S.csv")
+        columns = ["time", "frame"] + list(FRAME_PHASES) + ["ticks", "balls", "bullets", "gc0", "gc1", "gc2"]
+        start = self.samples[0]["time"] if self.samples else 0.0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow([c if c in ("time", "ticks", "balls", "bullets", "gc0", "gc1", "gc2")
+                             else c + "_ms" for c in columns])
+            for sample in self.samples:
+                row = dict(sample, time=sample["time"] - start)
+                writer.writerow([round(row[c], 4) if isinstance(row[c], float) else row[c]
+                                 for c in columns])
+        self.last_dump = path
+        self._text_time = 0.0   # 下一張畫面就更新文字，顯示檔名
+        return path
+
+    # ---------- 繪製 ----------
+    def _recent(self, count):
+        n = len(self.samples)
+        return [self.samples[i] for i in range(max(0, n - count), n)]
+
+    def _update_text(self):
+        """重新產生統計文字（只在需要時呼叫，避免每幀 render 字串）"""
+        recent = self._recent(self.window)
+        if not recent:
+            self._text = []
+            return
+        count = len(recent)
+        frame_ms = [s["frame"] for s in recent]
+        mean_frame = sum(frame_ms) / count
+        lines = [f"FPS {1000 / mean_frame:5.1f}   frame {mean_frame:5.2f} ms (max {max(frame_ms):.2f})"]
+        for phase in FRAME_PHASES:
+            mean = sum(s[phase] for s in recent) / count
+            lines.append(f"{phase:>18} {mean:7.3f} ms")
+        last = recent[-1]
+        lines.append(f"balls {last['balls']}  bullets {last['bullets']}  "
+                     f"ticks/frame {sum(s['ticks'] for s in recent) / count:.2f}")
+        gc_counts = [sum(s[f"gc{i}"] for s in recent) for i in range(3)]
+        lines.append(f"gc (last {count} frames): {gc_counts[0]} / {gc_counts[1]} / {gc_counts[2]}")
+        lines.append("F3 hide   F4 dump CSV")
+        if self.last_dump:
+            lines.append(f"saved {os.path.basename(self.last_dump)}")
+        self._text = [self.font.render(line, True, (255, 255, 255)) for line in lines]
+
+    def draw(self, screen):
+        """繪製效能疊加層；回傳畫到的範圍（未顯示時為 None）"""
+        if not self.visible:
+            return None
+        now = time.perf_counter()
+        if now - self._text_time > 0.5:
+            self._text_time = now
+            self._update_text()
+
+        line_height = self.font.get_linesize()
+        graph_height = 60
+        width = 300
+        height = len(self._text) * line_height + graph_height + 20
+        x = screen.get_width() - width - 10
+        y = 10
+
+        if self._panel is None or self._panel.get_height() != height:
+            self._panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            self._panel.fill((0, 0, 0, 170))
+        screen.blit(self._panel, (x, y))
+        for i, text in enumerate(self._text):
+            screen.blit(text, (x + 8, y + 5 + i * line_height))
+
+        # 畫面時間圖表：每張畫面一條，超過 60 FPS 預算 1.5 倍（明顯卡頓）的標紅；水平線為 16.7 ms
+        graph_top = y + height - graph_height - 8
+        graph_bottom = graph_top + graph_height
+        scale = graph_height / (TARGET_FRAME_MS * 2)
+        recent = self._recent(self.graph_frames)
+        bar_width = max(1, (width - 16) // self.graph_frames)
+        for i, sample in enumerate(recent):
+            bar = min(graph_height, int(sample["frame"] * scale))
+            color = (230, 80, 80) if sample["frame"] > TARGET_FRAME_MS * 1.5 else (90, 200, 90)
+            bx = x + 8 + i * bar_width
+            pygame.draw.line(screen, color, (bx, graph_bottom), (bx, graph_bottom - bar))
+        budget_y = graph_bottom - int(TARGET_FRAME_MS * scale)
+        pygame.draw.line(screen, (240, 240, 120), (x + 8, budget_y), (x + width - 8, budget_y))
+        return pygame.Rect(x, y, width, height)
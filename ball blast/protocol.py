@@ -0,0 +1,124 @@
+# protocol.py
+"""
+用戶端與伺服器之間的封包格式（TCP 是位元組串流，一次 recv 可能只有半個訊息，
+也可能同時收到好幾個訊息，所以每個訊息前面都加上長度）：
+
+  frame = 長度(I, 不含表頭) 類型(B) + payload
+
+- FrameDecoder：把收到的位元組餵進去，取出完整的 (類型, payload)
+- Connection：包裝 socket，負責接收解碼與送出（每個訊息一次 sendall）
+"""
+import struct
+import threading
+
+# 訊息類型
+MSG_WELCOME = 1        # 伺服器 -> 用戶端：玩家編號
+MSG_READY = 2          # 伺服器 -> 用戶端：兩位玩家都到齊
+MSG_PLAYER_STATE = 3   # 用戶端 -> 伺服器：自己的狀態
+MSG_GAME_STATE = 4     # 伺服器 -> 用戶端：對方的狀態
+MESSAGE_TYPES = (MSG_WELCOME, MSG_READY, MSG_PLAYER_STATE, MSG_GAME_STATE)
+
+# 單一訊息的 payload 上限；超過視為錯誤（避免錯誤的長度讓接收端一直等或吃光記憶體）
+MAX_PAYLOAD_SIZE = 1 << 20
+RECV_SIZE = 64 * 1024
+
+_HEADER = struct.Struct("<IB")
+HEADER_SIZE = _HEADER.size
+# MSG_WELCOME 的內容：玩家編號、是否已可開始
+_WELCOME = struct.Struct("<B?")
+
+
+class ProtocolError(ValueError):
+    """收到或要送出不合格式的訊息"""
+
+
+def encode_frame(msg_type, payload):
+    """把一個訊息編成 frame"""
+    if len(payload) > MAX_PAYLOAD_SIZE:
+        raise ProtocolError(f"payload too large: {len(payload)} bytes (limit {MAX_PAYLOAD_SIZE})")
+    return _HEADER.pack(len(payload), msg_type) + payload
+
+
+def encode_welcome(player_id, game_ready):
+    """MSG_WELCOME 的內容"""
+    return _WELCOME.pack(player_id, game_ready)
+
+
+def decode_welcome(payload):
+    if len(payload) != _WELCOME.size:
+        raise ProtocolError(f"bad welcome message: {len(payload)} bytes")
+    player_id, game_ready = _WELCOME.unpack(payload)
+    return {'player_id': player_id, 'game_ready': game_ready}
+
+
+class FrameDecoder:
+    """
+    串流解碼器：feed() 接收任意切割的位元組，回傳其中完整的訊息 [(類型, payload), ...]，
+    不完整的部分留到下次。
+    """
+
+    def __init__(self, max_payload=MAX_PAYLOAD_SIZE):
+        self.max_payload = max_payload
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= HEADER_SIZE:
+            length, msg_type = _HEADER.unpack_from(buffer, offset)
+            if length > self.max_payload:
+                raise ProtocolError(f"frame too large: {length} bytes (limit {self.max_payload})")
+            if msg_type not in MESSAGE_TYPES:
+                raise ProtocolError(f"unknown message type {msg_type}")
+            end = offset + HEADER_SIZE + length
+            if end > len(buffer):
+                break
+            frames.append((msg_type, bytes(buffer[offset + HEADER_SIZE:end])))
+            offset = end
+        del buffer[:offset]
+        return frames
+
+    def pending(self):
+        """還沒湊成完整訊息的位元組數"""
+        return len(self._buffer)
+
+
+class Connection:
+    """
+    一條 framed 的 TCP 連線：
+    - recv()：阻塞直到至少有一個完整訊息，回傳 [(類型, payload), ...]；對方關閉時回傳 None
+    - send()：編成 frame 後以一次 sendall 送出
+    每次網路同步兩端各只送一則狀態，沒有可以合併的訊息，所以不做批次佇列。
+    送出端有鎖，可以從多個執行緒呼叫。
+    """
+
+    def __init__(self, sock, max_payload=MAX_PAYLOAD_SIZE):
+        self.sock = sock
+        self.decoder = FrameDecoder(max_payload)
+        self._send_lock = threading.Lock()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def recv(self):
+        while True:
+            data = self.sock.recv(RECV_SIZE)
+            if not data:
+                return None
+            self.bytes_received += len(data)
+            frames = self.decoder.feed(data)
+            if frames:
+                return frames
+
+    def send(self, msg_type, payload):
+        frame = encode_frame(msg_type, payload)
+        with self._send_lock:
+            self.sock.sendall(frame)
+            self.bytes_sent += len(frame)
+
+    def close(self):
+        self.sock.close()
+
+    def stats(self):
+        return {'bytes_sent': self.bytes_sent, 'bytes_received': self.bytes_received}
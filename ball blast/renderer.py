@@ -0,0 +1,204 @@
+# renderer.py
+import numpy as np
+import pygame
+
+# 髒區域佔畫面的比例超過這個值時，改成整張重畫（一次 blit 背景 + 整張更新）
+DIRTY_THRESHOLD = 0.4
+# 髒矩形超過這個數量時直接整張重畫（上千個小矩形逐一還原、更新反而比較慢）
+MAX_DIRTY_RECTS = 512
+# 估計髒區域面積用的格子大小（像素）
+COVERAGE_TILE = 16
+# 因為太髒而整張重畫時，每隔幾張才重新估計一次（畫面內容變化很慢）
+RECHECK_FRAMES = 8
+
+
+class DirtyRenderer:
+    """
+    只更新有變動區域的繪製器（dirty rectangles）：
+    - begin() 把上一張畫面畫過的區域還原成背景（不重畫整張背景）
+    - 移動的物件透過 blit() / blits() 畫上去，並記下所佔的矩形
+    - HUD 文字是保留的圖層：內容與位置沒變、且沒被還原或蓋到時不重畫
+    - present() 只把髒矩形交給 pygame.display.update
+    髒區域超過 threshold（畫面比例）時改為整張重畫；threshold=0 表示每張都整張重畫。
+
+    介面與 Surface.blit / blits 相同，Ball.draw 等繪製函式可以直接把它當成畫面。
+    """
+
+    def __init__(self, screen, background, threshold=DIRTY_THRESHOLD):
+        self.screen = screen
+        self.background = background
+        self.threshold = threshold
+        self._screen_area = screen.get_width() * screen.get_height()
+        self._tiles = (-(-screen.get_height() // COVERAGE_TILE), -(-screen.get_width() // COVERAGE_TILE))
+
+        self._full = True        # 這張畫面是否整張重畫
+        self._force_full = True  # 下一張是否必須整張重畫（畫面被別的畫面蓋過）
+        self._estimate = 1.0     # 上一張的髒區域比例
+        self._erased = []        # 這張畫面還原成背景的矩形
+        self._drawn = []         # 這張畫面畫過的矩形（下一張要還原）
+        self._hud = []           # [(key, surface, rect), ...] 上一張的 HUD
+        self._hud_redraw = set() # 這張畫面一定要重畫的 HUD 項目
+        self._hud_drawn = []     # 這張畫面重畫的 HUD 矩形
+        self._log = []           # 這張畫面的 blit 紀錄（重畫被蓋到的 HUD 時重播）
+        self._log_rects = []     # 與 _log 一一對應的畫到的矩形
+
+        # 統計
+        self.frames = 0
+        self.full_frames = 0
+        self.dirty_area = 0.0
+
+    def invalidate(self):
+        """畫面被其他畫面（暫停、抽卡動畫…）蓋過，下一張整張重畫"""
+        self._force_full = True
+
+    # ---------- 一張畫面 ----------
+    def begin(self, hud, full=False):
+        """
+        開始一張畫面。hud：這張畫面的 HUD [(key, surface, (x, y)), ...]，順序固定；
+        key（例如文字內容）相同且位置不變的項目視為沒有改變。
+        full=True 強制整張重畫（例如全螢幕的半透明面板）。
+        """
+        hud = [(key, surface, surface.get_rect(topleft=pos)) for key, surface, pos in hud]
+        previous = self._hud
+        erase = list(self._drawn)
+        redraw = []
+        # 內容或位置改變的 HUD：舊的與新的位置都要還原（文字有半透明的邊，不能疊在舊字上）
+        for i, (key, surface, rect) in enumerate(hud):
+            if i >= len(previous) or previous[i][0] != key or previous[i][2] != rect:
+                if i < len(previous):
+                    erase.append(previous[i][2])
+                erase.append(rect)
+                redraw.append(i)
+        for i in range(len(hud), len(previous)):
+            erase.append(previous[i][2])
+        # 沒改變、但底下被還原的 HUD：整塊還原後重畫
+        for i, (_, _, rect) in enumerate(hud):
+            if i not in redraw and rect.collidelist(erase) != -1:
+                erase.append(rect)
+                redraw.append(i)
+
+        # 上一張量到的髒區域比例，作為這張要還原多少的估計
+        self._full = full or self._force_full or self._estimate > self.threshold
+        self._force_full = False
+        if self._full:
+            self.screen.blit(self.background, (0, 0))
+            self._erased = []
+            redraw = range(len(hud))
+        else:
+            background = self.background
+            self.screen.blits([(background, rect, rect) for rect in erase], doreturn=False)
+            self._erased = erase
+        self._hud = hud
+        self._hud_redraw = set(redraw)
+        self._drawn = []
+        self._log = []
+        self._log_rects = []
+        self._hud_drawn = []
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = self.screen.blit(source, dest, area, special_flags)
+        drawn = self._drawn
+        # 球上的 HP 文字落在球的範圍內，不必另外記一個矩形
+        if not (drawn and drawn[-1].contains(rect)):
+            drawn.append(rect)
+        if not self._full:
+            self._log.append((source, dest, area, special_flags))
+            self._log_rects.append(rect)
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        if not self._full:
+            blit_sequence = list(blit_sequence)
+            self._log.extend(blit_sequence)
+        rects = self.screen.blits(blit_sequence)
+        self._drawn.extend(rects)
+        if not self._full:
+            self._log_rects.extend(rects)
+        return rects if doreturn else None
+
+    def mark(self, rect):
+        """直接畫在 screen 上的區域（例如半透明疊加層）：這張要更新、下一張要還原"""
+        if rect:
+            self._drawn.append(pygame.Rect(rect))
+
+    def draw_hud(self):
+        """
+        畫 HUD（在移動的物件之上）。沒改變、沒被還原、也沒被這張畫面的物件蓋到的項目，
+        畫面上原本的像素就是對的，不必重畫；被物件蓋到的項目只在自己的範圍內
+        還原背景、重播這張畫面中與它重疊的繪製，再畫上文字。
+        """
+        screen = self.screen
+        drawn = self._drawn
+        log, log_rects = self._log, self._log_rects
+        for i, (_, surface, rect) in enumerate(self._hud):
+            if i not in self._hud_redraw:
+                if rect.collidelist(drawn) == -1:
+                    continue
+                screen.set_clip(rect)
+                screen.blit(self.background, rect, rect)
+                # 只重播畫到這個範圍的項目（依原本的順序），不是整張畫面的紀錄
+                screen.blits([log[k] for k in rect.collidelistall(log_rects)], doreturn=False)
+                screen.set_clip(None)
+            screen.blit(surface, rect)
+            self._hud_drawn.append(rect)
+        self._log = []
+        self._log_rects = []
+
+    def present(self):
+        """把這張畫面送到視窗：整張或只送髒矩形"""
+        self.frames += 1
+        if self._full:
+            self.full_frames += 1
+            self.dirty_area += 1.0
+            # 下一張要還原的是這張畫過的範圍
+            if self._estimate <= self.threshold or self.frames % RECHECK_FRAMES == 0:
+                self._estimate = self._dirty_fraction(self._drawn)
+            pygame.display.update()
+            return
+        rects = self._erased + self._drawn + self._hud_drawn
+        self._estimate = fraction = self._dirty_fraction(rects)
+        self.dirty_area += fraction
+        if fraction > self.threshold:
+            pygame.display.update()
+        else:
+            pygame.display.update(rects)
+
+    def _dirty_fraction(self, rects):
+        """
+        估計 rects 覆蓋畫面的比例。先用面積總和（重疊處重複計算，是上限）；
+        超過門檻時再以 COVERAGE_TILE 大小的格子算出實際覆蓋的比例（同一顆球
+        前後兩張的矩形大多重疊）。矩形太多時直接視為整張。
+        """
+        if self.threshold <= 0 or len(rects) > MAX_DIRTY_RECTS:
+            return 1.0
+        area = sum(rect.w * rect.h for rect in rects)
+        if area <= self.threshold * self._screen_area:
+            return area / self._screen_area
+        # 二維差分：每個矩形在四個角 +1 / -1，累加後大於 0 的格子即被覆蓋
+        rows, cols = self._tiles
+        r = np.array([tuple(rect) for rect in rects], dtype=np.int64).reshape(-1, 4)
+        tile = COVERAGE_TILE
+        x0 = np.clip(r[:, 0] // tile, 0, cols)
+        y0 = np.clip(r[:, 1] // tile, 0, rows)
+        x1 = np.clip(-(-(r[:, 0] + r[:, 2]) // tile), 0, cols)
+        y1 = np.clip(-(-(r[:, 1] + r[:, 3]) // tile), 0, rows)
+        width = cols + 1
+        size = (rows + 1) * width
+        diff = (np.bincount(y0 * width + x0, minlength=size) - np.bincount(y0 * width + x1, minlength=size)
+                - np.bincount(y1 * width + x0, minlength=size) + np.bincount(y1 * width + x1, minlength=size))
+        covered = diff.reshape(rows + 1, width).cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+        return float(covered.sum()) / covered.size
+
+    def stats(self):
+        """回傳統計：平均髒區域比例與整張重畫的比例"""
+        frames = self.frames or 1
+        return {
+            'frames': self.frames,
+            'full_frames': self.full_frames,
+            'dirty_fraction': self.dirty_area / frames,
+        }
+
+    def reset_stats(self):
+        self.frames = 0
+        self.full_frames = 0
+        self.dirty_area = 0.0
@@ -0,0 +1,166 @@
+# replay.py
+"""
+重播檔：記錄 seed、每一步的輸入與抽卡事件，可在無視窗下全速重播，
+並以最後的狀態雜湊確認重播結果與錄製時完全相同（用來在相同的對局上比較效能）。
+
+檔案格式（little-endian）：
+  header  "BBRP" 版本(B) 碰撞模式(B) seed(Q) sim_rate(H) width(H) height(H)
+          關卡設定 LEVEL_FIELDS、起始數值 LOADOUT_FIELDS
+          步數(I) 事件數(H)
+  inputs  每步 2 位元（bit0 = 左、bit1 = 右），每個 byte 依序放 4 步
+  events  (步數 I, CARD_POOL 編號 B) x 事件數
+  hash    最後狀態的 GameState.state_hash()（16 bytes）
+"""
+import struct
+from game_state import GameState
+from gacha import CARD_POOL
+from collision import NARROW_PHASES
+
+MAGIC = b"BBRP"
+VERSION = 1
+
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+
+# 影響模擬的關卡設定與玩家數值（抽卡的效果會累積在這些數值上）
+LEVEL_FIELDS = ('spawn_interval', 'ball_hp_min', 'ball_hp_max',
+                'ball_speed_min', 'ball_speed_max', 'reward_ball_chance')
+LEVEL_FORMAT = "iiiddd"
+LOADOUT_FIELDS = ('bullets_per_second', 'bullet_rows', 'damage_per_bullet',
+                  'crit_rate', 'crit_damage', 'cannon_speed', 'cannon_x')
+LOADOUT_FORMAT = "iiiiiid"
+
+_HEADER = struct.Struct("<4sBBQHHH" + LEVEL_FORMAT + LOADOUT_FORMAT + "IH")
+_EVENT = struct.Struct("<IB")
+_CARD_INDEX = {card["name"]: i for i, card in enumerate(CARD_POOL)}
+
+
+def _read_loadout(state):
+    values = [getattr(state, name) for name in LOADOUT_FIELDS[:5]]
+    return tuple(values + [state.my_cannon.speed, float(state.my_cannon.x)])
+
+
+def _apply_loadout(state, loadout):
+    for name, value in zip(LOADOUT_FIELDS[:5], loadout):
+        setattr(state, name, value)
+    state.my_cannon.speed = loadout[5]
+    state.my_cannon.x = loadout[6]
+    state.my_cannon.rect.center = (state.my_cannon.x, state.my_cannon.y)
+
+
+class Replay:
+    """一局的重播資料；inputs 為每一步的輸入位元（INPUT_LEFT | INPUT_RIGHT）"""
+
+    def __init__(self, seed, sim_rate, width, height, level, loadout,
+                 collision_mode="mask", inputs=None, events=None, final_hash=None):
+        self.seed = seed
+        self.sim_rate = sim_rate
+        self.width, self.height = width, height
+        self.level = tuple(level)
+        self.loadout = tuple(loadout)
+        self.collision_mode = collision_mode
+        self.inputs = bytearray() if inputs is None else bytearray(inputs)
+        self.events = [] if events is None else list(events)   # [(步數, 卡片名稱), ...]
+        self.final_hash = final_hash
+
+    def __len__(self):
+        return len(self.inputs)
+
+    # ---------- 編碼 ----------
+    def to_bytes(self):
+        header = _HEADER.pack(MAGIC, VERSION, NARROW_PHASES.index(self.collision_mode), self.seed,
+                              self.sim_rate, self.width, self.height, *self.level, *self.loadout,
+                              len(self.inputs), len(self.events))
+        packed = bytearray((len(self.inputs) + 3) // 4)
+        for tick, bits in enumerate(self.inputs):
+            packed[tick >> 2] |= (bits & 3) << ((tick & 3) * 2)
+        events = b"".join(_EVENT.pack(tick, _CARD_INDEX[name]) for tick, name in self.events)
+        return header + bytes(packed) + events + bytes.fromhex(self.final_hash or "0" * 32)
+
+    @classmethod
+    def from_bytes(cls, data):
+        fields = _HEADER.unpack_from(data)
+        magic, version, mode, seed, sim_rate, width, height = fields[:7]
+        if magic != MAGIC:
+            raise ValueError("not a Ball Blast replay")
+        if version != VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        level = fields[7:7 + len(LEVEL_FIELDS)]
+        loadout = fields[7 + len(LEVEL_FIELDS):-2]
+        ticks, event_count = fields[-2:]
+
+        offset = _HEADER.size
+        packed = data[offset:offset + (ticks + 3) // 4]
+        inputs = bytearray((packed[tick >> 2] >> ((tick & 3) * 2)) & 3 for tick in range(ticks))
+        offset += len(packed)
+        events = []
+        for _ in range(event_count):
+            tick, index = _EVENT.unpack_from(data, offset)
+            events.append((tick, CARD_POOL[index]["name"]))
+            offset += _EVENT.size
+        final_hash = data[offset:offset + 16].hex()
+        return cls(seed, sim_rate, width, height, level, loadout, NARROW_PHASES[mode],
+                   inputs, events, final_hash)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """
+    接在剛重置（reset_game_state）的單人 GameState 上，
+    記錄之後每一步的輸入與抽卡；finish() 回傳 Replay。
+    """
+
+    def __init__(self, state):
+        if state.multiplayer:
+            raise ValueError("replays only cover single-player games")
+        if state.sim_ticks != 0:
+            raise ValueError("start recording right after reset_game_state()")
+        self.state = state
+        self.replay = Replay(state.seed, state.sim_rate, state.width, state.height,
+                             [state.level_config[name] for name in LEVEL_FIELDS],
+                             _read_loadout(state), state.collision_mode)
+        state.recorder = self
+
+    def record_tick(self, left, right):
+        self.replay.inputs.append((INPUT_LEFT if left else 0) | (INPUT_RIGHT if right else 0))
+
+    def record_card(self, card_name):
+        # 在第 n 步之前抽到的卡，重播時於執行第 n 步前套用
+        self.replay.events.append((len(self.replay.inputs), card_name))
+
+    def finish(self):
+        """停止錄製並記下最後狀態的雜湊"""
+        self.state.recorder = None
+        self.replay.final_hash = self.state.state_hash()
+        return self.replay
+
+
+def play(replay, **state_kwargs):
+    """
+    無視窗、全速重播；回傳 (GameState, 雜湊是否一致)。
+    state_kwargs 可指定不影響結果的設定，例如 collision_strategy。
+    """
+    state = GameState(replay.width, replay.height, sim_rate=replay.sim_rate,
+                      collision_mode=replay.collision_mode, seed=replay.seed, **state_kwargs)
+    state.level_config = dict(state.level_config, **dict(zip(LEVEL_FIELDS, replay.level)))
+    _apply_loadout(state, replay.loadout)
+    state.reset_game_state(replay.seed)   # 依起始數值重新計算射擊間隔
+
+    events = replay.events
+    e = 0
+    for tick, bits in enumerate(replay.inputs):
+        while e < len(events) and events[e][0] == tick:
+            state.apply_card_effect(events[e][1])
+            e += 1
+        state.step(bits & INPUT_LEFT, bits & INPUT_RIGHT)
+    for _, card_name in events[e:]:
+        state.apply_card_effect(card_name)
+    return state, state.state_hash() == replay.final_hash
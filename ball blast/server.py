@@ -1,8 +1,9 @@
 # server.py
 import socket
 import threading
-import pickle
 import time
+from protocol import Connection, encode_welcome, MSG_WELCOME, MSG_READY, MSG_PLAYER_STATE, MSG_GAME_STATE
+from state_codec import decode_state
 
 class GameServer:
     def __init__(self, host='0.0.0.0', port=5555):  # ✅ 修改這裡
@@ -23,29 +24,26 @@ class GameServer:
             print(f"✅ 伺服器啟動在 {self.host}:{self.port}，等待玩家連接...")
             
             while len(self.players) < self.max_players:
-                conn, addr = self.socket.accept()
+                sock, addr = self.socket.accept()
+                conn = Connection(sock)
                 player_id = len(self.players)
                 
                 print(f"🎮 玩家 {player_id} 從 {addr} 連接")
                 
-                initial_data = {
-                    'player_id': player_id,
-                    'game_ready': len(self.players) == self.max_players - 1
-                }
-                conn.send(pickle.dumps(initial_data))
+                game_ready = len(self.players) == self.max_players - 1
+                conn.send(MSG_WELCOME, encode_welcome(player_id, game_ready))
                 
                 self.players[player_id] = conn
-                self.player_states[player_id] = {}
+                self.player_states[player_id] = None
                 
                 thread = threading.Thread(target=self.handle_client, args=(conn, player_id))
                 thread.daemon = True
                 thread.start()
             
             self.game_started = True
-            game_ready_signal = {'game_ready': True}
-            for conn in self.players.values():
+            for conn in list(self.players.values()):
                 try:
-                    conn.send(pickle.dumps(game_ready_signal))
+                    conn.send(MSG_READY, b"")
                 except:
                     pass
             
@@ -62,25 +60,21 @@ class GameServer:
         print(f"🔁 開始處理玩家 {player_id}")
         try:
             while True:
-                data = conn.recv(4096)
-                if not data:
+                frames = conn.recv()
+                if frames is None:
                     break
-                
-                self.player_states[player_id] = pickle.loads(data)
-                other_id = 1 - player_id
-                game_state = {}
 
-                if other_id in self.player_states:
-                    other = self.player_states[other_id]
-                    game_state = {
-                        'other_cannon_x': other.get('cannon_x', 300),
-                        'other_bullets': other.get('bullets', []),
-                        'other_score': other.get('score', 0),
-                    }
-                    if other_id == 0 and 'balls' in other:
-                        game_state['balls'] = other['balls']
+                # 一次收到好幾個狀態時只需要最新的一個，也只回覆一次
+                states = [payload for msg_type, payload in frames if msg_type == MSG_PLAYER_STATE]
+                if not states:
+                    continue
+                # 先解碼檢查格式，之後原封不動轉給對方（不必重新編碼）
+                decode_state(states[-1])
+                self.player_states[player_id] = states[-1]
 
-                conn.send(pickle.dumps(game_state))
+                other = self.player_states.get(1 - player_id)
+                if other is not None:
+                    conn.send(MSG_GAME_STATE, other)
         except Exception as e:
             print(f"❌ 玩家 {player_id} 錯誤: {e}")
         finally:
@@ -0,0 +1,265 @@
+# snapshot.py
+"""
+多人模式的球體同步：以差異快照（delta snapshot）取代每次送出全部的球。
+
+- 每顆球有穩定的 ball_id；一張快照是依 id 排序的欄位表（state_codec 量化後的值）
+- 主機（SnapshotSender）以對方最後確認（ack）的快照為基準：
+  兩邊都用同一套物理（ball_field.advance）把基準快照往前推到目前的步數，
+  只送出新增的球、移除的 id，以及與預測不符的球（hp / 半徑改變、位置或速度偏差超過容許值）
+- 用戶端（SnapshotReceiver）用同樣的方式從基準重建出完整的快照
+- 每隔 KEYFRAME_INTERVAL 步送一次完整快照（keyframe），讓遺失基準的一方重新同步
+- 用戶端（SnapshotInterpolator）不自己模擬主機的球，而是在最近兩張快照之間內插位置
+球都照重力正常移動時，差異幾乎是空的：頻寬隨事件數量增加，而不是球數 × 每秒次數。
+"""
+import numpy as np
+
+from ball_field import advance, GRAVITY, ELASTICITY
+from state_codec import BALL_FIELDS, quantize_columns
+
+# 每隔幾步（模擬步數）強制送一次完整快照
+KEYFRAME_INTERVAL = 180
+# 預測與實際的差距超過多少才送修正（像素、像素/步）
+POSITION_TOLERANCE = 1.0
+VELOCITY_TOLERANCE = 0.05
+# 最多保留幾張送出 / 收到的快照（等待對方確認或作為基準）
+HISTORY_LIMIT = 64
+# 用戶端自己產生的球（例如本地分裂）使用的編號起點，不會與主機的編號（u4）重複
+LOCAL_ID_BASE = 1 << 32
+
+MOTION_FIELDS = ('x', 'y', 'dx', 'dy')
+STAT_FIELDS = tuple(name for name in BALL_FIELDS if name != 'id' and name not in MOTION_FIELDS)
+
+EMPTY_TABLE = quantize_columns({name: () for name in BALL_FIELDS})
+_NO_IDS = np.zeros(0, dtype=np.int64)
+
+
+def _take(table, index):
+    return {name: column[index] for name, column in table.items()}
+
+
+def sort_table(table):
+    """依 id 排序的快照表"""
+    return _take(table, np.argsort(table['id'], kind='stable'))
+
+
+def predict(table, ticks, screen_width, screen_height, dt=1.0):
+    """快照表往前推 ticks 步後的樣子（不修改原本的表）"""
+    if ticks <= 0 or len(table['id']) == 0:
+        return table
+    predicted = dict(table)
+    x, y, dx, dy = (table[name].copy() for name in MOTION_FIELDS)
+    radius = table['radius']
+    gravity = np.full(len(x), GRAVITY)
+    elasticity = np.full(len(x), ELASTICITY)
+    for _ in range(ticks):
+        advance(x, y, dx, dy, radius, gravity, elasticity, screen_width, screen_height, dt)
+    predicted.update(x=x, y=y, dx=dx, dy=dy)
+    return predicted
+
+
+def apply_delta(predicted, delta):
+    """預測好的基準快照 + 差異 -> 新的快照表"""
+    if delta['keyframe']:
+        return sort_table(delta['spawned'])
+    table = predicted
+    if len(delta['removed']):
+        table = _take(table, ~np.isin(table['id'], delta['removed']))
+    changed = delta['changed']
+    if len(changed['id']):
+        slots = np.searchsorted(table['id'], changed['id'])
+        if (slots >= len(table['id'])).any() or (table['id'][slots] != changed['id']).any():
+            raise ValueError("delta changes a ball that is not in the baseline")
+        table = dict(table)
+        for name in BALL_FIELDS:
+            column = table[name].copy()
+            column[slots] = changed[name]
+            table[name] = column
+    spawned = delta['spawned']
+    if len(spawned['id']):
+        table = sort_table({name: np.concatenate((table[name], spawned[name])) for name in BALL_FIELDS})
+    return table
+
+
+class SnapshotSender:
+    """
+    主機端：build() 產生相對於對方最後確認快照的差異，ack() 記錄對方確認到哪一張。
+    每張送出的快照都記下「對方套用後會得到的表」，作為之後的基準。
+    """
+
+    def __init__(self, screen_width, screen_height, keyframe_interval=KEYFRAME_INTERVAL):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.keyframe_interval = keyframe_interval
+        self.acked = 0
+        self._history = {}          # seq -> (tick, table)
+        self._keyframe_tick = None
+
+        # 統計
+        self.keyframes = 0
+        self.deltas = 0
+        self.spawned = 0
+        self.removed = 0
+        self.changed = 0
+        self.balls = 0
+
+    def ack(self, seq):
+        """對方已套用到第 seq 張；更早的快照不會再當作基準"""
+        if seq <= self.acked or seq not in self._history:
+            return
+        self.acked = seq
+        for old in [s for s in self._history if s < seq]:
+            del self._history[old]
+
+    def build(self, seq, tick, columns, dt=1.0):
+        """第 seq 張快照（模擬步數 tick）的差異；columns 是目前所有球的欄位"""
+        actual = sort_table(quantize_columns(columns))
+        self.balls += len(actual['id'])
+        base = self._history.get(self.acked)
+        if (base is None or self._keyframe_tick is None
+                or tick - self._keyframe_tick >= self.keyframe_interval):
+            delta = {'keyframe': True, 'baseline': 0, 'spawned': actual,
+                     'removed': _NO_IDS, 'changed': EMPTY_TABLE}
+            self._keyframe_tick = tick
+            self.keyframes += 1
+            table = actual
+        else:
+            base_tick, base_table = base
+            predicted = predict(base_table, tick - base_tick, self.screen_width, self.screen_height, dt)
+            known = np.isin(actual['id'], predicted['id'])
+            kept = np.isin(predicted['id'], actual['id'])
+            current, expected = _take(actual, known), _take(predicted, kept)
+            differs = np.zeros(len(current['id']), dtype=bool)
+            for name in STAT_FIELDS:
+                differs |= current[name] != expected[name]
+            for name, tolerance in (('x', POSITION_TOLERANCE), ('y', POSITION_TOLERANCE),
+                                    ('dx', VELOCITY_TOLERANCE), ('dy', VELOCITY_TOLERANCE)):
+                differs |= np.abs(current[name] - expected[name]) > tolerance
+            delta = {'keyframe': False, 'baseline': self.acked, 'spawned': _take(actual, ~known),
+                     'removed': predicted['id'][~kept], 'changed': _take(current, differs)}
+            self.deltas += 1
+            table = apply_delta(predicted, delta)
+        self.spawned += len(delta['spawned']['id'])
+        self.removed += len(delta['removed'])
+        self.changed += len(delta['changed']['id'])
+
+        self._history[seq] = (tick, table)
+        while len(self._history) > HISTORY_LIMIT:
+            del self._history[min(self._history)]
+        return delta
+
+    def stats(self):
+        return {
+            'keyframes': self.keyframes,
+            'deltas': self.deltas,
+            'spawned': self.spawned,
+            'removed': self.removed,
+            'changed': self.changed,
+            'balls': self.balls,
+        }
+
+
+class SnapshotReceiver:
+    """
+    用戶端：apply() 把收到的差異套到基準快照上，回傳完整的快照表；
+    重複、過期或找不到基準的快照回傳 None（等下一張 keyframe）。
+    last_seq 是最後套用成功的序號，要當作 ack 回送給主機。
+    """
+
+    def __init__(self, screen_width, screen_height):
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.last_seq = 0
+        self._history = {}     # seq -> (tick, table)
+        self._floor = 0        # 主機用過的最新基準；更早的快照不會再被參照
+
+        # 統計
+        self.applied = 0
+        self.missed = 0
+
+    def apply(self, seq, tick, delta, dt=1.0):
+        if seq <= self.last_seq:
+            return None
+        if delta['keyframe']:
+            table = apply_delta(None, delta)
+        else:
+            base = self._history.get(delta['baseline'])
+            if base is None:
+                self.missed += 1
+                return None
+            base_tick, base_table = base
+            predicted = predict(base_table, tick - base_tick, self.screen_width, self.screen_height, dt)
+            table = apply_delta(predicted, delta)
+            self._floor = max(self._floor, delta['baseline'])
+
+        self.last_seq = seq
+        self.applied += 1
+        self._history[seq] = (tick, table)
+        for old in [s for s in self._history if s < self._floor]:
+            del self._history[old]
+        while len(self._history) > HISTORY_LIMIT:
+            del self._history[min(self._history)]
+        return table
+
+    def latest(self):
+        """最後套用成功的快照表（還沒有時為 None）"""
+        entry = self._history.get(self.last_seq)
+        return entry[1] if entry is not None else None
+
+    def stats(self):
+        return {'applied': self.applied, 'missed': self.missed}
+
+
+class SnapshotInterpolator:
+    """
+    用戶端的插值緩衝：收到新快照時，以「畫面上目前的位置」為起點、新快照的位置為終點，
+    在兩張快照相隔的步數內移動過去（畫面比主機晚一個快照間隔，但不會跳動）。
+    不在緩衝中的球（本地分裂出來、等待主機確認的）維持原位。
+    """
+
+    def __init__(self):
+        self._ids = _NO_IDS
+        self._start = (np.zeros(0), np.zeros(0))
+        self._end = (np.zeros(0), np.zeros(0))
+        self._arrival = 0      # 收到最新快照時的本地步數
+        self._duration = 1     # 最近兩張快照相隔的步數
+        self._tick = None      # 最新快照的主機步數
+
+    def push(self, tick, table, now):
+        """加入主機第 tick 步的快照（依 id 排序的表）；now 為目前的本地步數"""
+        ids = table['id']
+        start_x, start_y = table['x'].copy(), table['y'].copy()
+        if self._tick is not None:
+            x, y, known = self.sample(ids, now)
+            start_x[known] = x[known]
+            start_y[known] = y[known]
+            self._duration = max(1, tick - self._tick)
+        self._ids = ids
+        self._start = (start_x, start_y)
+        self._end = (table['x'], table['y'])
+        self._arrival = now
+        self._tick = tick
+
+    def sample(self, ids, now):
+        """ids 在本地第 now 步的位置；回傳 (x, y, known)，known 為 False 的不在緩衝中"""
+        count = len(self._ids)
+        if count == 0:
+            empty = np.zeros(len(ids))
+            return empty, empty, np.zeros(len(ids), dtype=bool)
+        pos = np.minimum(np.searchsorted(self._ids, ids), count - 1)
+        known = self._ids[pos] == ids
+        t = min(max((now - self._arrival) / self._duration, 0.0), 1.0)
+        (x0, y0), (x1, y1) = self._start, self._end
+        x = x0[pos] + (x1[pos] - x0[pos]) * t
+        y = y0[pos] + (y1[pos] - y0[pos]) * t
+        return x, y, known
+
+    def apply(self, field, now):
+        """取代 BallField.step：把所有已知的球移到第 now 步的內插位置（prev_x / prev_y 供畫面內插）"""
+        n = len(field)
+        if n == 0:
+            return
+        field.prev_x[:n] = field.x[:n]
+        field.prev_y[:n] = field.y[:n]
+        x, y, known = self.sample(field.ids[:n], now)
+        field.x[:n][known] = x[known]
+        field.y[:n][known] = y[known]
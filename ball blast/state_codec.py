@@ -0,0 +1,163 @@
+# state_codec.py
+"""
+玩家狀態的二進位編碼（取代 pickle：體積小、編解碼快，也不會在收到資料時執行任意程式碼）。
+
+  state = 表頭 + 子彈陣列 [+ 球的表頭 + 新增的球 + 移除的編號 + 變動的球]
+  表頭  = 旗標(B) 砲台 x(h, 1/8 像素) 分數(i) 序號(I) 確認(I) 模擬步數(I) 子彈數(H)
+  球的表頭 = 基準序號(I) 新增數(H) 移除數(H) 變動數(H)
+
+子彈與球以 NumPy 結構陣列一次打包，欄位由下面的 schema 決定：(名稱, dtype, 倍率)。
+浮點數乘上倍率後四捨五入存成整數（位置 1/8 像素、速度 1/256 像素/tick），
+超出範圍的值會被截到 dtype 的上下限。
+
+狀態本身是欄位字典（與 GameState.get_player_state 相同）：
+  {'seq', 'ack', 'tick', 'cannon_x', 'score', 'bullets': {'x': [...], 'y': [...]},
+   'balls': {'keyframe', 'baseline', 'spawned': {...}, 'removed': [...], 'changed': {...}}}
+seq 是這則訊息的序號（從 1 開始），ack 是最後收到的對方序號（0 表示還沒有）。
+'balls' 只有主機會送，是相對於基準快照的差異（見 snapshot.py）；解碼後的欄位是 NumPy 陣列。
+"""
+import struct
+
+import numpy as np
+
+from protocol import ProtocolError
+
+POSITION_SCALE = 8
+VELOCITY_SCALE = 256
+
+# 球的種類
+KIND_NORMAL = 0
+KIND_REWARD = 1
+
+BULLET_SCHEMA = (
+    ('x', '<i2', POSITION_SCALE),
+    ('y', '<i2', POSITION_SCALE),
+)
+BALL_SCHEMA = (
+    ('id', '<u4', 1),
+    ('x', '<i2', POSITION_SCALE),
+    ('y', '<i2', POSITION_SCALE),
+    ('dx', '<i2', VELOCITY_SCALE),
+    ('dy', '<i2', VELOCITY_SCALE),
+    ('radius', '<u2', POSITION_SCALE),
+    ('hp', '<i4', 1),
+    ('max_splits', 'u1', 1),
+    ('splits_remaining', 'u1', 1),
+    ('image_index', 'u1', 1),
+    ('kind', 'u1', 1),
+)
+
+
+def _dtype(schema):
+    return np.dtype([(name, dtype) for name, dtype, _ in schema])
+
+
+def _bounds(schema):
+    """每個欄位的 (名稱, 倍率, 最小值, 最大值)，編碼時不必每次查 np.iinfo"""
+    return tuple((name, scale, np.iinfo(dtype).min, np.iinfo(dtype).max) for name, dtype, scale in schema)
+
+
+BULLET_DTYPE = _dtype(BULLET_SCHEMA)
+BALL_DTYPE = _dtype(BALL_SCHEMA)
+BALL_FIELDS = tuple(name for name, _, _ in BALL_SCHEMA)
+_BULLET_BOUNDS = _bounds(BULLET_SCHEMA)
+_BALL_BOUNDS = _bounds(BALL_SCHEMA)
+_CANNON_BOUNDS = (np.iinfo(np.int16).min, np.iinfo(np.int16).max)
+
+_HEADER = struct.Struct("<BhiIIIH")
+_BALL_HEADER = struct.Struct("<IHHH")
+_HAS_BALLS = 0x01
+_KEYFRAME = 0x02
+ID_DTYPE = np.dtype('<u4')
+MAX_ENTITIES = 0xFFFF
+
+
+def _quantize(value, scale, low, high):
+    """浮點數 -> 整數欄位的值（四捨五入並截到 [low, high]）"""
+    values = np.array(value, dtype=np.float64)
+    if scale != 1:
+        values *= scale
+        np.rint(values, out=values)
+    np.maximum(values, low, out=values)
+    np.minimum(values, high, out=values)
+    return values
+
+
+def _pack(columns, bounds, dtype):
+    count = len(columns[bounds[0][0]])
+    if count > MAX_ENTITIES:
+        raise ProtocolError(f"too many entities: {count} (limit {MAX_ENTITIES})")
+    packed = np.empty(count, dtype=dtype)
+    for name, scale, low, high in bounds:
+        packed[name] = _quantize(columns[name], scale, low, high)
+    return count, packed.tobytes()
+
+
+def _unpack(payload, offset, count, bounds, dtype):
+    packed = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+    columns = {}
+    for name, scale, _, _ in bounds:
+        column = packed[name]
+        columns[name] = column / scale if scale != 1 else column.astype(np.int64)
+    return columns, offset + count * dtype.itemsize
+
+
+def quantize_columns(columns):
+    """球的欄位經過編碼再解碼後的值（與 decode_state 得到的完全相同）"""
+    quantized = {}
+    for name, scale, low, high in _BALL_BOUNDS:
+        values = _quantize(columns[name], scale, low, high)
+        quantized[name] = values / scale if scale != 1 else values.astype(np.int64)
+    return quantized
+
+
+def encode_state(state):
+    """玩家狀態 -> bytes"""
+    bullet_count, bullets = _pack(state['bullets'], _BULLET_BOUNDS, BULLET_DTYPE)
+    flags = 0
+    parts = [b"", bullets]
+    balls = state.get('balls')
+    if balls is not None:
+        flags |= _HAS_BALLS
+        if balls['keyframe']:
+            flags |= _KEYFRAME
+        spawned_count, spawned = _pack(balls['spawned'], _BALL_BOUNDS, BALL_DTYPE)
+        removed = np.asarray(balls['removed'], dtype=ID_DTYPE)
+        changed_count, changed = _pack(balls['changed'], _BALL_BOUNDS, BALL_DTYPE)
+        if len(removed) > MAX_ENTITIES:
+            raise ProtocolError(f"too many entities: {len(removed)} (limit {MAX_ENTITIES})")
+        parts += [_BALL_HEADER.pack(balls['baseline'], spawned_count, len(removed), changed_count),
+                  spawned, removed.tobytes(), changed]
+    cannon_x = int(_quantize(state['cannon_x'], POSITION_SCALE, *_CANNON_BOUNDS))
+    parts[0] = _HEADER.pack(flags, cannon_x, int(state['score']), state['seq'], state['ack'],
+                            state['tick'], bullet_count)
+    return b"".join(parts)
+
+
+def decode_state(payload):
+    """bytes -> 玩家狀態；長度與表頭不符時丟出 ProtocolError"""
+    if len(payload) < _HEADER.size:
+        raise ProtocolError(f"state too short: {len(payload)} bytes")
+    flags, cannon_x, score, seq, ack, tick, bullet_count = _HEADER.unpack_from(payload)
+    expected = _HEADER.size + bullet_count * BULLET_DTYPE.itemsize
+    if flags & _HAS_BALLS:
+        if len(payload) < expected + _BALL_HEADER.size:
+            raise ProtocolError(f"state too short: {len(payload)} bytes")
+        baseline, spawned_count, removed_count, changed_count = _BALL_HEADER.unpack_from(payload, expected)
+        expected += (_BALL_HEADER.size + (spawned_count + changed_count) * BALL_DTYPE.itemsize
+                     + removed_count * ID_DTYPE.itemsize)
+    if len(payload) != expected:
+        raise ProtocolError(f"state size mismatch: {len(payload)} bytes, expected {expected}")
+
+    bullets, offset = _unpack(payload, _HEADER.size, bullet_count, _BULLET_BOUNDS, BULLET_DTYPE)
+    state = {'seq': seq, 'ack': ack, 'tick': tick, 'cannon_x': cannon_x / POSITION_SCALE,
+             'score': score, 'bullets': bullets}
+    if flags & _HAS_BALLS:
+        offset += _BALL_HEADER.size
+        spawned, offset = _unpack(payload, offset, spawned_count, _BALL_BOUNDS, BALL_DTYPE)
+        removed = np.frombuffer(payload, dtype=ID_DTYPE, count=removed_count, offset=offset).astype(np.int64)
+        offset += removed_count * ID_DTYPE.itemsize
+        changed, _ = _unpack(payload, offset, changed_count, _BALL_BOUNDS, BALL_DTYPE)
+        state['balls'] = {'keyframe': bool(flags & _KEYFRAME), 'baseline': baseline,
+                          'spawned': spawned, 'removed': removed, 'changed': changed}
+    return state
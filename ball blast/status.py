@@ -1,65 +1,92 @@
 # status.py
 import pygame
+from fonts import FontManager
 
 class StatusPanel:
+    """
+    強化狀態面板。
+    - 半透明遮罩、面板底色、標題、標籤與提示文字預先合成在一張圖上（每種畫面大小一次）
+    - 數值只有在 crit_rate / fire rate 等數值改變時才重新 render
+    """
+    PANEL_WIDTH = 400
+    PANEL_HEIGHT = 400
+    LINE_HEIGHT = 40
+    LABELS = ("CRIT Rate", "CRIT Damage", "Fire Rate", "Bullet Damage", "Bullet Rows")
+
     def __init__(self, game):
         self.game = game
-        self.font = pygame.font.SysFont("Arial", 24)
-        self.title_font = pygame.font.SysFont("Arial", 37)
+        self.font = FontManager.get("Arial", 24)
+        self.title_font = FontManager.get("Arial", 37)
         self.visible = False
-        
+
+        self._static = None      # 預先合成的遮罩 + 面板
+        self._static_size = None
+        self._values = None      # 上次 render 的數值字串
+        self._value_texts = []
+
     def toggle_visibility(self):
         """切換面板的可見性"""
         self.visible = not self.visible
-        
-    def draw(self, screen):
-        
-        """繪製狀態面板"""
-        if not self.visible:
-            return
-            
-        # 創建半透明背景
-        overlay = pygame.Surface((screen.get_width(), screen.get_height()), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))  # 半透明黑色
-        screen.blit(overlay, (0, 0))
-        
+
+    def _panel_rect(self, size):
+        return pygame.Rect((size[0] - self.PANEL_WIDTH) // 2, (size[1] - self.PANEL_HEIGHT) // 2,
+                           self.PANEL_WIDTH, self.PANEL_HEIGHT)
+
+    def _build_static(self, size):
+        """合成不會變動的部分：半透明遮罩、面板背景、標題、標籤與提示"""
+        static = pygame.Surface(size, pygame.SRCALPHA)
+        static.fill((0, 0, 0, 180))  # 半透明黑色
+
         # 面板背景
-        panel_width = 400
-        panel_height = 400
-        panel_x = (screen.get_width() - panel_width) // 2
-        panel_y = (screen.get_height() - panel_height) // 2
-        
-        pygame.draw.rect(screen, (50, 50, 80), (panel_x, panel_y, panel_width, panel_height))
-        pygame.draw.rect(screen, (100, 100, 150), (panel_x, panel_y, panel_width, panel_height), 2)
-        
+        panel = self._panel_rect(size)
+        pygame.draw.rect(static, (50, 50, 80), panel)
+        pygame.draw.rect(static, (100, 100, 150), panel, 2)
+
         # 標題
         title = self.title_font.render("STATUS PANEL", True, (255, 255, 255))
-        screen.blit(title, (panel_x + (panel_width - title.get_width()) // 2, panel_y + 20))
-        
-        # 狀態資訊
-        y_offset = panel_y + 70
-        line_height = 40
+        static.blit(title, (panel.x + (panel.width - title.get_width()) // 2, panel.y + 20))
 
-        # 狀態項目
-        status_items = [
-            ("CRIT Rate", f"{self.game.crit_rate}%"),
-            ("CRIT Damage", f"{self.game.crit_damage}%"),
-            ("Fire Rate", f"{self.game.bullets_per_second}/sec"),
-            ("Bullet Damage", f"{self.game.damage_per_bullet}"),
-            ("Bullet Rows", f"{self.game.bullet_rows}")
-        ]
-        
-        for label, value in status_items:
-            # 標籤
+        # 標籤
+        y_offset = panel.y + 70
+        for label in self.LABELS:
             label_text = self.font.render(label + ":", True, (200, 200, 255))
-            screen.blit(label_text, (panel_x + 40, y_offset))
-            
-            # 數值
-            value_text = self.font.render(value, True, (255, 255, 255))
-            screen.blit(value_text, (panel_x + panel_width - 40 - value_text.get_width(), y_offset))
-            
-            y_offset += line_height
-        
+            static.blit(label_text, (panel.x + 40, y_offset))
+            y_offset += self.LINE_HEIGHT
+
         # 提示文字
         hint = self.font.render("Press S to close", True, (200, 200, 200))
-        screen.blit(hint, (panel_x + (panel_width - hint.get_width()) // 2, panel_y + panel_height - 40))
+        static.blit(hint, (panel.x + (panel.width - hint.get_width()) // 2, panel.y + panel.height - 40))
+        self._static = static
+        self._static_size = size
+
+    def _current_values(self):
+        game = self.game
+        return (
+            f"{game.crit_rate}%",
+            f"{game.crit_damage}%",
+            f"{game.bullets_per_second}/sec",
+            f"{game.damage_per_bullet}",
+            f"{game.bullet_rows}",
+        )
+
+    def draw(self, screen):
+        """繪製狀態面板"""
+        if not self.visible:
+            return
+
+        size = screen.get_size()
+        if self._static_size != size:
+            self._build_static(size)
+        screen.blit(self._static, (0, 0))
+
+        # 狀態數值（改變時才重新 render）
+        values = self._current_values()
+        if values != self._values:
+            self._values = values
+            self._value_texts = [self.font.render(value, True, (255, 255, 255)) for value in values]
+
+        panel = self._panel_rect(size)
+        y_offset = panel.y + 70
+        for value_text in self._value_texts:
+            screen.blit(value_text, (panel.x + panel.width - 40 - value_text.get_width(), y_offset))
+            y_offset += self.LINE_HEIGHT
@@ -0,0 +1,14 @@
+# conftest.py - 測試共用設定：不開視窗（SDL dummy driver），在遊戲資料夾內執行（圖片以相對路徑載入）
+import os
+import sys
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, GAME_DIR)
+os.chdir(GAME_DIR)
+
+import pygame
+
+pygame.init()
@@ -0,0 +1,111 @@
+# test_collision_parity.py - "circle" 精確判定不能漏掉 "mask" 判定到的碰撞，向量化版本與逐顆判定一致
+import random
+
+import numpy as np
+import pytest
+
+from ball import Ball, RewardBall
+from ball_field import BallField
+from bullet_field import BulletField
+from cannon import Cannon
+from collision import NARROW_MASK, NARROW_CIRCLE, mask_boxes, circle_hits_box
+from game_state import GameState
+
+WIDTH, HEIGHT = 600, 800
+SAMPLES = 4000
+
+
+def _balls(count, seed):
+    rng = random.Random(seed)
+    random.seed(seed)   # Ball 的圖片與初速使用全域 random
+    balls = []
+    for i in range(count):
+        x = rng.randint(50, WIDTH - 50)
+        y = rng.randint(50, HEIGHT - 200)
+        if i % 10 == 0:
+            balls.append(RewardBall(x, y))
+        else:
+            balls.append(Ball(x, y, rng.randint(10, 70), rng.randint(1, 70)))
+    return balls
+
+
+@pytest.fixture(scope="module")
+def balls():
+    return _balls(100, seed=3)
+
+
+def test_circle_finds_every_bullet_hit_mask_finds(balls):
+    rng = random.Random(1)
+    bullet_mask = BulletField().mask
+    hits = 0
+    for _ in range(SAMPLES):
+        ball = rng.choice(balls)
+        reach = ball.current_image.get_width() // 2 + 12
+        x = ball.x + rng.uniform(-reach, reach)
+        y = ball.y + rng.uniform(-reach, reach)
+        if ball.overlaps_at(x, y, bullet_mask, NARROW_MASK):
+            hits += 1
+            assert ball.overlaps_at(x, y, bullet_mask, NARROW_CIRCLE), (ball.x, ball.y, ball.radius, x, y)
+    assert hits > SAMPLES // 4   # 取樣範圍確實涵蓋了碰撞
+
+
+def test_circle_finds_every_cannon_hit_mask_finds(balls):
+    rng = random.Random(2)
+    cannon = Cannon(WIDTH // 2, HEIGHT - 100)
+    boxes = mask_boxes(cannon.mask)
+    hits = 0
+    for _ in range(SAMPLES):
+        ball = rng.choice(balls)
+        reach = ball.current_image.get_width() // 2
+        cx = int(rng.uniform(cannon.rect.left - reach, cannon.rect.right + reach))
+        cy = int(rng.uniform(cannon.rect.top - reach, cannon.rect.bottom + reach))
+        ball_rect = ball.current_image.get_rect(center=(cx, cy))
+        offset = (ball_rect.left - cannon.rect.left, ball_rect.top - cannon.rect.top)
+        if cannon.mask.overlap(ball.mask, offset) is not None:
+            hits += 1
+            assert any(circle_hits_box(cx, cy, ball.radius, cannon.rect.left + l, cannon.rect.top + t,
+                                       cannon.rect.left + r, cannon.rect.top + b)
+                       for l, t, r, b in boxes), (cx, cy, ball.radius)
+    assert hits > SAMPLES // 10
+
+
+def _collide(mode, strategy="brute", collide=None, seed=2):
+    """同一批球與子彈做一次碰撞判定，回傳沒有擊中任何球的子彈位置"""
+    game = GameState(WIDTH, HEIGHT, multiplayer=False, collision_strategy=strategy, collision_mode=mode)
+    game.balls = BallField()
+    for ball in _balls(150, seed=seed):
+        ball.hp = 10 ** 9
+        game.balls.append(ball)
+    rng = np.random.default_rng(seed)
+    game.bullets.spawn_many(rng.uniform(0, WIDTH, 1000), rng.uniform(0, HEIGHT, 1000))
+    if collide is None:
+        game.handle_collisions()
+    else:
+        collide(game)
+    return sorted(game.bullets.positions())
+
+
+def _scalar_circle(game):
+    """handle_collisions（單人、"circle"）的逐一判定版本"""
+    field = game.bullets
+    idx = field.indices().tolist()
+    xs, ys = field.x[idx].tolist(), field.y[idx].tolist()
+    live = [True] * len(idx)
+    for ball in game.balls[:]:
+        for k in range(len(idx)):
+            if live[k] and ball.is_hit_at(xs[k], ys[k], field.mask, NARROW_CIRCLE):
+                live[k] = False
+                field.kill(idx[k])
+                break
+    field.compact()
+
+
+def test_vectorized_circle_matches_per_pair_circle():
+    vectorized = _collide(NARROW_CIRCLE)
+    assert vectorized == _collide(NARROW_CIRCLE, collide=_scalar_circle)
+    assert len(vectorized) < 1000   # 有子彈真的擊中
+
+
+@pytest.mark.parametrize("strategy", ["grid", "sweep"])
+def test_broad_phases_agree_with_brute_force(strategy):
+    assert _collide(NARROW_MASK, strategy) == _collide(NARROW_MASK, "brute")
@@ -0,0 +1,158 @@
+# test_snapshot.py - 差異快照串流：用戶端重建的表與主機的球一致（誤差在容許值內），遺失基準時等 keyframe
+from collections import deque
+
+import numpy as np
+import pytest
+
+from ball_field import advance, GRAVITY, ELASTICITY
+from snapshot import (SnapshotSender, SnapshotReceiver, apply_delta, sort_table, POSITION_TOLERANCE,
+                      VELOCITY_TOLERANCE, STAT_FIELDS, EMPTY_TABLE)
+from state_codec import encode_state, decode_state, quantize_columns, BALL_FIELDS
+
+WIDTH, HEIGHT = 600, 800
+
+
+class _World:
+    """主機的球（浮點數欄位），每步照物理移動；偶爾有球被擊中、消失或新增"""
+
+    def __init__(self, count, seed):
+        self.rng = np.random.default_rng(seed)
+        self.next_id = 1
+        self.columns = {name: np.zeros(0) for name in BALL_FIELDS}
+        self.spawn(count)
+
+    def spawn(self, count):
+        rng = self.rng
+        new = {
+            'id': np.arange(self.next_id, self.next_id + count),
+            'x': rng.uniform(80, WIDTH - 80, count),
+            'y': rng.uniform(80, HEIGHT - 300, count),
+            'dx': rng.uniform(-2, 2, count),
+            'dy': np.zeros(count),
+            'radius': rng.integers(10, 60, count).astype(float),
+            'hp': rng.integers(5, 60, count),
+            'max_splits': rng.integers(0, 3, count),
+            'splits_remaining': rng.integers(0, 3, count),
+            'image_index': rng.integers(0, 5, count),
+            'kind': np.zeros(count, dtype=int),
+        }
+        self.next_id += count
+        self.columns = {name: np.concatenate((self.columns[name], new[name])) for name in BALL_FIELDS}
+
+    def step(self, tick):
+        c = self.columns
+        n = len(c['id'])
+        advance(c['x'], c['y'], c['dx'], c['dy'], c['radius'], np.full(n, GRAVITY), np.full(n, ELASTICITY),
+                WIDTH, HEIGHT)
+        if tick % 7 == 0:
+            c['hp'][tick % n] -= 1
+        if tick % 23 == 0:
+            keep = np.arange(n) != tick % n
+            self.columns = {name: column[keep] for name, column in c.items()}
+        if tick % 31 == 0:
+            self.spawn(2)
+
+
+def _wire(delta):
+    """差異經過實際的編碼與解碼"""
+    state = {'seq': 1, 'ack': 0, 'tick': 0, 'cannon_x': 0, 'score': 0,
+             'bullets': {'x': (), 'y': ()}, 'balls': delta}
+    return decode_state(encode_state(state))['balls']
+
+
+def _assert_close(table, actual):
+    np.testing.assert_array_equal(table['id'], actual['id'])
+    for name in STAT_FIELDS:
+        np.testing.assert_array_equal(table[name], actual[name], err_msg=name)
+    for name, tolerance in (('x', POSITION_TOLERANCE), ('y', POSITION_TOLERANCE),
+                            ('dx', VELOCITY_TOLERANCE), ('dy', VELOCITY_TOLERANCE)):
+        assert np.abs(table[name] - actual[name]).max(initial=0) <= tolerance, name
+
+
+def _stream(ticks, latency=3, drop=(), keyframe_interval=180, count=40, reconnect=None):
+    """
+    主機每步送一張快照，雙向各延遲 latency 步，drop 中的序號遺失；
+    reconnect 那一步換成新的用戶端（沒有任何基準）。
+    每張套用成功的快照都與主機當時的球比對。回傳 (sender, 最後的 receiver, 套用成功的序號)。
+    """
+    world = _World(count, seed=count)
+    sender = SnapshotSender(WIDTH, HEIGHT, keyframe_interval=keyframe_interval)
+    receiver = SnapshotReceiver(WIDTH, HEIGHT)
+    to_client, to_host = deque(), deque()
+    actual, applied = {}, []
+    for tick in range(1, ticks + 1):
+        world.step(tick)
+        seq = tick
+        delta = sender.build(seq, tick, world.columns)
+        actual[seq] = sort_table(quantize_columns(world.columns))
+        if tick == reconnect:
+            receiver = SnapshotReceiver(WIDTH, HEIGHT)
+        if seq not in drop:
+            to_client.append((tick + latency, seq, _wire(delta)))
+        while to_client and to_client[0][0] <= tick:
+            _, seq, delta = to_client.popleft()
+            table = receiver.apply(seq, seq, delta)
+            if table is not None:
+                _assert_close(table, actual[seq])
+                applied.append(seq)
+        to_host.append((tick + latency, receiver.last_seq))
+        while to_host and to_host[0][0] <= tick:
+            sender.ack(to_host.popleft()[1])
+    return sender, receiver, applied
+
+
+def test_stream_stays_in_sync_and_sends_little():
+    sender, receiver, applied = _stream(ticks=400)
+    stats = sender.stats()
+    assert len(applied) == 400 - 3
+    # 第一次確認回來之前只能送 keyframe，之後每 180 步一張
+    assert stats['keyframes'] + stats['deltas'] == 400 and stats['keyframes'] <= 10
+    assert stats['removed'] > 0 and stats['spawned'] > 40
+    # 沒有事件的球只靠預測，送出的修正遠少於球數 × 步數
+    assert stats['changed'] < stats['balls'] * 0.05
+    assert receiver.stats() == {'applied': len(applied), 'missed': 0}
+
+
+def test_dropped_snapshots_do_not_break_the_baseline():
+    drop = set(range(5, 400, 4))
+    sender, receiver, applied = _stream(ticks=400, drop=drop)
+    assert not drop & set(applied)
+    assert len(applied) == 400 - 3 - len(drop)
+    assert receiver.stats()['missed'] == 0
+
+
+def test_missing_baseline_waits_for_the_next_keyframe():
+    # 用戶端重新連線：之前的基準都沒有，差異快照一律略過，直到下一張 keyframe；
+    # 新的確認回到主機之前，主機還以舊的基準送差異（最多來回延遲的步數），之後恢復連續同步
+    latency = 3
+    sender, receiver, applied = _stream(ticks=200, latency=latency, keyframe_interval=60, reconnect=100)
+    received = list(range(100 - latency, 200 - latency + 1))     # 新的用戶端收到的序號
+    new = [seq for seq in applied if seq in received]
+    assert new[0] > received[0]
+    assert new[1] - new[0] <= 2 * latency + 1     # 確認在主機送出這一步之後才到
+    assert new[1:] == list(range(new[1], received[-1] + 1))
+    assert receiver.stats() == {'applied': len(new), 'missed': len(received) - len(new)}
+
+
+def test_duplicate_and_old_snapshots_are_ignored():
+    world = _World(5, seed=1)
+    sender = SnapshotSender(WIDTH, HEIGHT)
+    receiver = SnapshotReceiver(WIDTH, HEIGHT)
+    first = _wire(sender.build(1, 1, world.columns))
+    assert receiver.apply(1, 1, first) is not None
+    sender.ack(1)
+    world.step(2)
+    second = _wire(sender.build(2, 2, world.columns))
+    assert receiver.apply(2, 2, second) is not None
+    assert receiver.apply(2, 2, second) is None
+    assert receiver.apply(1, 1, first) is None
+    assert receiver.last_seq == 2 and receiver.latest() is not None
+
+
+def test_changing_an_unknown_ball_is_an_error():
+    table = sort_table(quantize_columns(_World(3, seed=2).columns))
+    changed = quantize_columns(dict(_World(1, seed=3).columns, id=np.array([99])))
+    delta = {'keyframe': False, 'baseline': 1, 'spawned': EMPTY_TABLE, 'removed': np.zeros(0),
+             'changed': changed}
+    with pytest.raises(ValueError):
+        apply_delta(table, delta)
@@ -0,0 +1,74 @@
+# test_snapshot_reconcile.py - 主機快照 -> 編碼 -> 用戶端重建：球的 id、位置、hp、半徑要與主機相同
+import numpy as np
+
+from ball import Ball, RewardBall
+from game_state import GameState
+from snapshot import LOCAL_ID_BASE
+from state_codec import encode_state, decode_state, POSITION_SCALE
+
+WIDTH, HEIGHT = 600, 800
+
+
+def _pair():
+    host = GameState(WIDTH, HEIGHT, multiplayer=True, player_id=0, seed=1)
+    client = GameState(WIDTH, HEIGHT, multiplayer=True, player_id=1, seed=2)
+    return host, client
+
+
+def _send(host, client):
+    state = decode_state(encode_state(host.get_player_state()))
+    client.update_from_network(state)
+    host.update_from_network(decode_state(encode_state(client.get_player_state())))
+
+
+def _grown_reward_ball(x, y):
+    ball = RewardBall(x, y)
+    ball.on_hit()
+    ball.on_hit()
+    assert ball.radius > RewardBall.base_radius
+    return ball
+
+
+def _assert_synced(host, client):
+    mine = {ball.ball_id: ball for ball in client.balls}
+    assert sorted(mine) == sorted(ball.ball_id for ball in host.balls)
+    for ball in host.balls:
+        other = mine[ball.ball_id]
+        assert type(other) is type(ball)
+        assert abs(other.x - ball.x) <= 0.5 / POSITION_SCALE
+        assert abs(other.y - ball.y) <= 0.5 / POSITION_SCALE
+        assert other.radius == ball.radius
+        assert other.hp == ball.hp
+        assert other.max_splits == ball.max_splits
+        assert other.splits_remaining == ball.splits_remaining
+        assert other.current_image.get_width() == ball.current_image.get_width()
+
+
+def test_keyframe_with_grown_reward_ball():
+    host, client = _pair()
+    host.balls.append(_grown_reward_ball(120, 200))
+    ball = Ball(300, 250, 30, 12, 2)
+    ball.splits_remaining = 1
+    host.balls.append(ball)
+
+    _send(host, client)
+    _assert_synced(host, client)
+
+
+def test_delta_spawn_and_recreate_after_local_kill():
+    host, client = _pair()
+    host.balls.append(Ball(300, 250, 30, 12, 2))
+    _send(host, client)
+
+    # 主機新增一顆長大過的獎勵球（差異快照中的新增）
+    host.balls.append(_grown_reward_ball(150, 300))
+    _send(host, client)
+    assert host.snapshot_sender.deltas == 1
+    _assert_synced(host, client)
+
+    # 用戶端本地擊破了主機仍然存在的球：下一張快照要以主機的數值重新建立
+    reward = next(ball for ball in client.balls if isinstance(ball, RewardBall))
+    client.balls.remove(reward)
+    _send(host, client)
+    _assert_synced(host, client)
+    assert np.all(client.balls.ids[:len(client.balls)] < LOCAL_ID_BASE)
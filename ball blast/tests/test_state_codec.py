@@ -0,0 +1,110 @@
+# test_state_codec.py - 玩家狀態的二進位編碼：解碼後的值等於量化後的值，格式錯誤時丟出 ProtocolError
+import numpy as np
+import pytest
+
+from protocol import ProtocolError
+from state_codec import (encode_state, decode_state, quantize_columns, BALL_FIELDS, POSITION_SCALE,
+                         VELOCITY_SCALE, KIND_REWARD, MAX_ENTITIES)
+
+
+def _columns(count, seed):
+    rng = np.random.default_rng(seed)
+    return {
+        'id': np.arange(1, count + 1),
+        'x': rng.uniform(0, 600, count),
+        'y': rng.uniform(0, 800, count),
+        'dx': rng.uniform(-3, 3, count),
+        'dy': rng.uniform(-12, 12, count),
+        'radius': rng.uniform(10, 70, count),
+        'hp': rng.integers(1, 70, count),
+        'max_splits': rng.integers(0, 4, count),
+        'splits_remaining': rng.integers(0, 4, count),
+        'image_index': rng.integers(0, 5, count),
+        'kind': (np.arange(count) % 10 == 0) * KIND_REWARD,
+    }
+
+
+def _state(bullets=3, balls=None, **header):
+    rng = np.random.default_rng(bullets)
+    state = {'seq': 7, 'ack': 5, 'tick': 1234, 'cannon_x': 299.3, 'score': 4200,
+             'bullets': {'x': rng.uniform(0, 600, bullets), 'y': rng.uniform(0, 800, bullets)}}
+    state.update(header)
+    if balls is not None:
+        state['balls'] = balls
+    return state
+
+
+def _delta(spawned=5, removed=(), changed=3, keyframe=False, baseline=6):
+    return {'keyframe': keyframe, 'baseline': baseline, 'spawned': _columns(spawned, seed=1),
+            'removed': np.asarray(removed), 'changed': _columns(changed, seed=2)}
+
+
+def test_header_and_bullets_round_trip():
+    state = _state(bullets=50)
+    decoded = decode_state(encode_state(state))
+    assert (decoded['seq'], decoded['ack'], decoded['tick'], decoded['score']) == (7, 5, 1234, 4200)
+    assert decoded['cannon_x'] == round(299.3 * POSITION_SCALE) / POSITION_SCALE
+    assert 'balls' not in decoded
+    for name in ('x', 'y'):
+        expected = np.rint(state['bullets'][name] * POSITION_SCALE) / POSITION_SCALE
+        np.testing.assert_array_equal(decoded['bullets'][name], expected)
+
+
+@pytest.mark.parametrize("keyframe", [True, False])
+def test_balls_round_trip_equals_quantize_columns(keyframe):
+    delta = _delta(removed=(11, 12, 40), keyframe=keyframe)
+    balls = decode_state(encode_state(_state(balls=delta)))['balls']
+    assert balls['keyframe'] is keyframe
+    assert balls['baseline'] == 6
+    np.testing.assert_array_equal(balls['removed'], [11, 12, 40])
+    for part in ('spawned', 'changed'):
+        expected = quantize_columns(delta[part])
+        assert set(balls[part]) == set(BALL_FIELDS)
+        for name in BALL_FIELDS:
+            np.testing.assert_array_equal(balls[part][name], expected[name], err_msg=f"{part}.{name}")
+
+
+def test_empty_state_round_trip():
+    delta = _delta(spawned=0, changed=0)
+    decoded = decode_state(encode_state(_state(bullets=0, balls=delta)))
+    assert len(decoded['bullets']['x']) == 0
+    assert all(len(decoded['balls'][part]['id']) == 0 for part in ('spawned', 'changed'))
+    assert len(decoded['balls']['removed']) == 0
+
+
+def test_values_out_of_range_are_clipped():
+    columns = _columns(2, seed=3)
+    columns['x'] = np.array([-1e6, 1e6])
+    columns['dy'] = np.array([-1e3, 1e3])
+    columns['hp'] = np.array([-5, 10 ** 12])
+    state = _state(bullets=0, cannon_x=1e6, balls=dict(_delta(changed=0), spawned=columns))
+    decoded = decode_state(encode_state(state))
+    spawned = decoded['balls']['spawned']
+    int16 = np.iinfo(np.int16)
+    np.testing.assert_array_equal(spawned['x'], [int16.min / POSITION_SCALE, int16.max / POSITION_SCALE])
+    np.testing.assert_array_equal(spawned['dy'], [int16.min / VELOCITY_SCALE, int16.max / VELOCITY_SCALE])
+    np.testing.assert_array_equal(spawned['hp'], [-5, np.iinfo(np.int32).max])
+    assert decoded['cannon_x'] == int16.max / POSITION_SCALE
+
+
+@pytest.mark.parametrize("cut", [1, 8, 17])
+def test_truncated_payload_is_rejected(cut):
+    payload = encode_state(_state(balls=_delta()))
+    with pytest.raises(ProtocolError):
+        decode_state(payload[:-cut])
+
+
+def test_short_header_and_trailing_bytes_are_rejected():
+    payload = encode_state(_state())
+    with pytest.raises(ProtocolError):
+        decode_state(payload[:5])
+    with pytest.raises(ProtocolError):
+        decode_state(payload + b"\0")
+
+
+def test_too_many_entities_is_rejected():
+    count = MAX_ENTITIES + 1
+    state = _state(bullets=0)
+    state['bullets'] = {'x': np.zeros(count), 'y': np.zeros(count)}
+    with pytest.raises(ProtocolError):
+        encode_state(state)